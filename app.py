@@ -1,16 +1,38 @@
 import gradio as gr
 import re
 import language_tool_python
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Callable, Dict, List, Tuple, Optional, Union
 import random
 import nltk
 import sys
 import os
 from datetime import datetime, timedelta
 import supabase
-from supabase import create_client
+from supabase import create_client, ClientOptions, PostgrestAPIError
+from fastapi import FastAPI, Request, Response
 import json
 import logging
+import requests
+from collections import Counter, OrderedDict, deque
+from collections.abc import Mapping
+from contextlib import contextmanager
+import bisect
+import copy
+import math
+import asyncio
+import atexit
+import hashlib
+import multiprocessing
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+try:
+    import fcntl  # v14.5.0: POSIX file locks for the shared LanguageTool pool registry
+except ImportError:
+    fcntl = None
 
 VERSION = "14.4.0"
 VERSION_NAME = "Reliability, Transparency & Rubric Alignment | Truthful Scoring with Teacher-Validated Evidence Detection"
@@ -22,6 +44,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# v14.5.0: Precompiled regex registry for hot-path patterns.
+# Analyzers reference these module-level patterns instead of calling
+# re.findall/re.split/re.search with pattern strings inline. Where several
+# literal patterns scan the same text they are combined into one alternation.
+_SENTENCE_DELIMITER = re.compile(r'[.!?]+')
+_RE_PERCENTAGE = re.compile(r'(?:\d+(?:\.\d+)?%|\d+ percent)')
+_RE_PROPER_NOUN = re.compile(r'(?<=[a-z\s])([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)')
+_RE_NUMBER = re.compile(r'\b\d+(?:\.\d+)?%?\b')
+_RE_YEAR = re.compile(r'\b(19|20)\d{2}\b')
+_RE_QUOTE = re.compile(r'"[^"]{10,}"')
+_RE_WORD_TOKEN = re.compile(r'\w+')
+_RE_NON_SPACE_RUN = re.compile(r'\S+')
+_RE_DIGITS = re.compile(r'\d+')
+
+def _word_alternation(words) -> re.Pattern:
+    """v14.5.0: Compile whole-word alternatives into a single pattern."""
+    return re.compile(r'\b(?:' + '|'.join(re.escape(word) for word in words) + r')\b')
+
+# Personal pronouns for EmotionFlow authenticity (one scan instead of one per pronoun)
+_PERSONAL_PRONOUNS = ('i', 'my', 'me', 'we', 'our', 'us')
+_RE_PERSONAL_PRONOUN = _word_alternation(_PERSONAL_PRONOUNS)
+
+# Generic words flagged by inline feedback, in priority order
+_GENERIC_WORDS = ('very', 'really', 'a lot', 'many', 'most', 'some', 'things', 'stuff', 'big', 'small')
+_GENERIC_WORD_PRIORITY = {word: rank for rank, word in enumerate(_GENERIC_WORDS)}
+_RE_GENERIC_WORD = _word_alternation(_GENERIC_WORDS)
+
 # v10.1.0: Helper functions for schema validation and safe extraction
 def extract_rubric_level(result: Dict) -> Dict:
     """
@@ -147,16 +196,1891 @@ def normalize_grading_result(raw_result: Dict) -> Dict:
         "metadata": {"normalized": True}
     }
 
+# v14.5.0: Compact annotation records.
+# Inline feedback and grammar corrections used to be plain dicts that each held
+# a copy of their sentence / original substring. The records below keep a
+# reference to the essay text plus character offsets instead, and only build
+# the legacy JSON shape when serialized at the API boundary.
+
+def _sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    v14.5.0: Offsets of the non-empty sentences produced by
+    [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()].
+    text[start:end] is identical to the corresponding stripped sentence.
+    """
+    spans = []
+    pos = 0
+    bounds = [(m.start(), m.end()) for m in _SENTENCE_DELIMITER.finditer(text)]
+    bounds.append((len(text), len(text)))
+    for delim_start, delim_end in bounds:
+        segment = text[pos:delim_start]
+        left_stripped = segment.lstrip()
+        stripped = left_stripped.rstrip()
+        if stripped:
+            start = pos + len(segment) - len(left_stripped)
+            spans.append((start, start + len(stripped)))
+        pos = delim_end
+    return spans
+
+
+# v14.5.0: Shared vocabulary alternatives (tuples so feedback records can reference them)
+_VOCABULARY_ALTERNATIVES = {
+    'very': ('extremely', 'remarkably', 'particularly', 'exceptionally', 'profoundly', 'decidedly'),
+    'really': ('genuinely', 'truly', 'certainly', 'indeed', 'authentically', 'undeniably'),
+    'a lot': ('numerous', 'substantial', 'considerable', 'extensive', 'abundant', 'copious'),
+    'many': ('numerous', 'various', 'multiple', 'countless', 'myriad', 'manifold'),
+    'most': ('majority of', 'predominant', 'principal', 'primary', 'preponderant'),
+    'some': ('several', 'certain', 'particular', 'specific', 'select', 'designated'),
+    'things': ('elements', 'aspects', 'factors', 'components', 'dimensions', 'facets'),
+    'stuff': ('material', 'content', 'subject matter', 'information', 'data', 'resources'),
+    'big': ('substantial', 'significant', 'considerable', 'extensive', 'monumental', 'profound'),
+    'small': ('minimal', 'modest', 'limited', 'negligible', 'marginal', 'inconsequential'),
+    'good': ('beneficial', 'advantageous', 'valuable', 'effective', 'constructive', 'favorable'),
+    'bad': ('detrimental', 'problematic', 'ineffective', 'counterproductive', 'adverse', 'harmful'),
+    'important': ('significant', 'crucial', 'vital', 'essential', 'pivotal', 'paramount'),
+    'get': ('obtain', 'acquire', 'attain', 'procure', 'secure', 'gain'),
+    'make': ('create', 'construct', 'produce', 'generate', 'develop', 'formulate'),
+    'show': ('demonstrate', 'illustrate', 'exhibit', 'reveal', 'display', 'manifest'),
+    'use': ('utilize', 'employ', 'apply', 'implement', 'leverage', 'harness')
+}
+_DEFAULT_VOCABULARY_ALTERNATIVES = ('more specific term',)
+
+
+class _SlottedRecord(Mapping):
+    """
+    v14.5.0: Base for slotted annotation records.
+    Behaves as a read-only mapping with the legacy dict keys so existing
+    consumers (item['type'], item.get('severity')) keep working unchanged.
+    """
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _optional_fields: Tuple[str, ...] = ()
+
+    def _present_fields(self):
+        for field in self._fields:
+            yield field
+        for field in self._optional_fields:
+            if getattr(self, field) is not None:
+                yield field
+
+    def __getitem__(self, key):
+        if key in self._fields or (key in self._optional_fields and getattr(self, key) is not None):
+            value = getattr(self, key)
+            return list(value) if isinstance(value, tuple) else value
+        raise KeyError(key)
+
+    def __iter__(self):
+        return self._present_fields()
+
+    def __len__(self):
+        return sum(1 for _ in self._present_fields())
+
+    def to_dict(self) -> Dict:
+        """Serialize to the legacy JSON shape."""
+        return {field: self[field] for field in self._present_fields()}
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+class InlineFeedbackItem(_SlottedRecord):
+    """
+    v14.5.0: One inline feedback annotation, referencing its sentence by offset.
+    JSON shape: sentence_index, sentence, type, severity, suggestion[, word, alternatives].
+    """
+    __slots__ = ('text', 'start', 'end', 'sentence_index', 'type', 'severity',
+                 '_suggestion', 'word', 'alternatives')
+    _fields = ('sentence_index', 'sentence', 'type', 'severity', 'suggestion')
+    _optional_fields = ('word', 'alternatives')
+
+    # Suggestion templates formatted lazily from word/alternatives
+    GENERIC_WORD_TEMPLATE = "💡 Vocabulary: Replace '{word}' with: {alternatives}"
+
+    def __init__(self, text: str, start: int, end: int, sentence_index: int,
+                 feedback_type: str, severity: str, suggestion: Optional[str] = None,
+                 word: Optional[str] = None, alternatives: Optional[Tuple[str, ...]] = None):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.sentence_index = sentence_index
+        self.type = sys.intern(feedback_type)
+        self.severity = sys.intern(severity)
+        self._suggestion = sys.intern(suggestion) if suggestion is not None else None
+        self.word = word
+        self.alternatives = alternatives
+
+    @property
+    def sentence(self) -> str:
+        return self.text[self.start:self.end]
+
+    @property
+    def suggestion(self) -> str:
+        if self._suggestion is None and self.word is not None:
+            return self.GENERIC_WORD_TEMPLATE.format(
+                word=self.word, alternatives=', '.join(self.alternatives or ()))
+        return self._suggestion
+
+
+class GrammarCorrection(_SlottedRecord):
+    """
+    v14.5.0: One grammar correction, referencing the flagged text by offset.
+    JSON shape: offset, length, original, suggestion, message.
+    """
+    __slots__ = ('text', 'offset', 'length', 'suggestion', 'message')
+    _fields = ('offset', 'length', 'original', 'suggestion', 'message')
+
+    def __init__(self, text: str, offset: int, length: int, suggestion: str, message: str):
+        self.text = text
+        self.offset = offset
+        self.length = length
+        self.suggestion = suggestion
+        self.message = sys.intern(message)
+
+    @property
+    def original(self) -> str:
+        return self.text[self.offset:self.offset + self.length]
+
+
+class AnnotationSpanTable:
+    """
+    v14.5.0: Per-essay table of sentence spans (start/end offsets into the
+    original text) shared by every annotation producer and the HTML renderer.
+    Producers register their records as named layers; sentence text is only
+    materialized on demand as a slice of the essay.
+    """
+    __slots__ = ('text', 'spans', '_starts', 'layers')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.spans = _sentence_spans(text)
+        self._starts = [start for start, _ in self.spans]
+        self.layers = {}
+
+    def __len__(self):
+        return len(self.spans)
+
+    def sentence(self, index: int) -> str:
+        start, end = self.spans[index]
+        return self.text[start:end]
+
+    def sentence_index_at(self, offset: int) -> Optional[int]:
+        """Index of the sentence containing a character offset, or None for delimiters/whitespace."""
+        index = bisect.bisect_right(self._starts, offset) - 1
+        if index >= 0 and offset < self.spans[index][1]:
+            return index
+        return None
+
+    def set_layer(self, name: str, annotations: List) -> None:
+        self.layers[name] = annotations
+
+    def layer(self, name: str) -> List:
+        return self.layers.get(name, [])
+
+    def group_by_sentence(self, annotations: List) -> Dict[int, List]:
+        """Bucket sentence-indexed annotations in a single pass."""
+        grouped = {}
+        for annotation in annotations:
+            grouped.setdefault(annotation['sentence_index'], []).append(annotation)
+        return grouped
+
+
+class TermIndex:
+    """
+    v14.5.0: Lazily built inverted index from terms to the segments (sentences
+    or paragraphs) that contain them, with the same semantics as
+    `term in segment`. The first lookup of a term runs one C-level scan over
+    the joined segments and maps hits back to segment ids; every later lookup
+    of the same term is a dictionary hit.
+    Segments must already be lowercased by the caller; terms are matched as given.
+    """
+    __slots__ = ('segments', '_joined', '_starts', '_postings')
+
+    _SEPARATOR = '\x00'
+
+    def __init__(self, segments: List[str]):
+        self.segments = segments
+        self._joined = self._SEPARATOR.join(segments)
+        starts = []
+        offset = 0
+        for segment in segments:
+            starts.append(offset)
+            offset += len(segment) + 1
+        self._starts = starts
+        self._postings = {}
+
+    def containing(self, term: str) -> Tuple[int, ...]:
+        """Ids of the segments for which `term in segment` is true, in order."""
+        postings = self._postings.get(term)
+        if postings is None:
+            if not term or self._SEPARATOR in term:
+                postings = tuple(i for i, segment in enumerate(self.segments) if term in segment)
+            else:
+                found = []
+                starts = self._starts
+                joined = self._joined
+                pos = joined.find(term)
+                while pos != -1:
+                    seg_id = bisect.bisect_right(starts, pos) - 1
+                    found.append(seg_id)
+                    # Skip to the next segment; one hit per segment is enough
+                    if seg_id + 1 >= len(starts):
+                        break
+                    pos = joined.find(term, starts[seg_id + 1])
+                postings = tuple(found)
+            self._postings[term] = postings
+        return postings
+
+    def containing_any(self, terms) -> set:
+        """Ids of the segments containing at least one of the terms."""
+        found = set()
+        for term in terms:
+            found.update(self.containing(term))
+        return found
+
+
+class EssayTokenTable:
+    """
+    v14.5.0: Word-boundary view of one essay: a token Counter for single-word
+    indicators and lazily built n-gram sets for phrases. Unlike substring
+    tests, 'so' does not match inside 'also' and 'art' does not match 'start'.
+    Hyphens and apostrophes split tokens, so 'real-world' is the bigram
+    ('real', 'world').
+    """
+    __slots__ = ('tokens', 'counts', '_ngrams', '_cache')
+
+    def __init__(self, text_lower: str):
+        self.tokens = _RE_WORD_TOKEN.findall(text_lower)
+        self.counts = Counter(self.tokens)
+        self._ngrams = {}
+        self._cache = {}
+
+    def ngrams(self, n: int) -> set:
+        grams = self._ngrams.get(n)
+        if grams is None:
+            tokens = self.tokens
+            grams = self._ngrams[n] = set(zip(*[tokens[i:] for i in range(n)]))
+        return grams
+
+    def has(self, term: str) -> bool:
+        """Whether the term occurs as a whole word or whole-word phrase."""
+        found = self._cache.get(term)
+        if found is None:
+            parts = tuple(_RE_WORD_TOKEN.findall(term.lower()))
+            if not parts:
+                found = False
+            elif len(parts) == 1:
+                found = parts[0] in self.counts
+            else:
+                found = parts in self.ngrams(len(parts))
+            self._cache[term] = found
+        return found
+
+    def count_present(self, terms) -> int:
+        return sum(1 for term in terms if self.has(term))
+
+
+class EssayTermIndex:
+    """
+    v14.5.0: Per-essay term-to-context index shared by the analyzers.
+    Built once per essay: sentence segments follow re.split(r'[.!?]+', text)
+    and paragraph segments follow the stripped '\\n\\n' split used by the
+    paragraph-level checks. Whole-text membership tests are memoized so terms
+    shared between analyzers are only searched once.
+    """
+    __slots__ = ('text', 'text_lower', '_sentences', '_sentence_index', '_paragraph_index',
+                 '_contains_cache', '_tokens')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.text_lower = text.lower()
+        self._tokens = None
+        self._sentences = None
+        self._sentence_index = None
+        self._paragraph_index = None
+        self._contains_cache = {}
+
+    @property
+    def sentences(self) -> List[str]:
+        if self._sentences is None:
+            self._sentences = _SENTENCE_DELIMITER.split(self.text)
+        return self._sentences
+
+    @property
+    def sentence_index(self) -> TermIndex:
+        if self._sentence_index is None:
+            self._sentence_index = TermIndex([s.lower() for s in self.sentences])
+        return self._sentence_index
+
+    @property
+    def paragraph_index(self) -> TermIndex:
+        if self._paragraph_index is None:
+            paragraphs = [p.strip() for p in self.text.split('\n\n') if p.strip()]
+            self._paragraph_index = TermIndex([p.lower() for p in paragraphs])
+        return self._paragraph_index
+
+    @property
+    def tokens(self) -> EssayTokenTable:
+        if self._tokens is None:
+            self._tokens = EssayTokenTable(self.text_lower)
+        return self._tokens
+
+    def count_matching(self, terms, token_level: bool = False) -> int:
+        """Number of terms present, by substring (legacy) or whole-word matching."""
+        if token_level:
+            return self.tokens.count_present(terms)
+        return self.count_present(terms)
+
+    def contains(self, term: str) -> bool:
+        """Memoized `term in text.lower()`."""
+        found = self._contains_cache.get(term)
+        if found is None:
+            found = term in self.text_lower
+            self._contains_cache[term] = found
+        return found
+
+    def count_present(self, terms) -> int:
+        """Number of terms that occur anywhere in the lowercased essay."""
+        cache = self._contains_cache
+        text_lower = self.text_lower
+        count = 0
+        for term in terms:
+            found = cache.get(term)
+            if found is None:
+                found = cache[term] = term in text_lower
+            count += found
+        return count
+
+    def sentences_containing(self, term: str) -> Tuple[int, ...]:
+        return self.sentence_index.containing(term)
+
+    def paragraphs_containing(self, term: str) -> Tuple[int, ...]:
+        return self.paragraph_index.containing(term)
+
+
+# v14.5.0: Span tables / term indexes kept per engine, keyed by essay text
+ESSAY_TABLE_CACHE_SIZE = 16
+
+
+def serialize_records(items: List) -> List[Dict]:
+    """v14.5.0: Convert annotation records to plain dicts at the API boundary."""
+    return [item.to_dict() if isinstance(item, _SlottedRecord) else item for item in items]
+
+
+def serialize_result(result: Dict) -> Dict:
+    """v14.5.0: Shallow copy of a grading result with its record lists as plain dicts (JSON-encodable)."""
+    result = dict(result)
+    for key in ('inline_feedback', 'corrections'):
+        if isinstance(result.get(key), list):
+            result[key] = serialize_records(result[key])
+    return result
+
+
+# v14.5.0: Sentence segments for grammar checking keep their trailing
+# delimiters so punctuation rules still see them.
+_RE_GRAMMAR_SEGMENT = re.compile(r'\S[^.!?]*[.!?]*')
+
+
+def _grammar_segments(text: str) -> List[Tuple[int, int]]:
+    """v14.5.0: (start, end) offsets of the sentences checked one by one for the grammar cache."""
+    spans = []
+    for match in _RE_GRAMMAR_SEGMENT.finditer(text):
+        start, end = match.span()
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        spans.append((start, end))
+    return spans
+
+
+def _normalize_sentence(sentence: str) -> Tuple[str, Optional[List[int]]]:
+    """
+    v14.5.0: Collapse whitespace runs so resubmissions with different spacing
+    share a cache entry. Returns the normalized sentence and, when it differs
+    from the original, a map from normalized positions to original positions.
+    """
+    normalized = ' '.join(sentence.split())
+    if normalized == sentence:
+        return normalized, None
+    positions = []
+    for match in _RE_NON_SPACE_RUN.finditer(sentence):
+        if positions:
+            positions.append(match.start() - 1)
+        positions.extend(range(match.start(), match.end()))
+    positions.append(len(sentence))
+    return normalized, positions
+
+
+class GrammarMatch:
+    """
+    v14.5.0: Plain copy of a LanguageTool match with the attributes the grader
+    reads. Detached from the JVM result so it can be cached and re-based.
+    """
+    __slots__ = ('offset', 'errorLength', 'replacements', 'message', 'ruleId', 'category')
+
+    def __init__(self, offset: int, errorLength: int, replacements: List[str], message: str, ruleId: str = '',
+                 category: str = ''):
+        self.offset = offset
+        self.errorLength = errorLength
+        self.replacements = replacements
+        self.message = message
+        self.ruleId = ruleId
+        self.category = category
+
+    @classmethod
+    def from_tool_match(cls, match, base: int = 0) -> 'GrammarMatch':
+        # language_tool_python renamed errorLength/ruleId in newer releases
+        length = getattr(match, 'errorLength', None)
+        if length is None:
+            length = getattr(match, 'error_length', 0)
+        rule_id = getattr(match, 'ruleId', None) or getattr(match, 'rule_id', '') or ''
+        return cls(match.offset - base, length, list(match.replacements), match.message, rule_id,
+                   getattr(match, 'category', '') or '')
+
+    def relocated(self, base: int, positions: Optional[List[int]] = None) -> 'GrammarMatch':
+        """Copy moved from sentence-relative to essay offsets."""
+        offset, length = self.offset, self.errorLength
+        if positions is not None:
+            end = positions[offset + length - 1] + 1 if length else positions[offset]
+            offset = positions[offset]
+            length = end - offset
+        return GrammarMatch(base + offset, length, self.replacements, self.message, self.ruleId, self.category)
+
+    def to_row(self) -> list:
+        return [self.offset, self.errorLength, self.replacements, self.message, self.ruleId, self.category]
+
+    def __repr__(self):
+        return f"GrammarMatch({self.offset}, {self.errorLength}, {self.ruleId!r})"
+
+
+# v14.5.0: Long essays are grammar-checked in paragraph-aligned chunks
+_RE_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+GRAMMAR_CHUNK_CHARS = int(os.environ.get('DOUESSAY_GRAMMAR_CHUNK_CHARS', '6000'))
+GRAMMAR_CHUNK_OVERLAP = int(os.environ.get('DOUESSAY_GRAMMAR_CHUNK_OVERLAP', '200'))
+GRAMMAR_WORKERS = int(os.environ.get('DOUESSAY_GRAMMAR_WORKERS', '4'))
+_grammar_executor = None
+_grammar_executor_lock = threading.Lock()
+# v14.5.0: Class-set batching packs essays/sentences into requests of this size
+GRAMMAR_BATCH_CHARS = int(os.environ.get('DOUESSAY_GRAMMAR_BATCH_CHARS', '20000'))
+GRAMMAR_BATCH_SEPARATOR = '\n\n'
+GRAMMAR_MEMO_SIZE = 256
+
+
+def _get_grammar_executor() -> ThreadPoolExecutor:
+    """v14.5.0: Process-wide threads for concurrent LanguageTool requests (I/O bound)."""
+    global _grammar_executor
+    with _grammar_executor_lock:
+        if _grammar_executor is None:
+            _grammar_executor = ThreadPoolExecutor(max_workers=max(1, GRAMMAR_WORKERS),
+                                                   thread_name_prefix='grammar')
+        return _grammar_executor
+
+
+# v14.5.0: Threads shared by grade_essay_async callers that pass no executor
+ASYNC_GRADING_THREADS = int(os.environ.get('DOUESSAY_ASYNC_GRADING_THREADS', '8'))
+_async_grading_executor = None
+_async_grading_executor_lock = threading.Lock()
+
+
+def _get_async_grading_executor() -> ThreadPoolExecutor:
+    """v14.5.0: Process-wide bounded threads for grade_essay_stages_async; extra gradings queue."""
+    global _async_grading_executor
+    with _async_grading_executor_lock:
+        if _async_grading_executor is None:
+            _async_grading_executor = ThreadPoolExecutor(max_workers=max(2, ASYNC_GRADING_THREADS),
+                                                         thread_name_prefix='grading-async')
+        return _async_grading_executor
+
+
+def _grammar_chunks(text: str, chunk_chars: Optional[int] = None,
+                    overlap_chars: Optional[int] = None) -> List[Tuple[int, int, int, int]]:
+    """
+    v14.5.0: Split text on paragraph boundaries into chunks of about chunk_chars.
+    Returns (check_start, check_end, own_start, own_end) per chunk: the own
+    ranges partition the text, and each checked range extends them by up to
+    overlap_chars (cut at whitespace) so rules see context across the cut.
+    A paragraph longer than chunk_chars stays whole.
+    """
+    chunk_chars = GRAMMAR_CHUNK_CHARS if chunk_chars is None else chunk_chars
+    overlap_chars = GRAMMAR_CHUNK_OVERLAP if overlap_chars is None else overlap_chars
+    cuts = [0]
+    last = 0
+    for match in _RE_PARAGRAPH_BREAK.finditer(text):
+        boundary = match.end()
+        if boundary - cuts[-1] > chunk_chars and last > cuts[-1]:
+            cuts.append(last)
+        last = boundary
+    if len(text) - cuts[-1] > chunk_chars and cuts[-1] < last < len(text):
+        cuts.append(last)
+    cuts.append(len(text))
+
+    chunks = []
+    for own_start, own_end in zip(cuts, cuts[1:]):
+        check_start = max(0, own_start - overlap_chars)
+        while check_start < own_start and not text[check_start].isspace():
+            check_start += 1
+        check_end = min(len(text), own_end + overlap_chars)
+        while check_end > own_end and not text[check_end - 1].isspace():
+            check_end -= 1
+        chunks.append((check_start, check_end, own_start, own_end))
+    return chunks
+
+
+# v14.5.0: LanguageTool rule profiles. Grading always counts errors with the
+# full rule set, so scores do not depend on the tier; a profile only selects
+# which rule families grade_essay shows as corrections (lower tiers skip the
+# style and picky ones). check_grammar can still send a profile to LanguageTool.
+# 'full' is LanguageTool's default rule set (the legacy behaviour); 'fast' skips
+# LanguageTool for the in-process HeuristicGrammarBackend, which also changes
+# the error count and therefore the score, so it is opt-in per tier.
+GRAMMAR_RULE_PROFILES = {
+    'fast': {'backend': 'heuristic'},
+    'core': {
+        'enabled_categories': ('GRAMMAR', 'TYPOS', 'CASING', 'PUNCTUATION', 'CONFUSED_WORDS'),
+        'enabled_only': True
+    },
+    'grade9': {
+        'enabled_categories': ('GRAMMAR', 'TYPOS', 'CASING', 'PUNCTUATION', 'CONFUSED_WORDS',
+                               'COMPOUNDING', 'REDUNDANCY', 'COLLOCATIONS', 'SEMANTICS'),
+        'enabled_only': True
+    },
+    'full': {}
+}
+GRAMMAR_PROFILE_ORDER = ('fast', 'core', 'grade9', 'full')
+TIER_GRAMMAR_PROFILES = {
+    'free_trial': 'core', 'free': 'core', 'student_basic': 'core',
+    'plus': 'grade9', 'student_premium': 'grade9',
+    'premium': 'full', 'teacher_suite': 'full', 'unlimited': 'full'
+}
+# Tiers that use the JVM-free 'fast' profile, e.g. "free_trial,free"
+FAST_GRAMMAR_TIERS = frozenset(tier.strip() for tier in os.environ.get('DOUESSAY_FAST_GRAMMAR_TIERS', '').split(',')
+                               if tier.strip())
+
+
+def grammar_profile_for(tier: Optional[str] = None, grade_level: Union[str, int, None] = None) -> str:
+    """
+    v14.5.0: Narrowest rule profile that serves both the tier and the grade level.
+    Tiers cap the profile (free and basic get 'core', tiers listed in
+    DOUESSAY_FAST_GRAMMAR_TIERS get 'fast'); Grade 9 and below need at most
+    'grade9'. Unknown tiers and grades fall back to 'full'.
+    """
+    if tier in FAST_GRAMMAR_TIERS:
+        return 'fast'
+    profile = TIER_GRAMMAR_PROFILES.get(tier, 'full') if tier else 'full'
+    grade = _RE_DIGITS.search(str(grade_level)) if grade_level is not None else None
+    if grade and int(grade.group()) <= 9:
+        profile = min(profile, 'grade9', key=GRAMMAR_PROFILE_ORDER.index)
+    return profile
+
+
+def _grading_grammar_profile(profile: Optional[str]) -> Optional[str]:
+    """v14.5.0: Rule set grading checks for a profile: the full set, unless the profile is 'fast'."""
+    return 'fast' if profile == 'fast' else None
+
+
+def _profile_shows(profile: Optional[str], match: GrammarMatch) -> bool:
+    """v14.5.0: Whether a profile's corrections include the match (unknown categories are kept)."""
+    categories = GRAMMAR_RULE_PROFILES[profile or 'full'].get('enabled_categories')
+    return not categories or not match.category or match.category in categories
+
+
+def _grammar_profile_key(profile: Optional[str]) -> str:
+    """v14.5.0: Cache namespace for a profile (its name plus definition)."""
+    name = profile or 'full'
+    definition = GRAMMAR_RULE_PROFILES[name]
+    return f"{name}:{json.dumps(definition, sort_keys=True)}" if definition else name
+
+
+def _grammar_tool_fingerprint(tool) -> str:
+    """v14.5.0: LanguageTool version plus active rule set, used to version cached matches."""
+    parts = [getattr(language_tool_python, '__version__', ''),
+             getattr(tool, 'language_tool_download_version', '') or '',
+             getattr(tool, 'version', '') or '',
+             str(getattr(tool, 'language', '') or '')]
+    for attribute in ('enabled_rules', 'disabled_rules', 'enabled_categories', 'disabled_categories'):
+        try:
+            parts.append(','.join(sorted(getattr(tool, attribute, ()) or ())))
+        except TypeError:
+            parts.append('')
+    parts.append(str(getattr(tool, 'enabled_rules_only', '')))
+    return '|'.join(str(part) for part in parts)
+
+
+class GrammarCache:
+    """
+    v14.5.0: Persistent sentence-level cache of LanguageTool matches.
+    Entries are keyed by a hash of (engine fingerprint, normalized sentence), so
+    a LanguageTool upgrade or rule-set change never reads stale matches; old
+    entries simply age out. SQLite keeps the store safe to share between worker
+    processes; the least recently used entries are evicted beyond max_entries.
+    """
+    DEFAULT_MAX_ENTRIES = 100000
+    _EVICT_EVERY = 256
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES, version: str = ''):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS grammar_cache '
+            '(key TEXT PRIMARY KEY, matches TEXT NOT NULL, last_used REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS grammar_cache_lru ON grammar_cache (last_used)')
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls, version: str = '') -> Optional['GrammarCache']:
+        """
+        Open the cache configured by DOUESSAY_GRAMMAR_CACHE: a database path, or
+        'on' for ~/.cache/douessay/grammar_cache.sqlite3. Off by default: checking
+        sentence by sentence loses cross-sentence rules, and the segmenter still
+        splits inside abbreviations and decimals, so error counts can differ from
+        a whole-text check.
+        """
+        path = os.environ.get('DOUESSAY_GRAMMAR_CACHE', 'off')
+        if not path or path.lower() in ('off', '0', 'false', 'no'):
+            return None
+        if path.lower() in ('on', '1', 'true', 'yes'):
+            path = os.path.join(os.path.expanduser('~'), '.cache', 'douessay', 'grammar_cache.sqlite3')
+        max_entries = int(os.environ.get('DOUESSAY_GRAMMAR_CACHE_SIZE', cls.DEFAULT_MAX_ENTRIES))
+        try:
+            return cls(path, max_entries=max_entries, version=version)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Grammar cache unavailable at {path}: {e}")
+            return None
+
+    def _key(self, sentence: str, namespace: str = '') -> str:
+        return hashlib.sha1(f'{self.version}\x00{namespace}\x00{sentence}'.encode('utf-8')).hexdigest()
+
+    def get_many(self, sentences, namespace: str = '') -> Dict[str, List[GrammarMatch]]:
+        """Cached matches (sentence-relative) for the sentences that have them."""
+        keys = {self._key(sentence, namespace): sentence for sentence in sentences}
+        found = {}
+        with self._lock:
+            key_list = list(keys)
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                rows = self._conn.execute(
+                    f'SELECT key, matches FROM grammar_cache WHERE key IN ({",".join("?" * len(chunk))})',
+                    chunk).fetchall()
+                for key, payload in rows:
+                    found[keys[key]] = [GrammarMatch(*row) for row in json.loads(payload)]
+            if found:
+                now = time.time()
+                self._conn.executemany('UPDATE grammar_cache SET last_used = ? WHERE key = ?',
+                                       [(now, self._key(sentence, namespace)) for sentence in found])
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, results: Dict[str, List[GrammarMatch]], namespace: str = ''):
+        if not results:
+            return
+        now = time.time()
+        rows = [(self._key(sentence, namespace), json.dumps([match.to_row() for match in matches]), now)
+                for sentence, matches in results.items()]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO grammar_cache (key, matches, last_used) VALUES (?, ?, ?)', rows)
+            self._writes_since_evict += len(rows)
+            if self._writes_since_evict >= self._EVICT_EVERY:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        self._writes_since_evict = 0
+        (count,) = self._conn.execute('SELECT COUNT(*) FROM grammar_cache').fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                'DELETE FROM grammar_cache WHERE key IN '
+                '(SELECT key FROM grammar_cache ORDER BY last_used LIMIT ?)', (count - self.max_entries,))
+
+    def evict(self):
+        """Enforce max_entries now instead of on the next batch of writes."""
+        with self._lock:
+            self._evict()
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM grammar_cache').fetchone()[0]
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'version': self.version
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class GrammarBackend:
+    """
+    v14.5.0: Interface for grammar engines behind DouEssay.check_grammar.
+    check() returns GrammarMatch objects with offsets into the given text;
+    backends that understand GRAMMAR_RULE_PROFILES set supports_profiles.
+    """
+    name = 'base'
+    version = ''
+    supports_profiles = False
+
+    def check(self, text: str, profile: Optional[str] = None) -> List[GrammarMatch]:
+        raise NotImplementedError
+
+
+class HeuristicGrammarBackend(GrammarBackend):
+    """
+    v14.5.0: JVM-free grammar engine for fast mode, low tiers and hosts without
+    Java. Regex rules for the most common student errors: doubled words, a/an,
+    lowercase sentence starts, frequent confusables and subject-verb agreement
+    after personal pronouns. Rule ids follow LanguageTool's where one exists.
+    """
+    name = 'heuristic'
+    version = 'heuristic-1'
+
+    _RE_DOUBLED = re.compile(r'\b(\w+)(\s+)(\1)\b', re.IGNORECASE)
+    _DOUBLE_OK = frozenset({'had', 'that', 'is', 'very', 'bye', 'knock', 'so'})
+    _RE_ARTICLE = re.compile(r'\b(a|an)(\s+)([A-Za-z][\w-]*)')
+    # Words starting with a vowel letter but a consonant sound, and vice versa
+    _CONSONANT_SOUND = re.compile(r'(?:uni|use|usu|ute|uti|uro|eu|ewe|one\b|once|ubiq|ufo)', re.IGNORECASE)
+    _VOWEL_SOUND = re.compile(r'(?:hour|honest|honou?r|heir)', re.IGNORECASE)
+    _RE_SENTENCE_START = re.compile(r'(?:^|(?<=[.!?])\s+)([a-z])')
+    _ABBREVIATIONS = frozenset({'e.g', 'i.e', 'etc', 'vs', 'mr', 'mrs', 'ms', 'dr', 'st', 'no', 'approx', 'p', 'pp'})
+    # (keyword, pattern, replacement, message, rule id); a rule only runs when its
+    # keyword occurs in the lowercased text
+    _CONFUSABLES = (
+        (' of', re.compile(r'\b(could|should|would|must|might)\s+of\b', re.IGNORECASE),
+         lambda m: f'{m.group(1)} have', 'Did you mean "have"?', 'WOULD_OF'),
+        ('then', re.compile(r'\b(more|less|better|worse|rather|other|greater|fewer|larger|smaller)\s+then\b',
+                            re.IGNORECASE),
+         lambda m: f'{m.group(1)} than', 'Did you mean "than" for a comparison?', 'THAN_THEN'),
+        ('their', re.compile(r'\btheir\s+(is|are|was|were)\b', re.IGNORECASE),
+         lambda m: f'there {m.group(1)}', 'Did you mean "there"?', 'THEIR_IS'),
+        ('your', re.compile(r'\byour\s+(welcome|right|wrong|going)\b', re.IGNORECASE),
+         lambda m: f"you're {m.group(1)}", 'Did you mean "you\'re"?', 'YOUR_YOU_RE'),
+        ('its', re.compile(r'\bits\s+(a|an|the|not|very|important|clear|true|time)\b', re.IGNORECASE),
+         lambda m: f"it's {m.group(1)}", 'Did you mean "it\'s" (it is)?', 'IT_IS'),
+        ('alot', re.compile(r'\balot\b', re.IGNORECASE),
+         lambda m: 'a lot', '"alot" is not a word; use "a lot".', 'ALOT'),
+        ('suppose ', re.compile(r'\b(is|was|are|were|be)\s+suppose\s+to\b', re.IGNORECASE),
+         lambda m: f'{m.group(1)} supposed to', 'Did you mean "supposed to"?', 'SUPPOSE_SUPPOSED'),
+    )
+    # Pronoun + verb disagreements; skipped after auxiliaries and causative or
+    # perception verbs where the verb is a bare infinitive ("did he have", "let it do").
+    _AGREEMENT = (
+        ('don', re.compile(r'\b(he|she|it)\s+(don\'t|dont)\b', re.IGNORECASE), "doesn't", 'HE_VERB_AGR'),
+        ('have', re.compile(r'\b(he|she|it)\s+(have)\b', re.IGNORECASE), 'has', 'HE_VERB_AGR'),
+        ('are', re.compile(r'\b(he|she|it)\s+(are)\b', re.IGNORECASE), 'is', 'HE_VERB_AGR'),
+        (' do', re.compile(r'\b(he|she|it)\s+(do)\b(?!\s+not)', re.IGNORECASE), 'does', 'HE_VERB_AGR'),
+        ('was', re.compile(r'\b(they|we|you)\s+(was)\b', re.IGNORECASE), 'were', 'NON3PRS_VERB'),
+        ('', re.compile(r'\b(they|we|you)\s+(is|has|does)\b', re.IGNORECASE), None, 'NON3PRS_VERB'),
+        ('i ', re.compile(r'\b(I)\s+(is|are)\b'), 'am', 'PRP_VBZ'),
+        ('', re.compile(r'\b(people|students|children)\s+(is|was|has)\b', re.IGNORECASE), None, 'NON3PRS_VERB'),
+    )
+    _PLURAL_FORMS = {'is': 'are', 'was': 'were', 'has': 'have', 'does': 'do'}
+    _RE_AUXILIARY_BEFORE = re.compile(
+        r'\b(?:did|does|do|will|would|can|could|should|may|might|must|shall|to|let|make|makes|made|help|'
+        r'helps|watch|saw|see|hear|heard)\s+$', re.IGNORECASE)
+
+    def check(self, text: str, profile: Optional[str] = None) -> List[GrammarMatch]:
+        matches = []
+        text_lower = text.lower()
+        self._doubled_words(text, matches)
+        self._articles(text, matches)
+        self._sentence_starts(text, matches)
+        self._confusables(text, text_lower, matches)
+        self._agreement(text, text_lower, matches)
+        matches.sort(key=lambda match: match.offset)
+        return matches
+
+    def _doubled_words(self, text, matches):
+        for m in self._RE_DOUBLED.finditer(text):
+            if m.group(1).lower() in self._DOUBLE_OK or m.group(1).isdigit():
+                continue
+            matches.append(GrammarMatch(m.start(), m.end() - m.start(), [m.group(1)],
+                                        'Possible typo: you repeated a word.', 'ENGLISH_WORD_REPEAT_RULE'))
+
+    def _articles(self, text, matches):
+        for m in self._RE_ARTICLE.finditer(text):
+            article, word = m.group(1), m.group(3)
+            if word.isupper() and len(word) > 1:
+                continue  # Acronyms depend on pronunciation (an FBI agent, a NATO plan)
+            vowel_sound = (word[0].lower() in 'aeiou' and not self._CONSONANT_SOUND.match(word)) \
+                or bool(self._VOWEL_SOUND.match(word))
+            expected = 'an' if vowel_sound else 'a'
+            if article.lower() != expected:
+                replacement = expected.capitalize() if article[0].isupper() else expected
+                matches.append(GrammarMatch(m.start(1), len(article), [replacement],
+                                            f'Use "{expected}" instead of "{article.lower()}" before "{word}".',
+                                            'EN_A_VS_AN'))
+
+    def _sentence_starts(self, text, matches):
+        for m in self._RE_SENTENCE_START.finditer(text):
+            start = m.start(1)
+            delimiter_end = start
+            while delimiter_end > 0 and text[delimiter_end - 1].isspace():
+                delimiter_end -= 1
+            if delimiter_end:
+                word_start = max(text.rfind(' ', 0, delimiter_end), text.rfind('\n', 0, delimiter_end)) + 1
+                previous_word = text[word_start:delimiter_end - 1].lower().strip('(')
+                if previous_word in self._ABBREVIATIONS or text.endswith('...', 0, delimiter_end):
+                    continue
+            word_end = start
+            while word_end < len(text) and (text[word_end].isalnum() or text[word_end] in "'-"):
+                word_end += 1
+            word = text[start:word_end]
+            if any(char.isupper() or char.isdigit() for char in word) or '.' in text[word_end:word_end + 1]:
+                continue  # iPhone, e.g., x.y
+            matches.append(GrammarMatch(start, len(word), [word[0].upper() + word[1:]],
+                                        'This sentence does not start with an uppercase letter.',
+                                        'UPPERCASE_SENTENCE_START'))
+
+    def _confusables(self, text, text_lower, matches):
+        for keyword, pattern, replacement, message, rule_id in self._CONFUSABLES:
+            if keyword not in text_lower:
+                continue
+            for m in pattern.finditer(text):
+                suggestion = replacement(m)
+                if m.group()[0].isupper():
+                    suggestion = suggestion[0].upper() + suggestion[1:]
+                matches.append(GrammarMatch(m.start(), m.end() - m.start(), [suggestion], message, rule_id))
+
+    def _agreement(self, text, text_lower, matches):
+        for keyword, pattern, verb, rule_id in self._AGREEMENT:
+            if keyword not in text_lower:
+                continue
+            for m in pattern.finditer(text):
+                if self._RE_AUXILIARY_BEFORE.search(text, max(0, m.start() - 12), m.start()):
+                    continue
+                found = m.group(2)
+                replacement = verb or self._PLURAL_FORMS[found.lower()]
+                matches.append(GrammarMatch(m.start(2), len(found), [replacement],
+                                            f'The verb "{found}" does not agree with "{m.group(1)}".', rule_id))
+
+
+def _utf16_offsets_to_indices(text: str) -> Optional[List[int]]:
+    """
+    v14.5.0: LanguageTool reports offsets in UTF-16 code units; map them to
+    Python string indices when the text contains characters outside the BMP.
+    """
+    if not any(ord(char) > 0xFFFF for char in text):
+        return None
+    indices = []
+    for index, char in enumerate(text):
+        indices.append(index)
+        if ord(char) > 0xFFFF:
+            indices.append(index)
+    indices.append(len(text))
+    return indices
+
+
+class LanguageToolServerClient:
+    """v14.5.0: Keep-alive HTTP client for one LanguageTool server (one requests.Session per thread)."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        url = url.rstrip('/')
+        self.url = url if url.endswith('/v2') else url + '/v2'
+        self.timeout = timeout
+        self.in_flight = 0
+        self.checks = 0
+        self.failures = 0
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def check(self, text: str, params: Dict[str, str]) -> Tuple[List[GrammarMatch], str]:
+        """Matches for the text plus the server's LanguageTool version."""
+        response = self.session.post(f'{self.url}/check', data=dict(params, text=text), timeout=self.timeout)
+        response.raise_for_status()
+        payload = response.json()
+        indices = _utf16_offsets_to_indices(text)
+        matches = []
+        for item in payload.get('matches', []):
+            offset, length = item['offset'], item['length']
+            if indices is not None:
+                end = indices[offset + length]
+                offset = indices[offset]
+                length = end - offset
+            rule = item.get('rule', {})
+            matches.append(GrammarMatch(offset, length, [r['value'] for r in item.get('replacements', [])],
+                                        item.get('message', ''), rule.get('id', ''),
+                                        rule.get('category', {}).get('id', '')))
+        return matches, payload.get('software', {}).get('version', '')
+
+    def alive(self) -> bool:
+        try:
+            return self.session.get(f'{self.url}/languages', timeout=2).ok
+        except requests.RequestException:
+            return False
+
+
+class _HeapCappedLanguageTool(language_tool_python.LanguageTool):
+    """
+    v14.5.0: Local LanguageTool server whose JVM gets -Xmx<heap> on its own
+    command line, so starting one leaves JAVA_TOOL_OPTIONS (process-wide)
+    untouched for other threads.
+    """
+
+    def __init__(self, language: str, heap: str):
+        self._heap = heap
+        super().__init__(language)
+
+    # language_tool_python builds the server command from this object when it
+    # starts the server; wrap its get_server_cmd as it is assigned
+    @property
+    def _local_language_tool(self):
+        return self.__dict__.get('_local_language_tool')
+
+    @_local_language_tool.setter
+    def _local_language_tool(self, local):
+        if local is not None:
+            server_cmd = local.get_server_cmd
+            local.get_server_cmd = lambda *args, **kwargs: self._with_heap(server_cmd(*args, **kwargs))
+        self.__dict__['_local_language_tool'] = local
+
+    def _with_heap(self, cmd: List[str]) -> List[str]:
+        return cmd[:1] + [f'-Xmx{self._heap}'] + cmd[1:]
+
+
+class LanguageToolPool(GrammarBackend):
+    """
+    v14.5.0: Load-balanced pool of LanguageTool servers, usable wherever a
+    language_tool_python.LanguageTool is (it exposes check() and the rule-set
+    attributes). Each check goes to the server with the fewest requests in
+    flight; a failed server is skipped and the check retried on the next one.
+
+    Servers come from DOUESSAY_LT_SERVERS (comma-separated URLs, e.g. a pool
+    started once for all workers) or, with DOUESSAY_LT_POOL_SIZE=N, are started
+    locally with a heap cap of DOUESSAY_LT_HEAP each (default 512m) and
+    published in a registry file so other worker processes on the host reuse
+    them instead of launching their own JVMs. The servers stop with the
+    process that started them; when they stop answering, the other processes
+    re-read the registry and the first one to find it stale starts new ones.
+    """
+    name = 'languagetool'
+    supports_profiles = True
+    DEFAULT_HEAP = '512m'
+    REATTACH_INTERVAL = 5.0  # Seconds between registry re-reads after server failures
+
+    def __init__(self, urls: List[str], language: str = 'en-US', timeout: float = 30.0, servers: List = ()):
+        if not urls:
+            raise ValueError("LanguageToolPool needs at least one server URL")
+        self.clients = [LanguageToolServerClient(url, timeout) for url in urls]
+        self.language = language
+        self.timeout = timeout
+        self.version = ''
+        self.enabled_rules = set()
+        self.disabled_rules = set()
+        self.enabled_categories = set()
+        self.disabled_categories = set()
+        self.enabled_rules_only = False
+        self._servers = list(servers)  # Local LanguageTool objects owning their JVMs
+        self._registry = None  # (path, size, heap) when the servers come from the shared registry
+        self._heap = None  # JVM heap cap of servers started by start_local
+        self._reattached_at = 0.0
+        self._exit_hook = False
+        self._lock = threading.Lock()
+        self._next = 0
+
+    @classmethod
+    def start_local(cls, size: int, language: str = 'en-US', heap: str = DEFAULT_HEAP) -> 'LanguageToolPool':
+        """Start `size` local LanguageTool servers, each JVM capped at `heap`."""
+        servers = cls._start_servers(size, language, heap)
+        pool = cls([server.url for server in servers], language=language, servers=servers)
+        pool._heap = heap
+        return pool
+
+    @staticmethod
+    def _start_servers(size: int, language: str, heap: Optional[str]) -> List:
+        servers = []
+        try:
+            for _ in range(size):
+                servers.append(_HeapCappedLanguageTool(language, heap) if heap
+                               else language_tool_python.LanguageTool(language))
+        except Exception:
+            for server in servers:
+                server.close()
+            raise
+        return servers
+
+    @classmethod
+    def from_env(cls, language: str = 'en-US') -> Optional['LanguageToolPool']:
+        """Pool configured by DOUESSAY_LT_SERVERS / DOUESSAY_LT_POOL_SIZE, or None for a single LanguageTool."""
+        urls = [url.strip() for url in os.environ.get('DOUESSAY_LT_SERVERS', '').split(',') if url.strip()]
+        if urls:
+            return cls(urls, language=language)
+        size = int(os.environ.get('DOUESSAY_LT_POOL_SIZE', '0') or 0)
+        if size <= 0:
+            return None
+        registry = os.environ.get('DOUESSAY_LT_POOL_REGISTRY',
+                                  os.path.join(os.path.expanduser('~'), '.cache', 'douessay', 'lt_pool.json'))
+        heap = os.environ.get('DOUESSAY_LT_HEAP', cls.DEFAULT_HEAP)
+        urls, servers = cls._resolve_registry(registry, language, size, heap)
+        pool = cls(urls, language=language, servers=servers)
+        pool._registry = (registry, size, heap)
+        if servers:
+            pool._close_at_exit()
+        return pool
+
+    @staticmethod
+    @contextmanager
+    def _registry_lock(registry: str):
+        os.makedirs(os.path.dirname(os.path.abspath(registry)), exist_ok=True)
+        with open(registry + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_registry(registry: str, language: str) -> List[str]:
+        try:
+            with open(registry) as f:
+                published = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return list(published.get('urls') or []) if published.get('language') == language else []
+
+    @staticmethod
+    def _publish(registry: str, language: str, urls: List[str]):
+        with open(registry, 'w') as f:
+            json.dump({'language': language, 'urls': urls, 'pid': os.getpid()}, f)
+
+    @classmethod
+    def _resolve_registry(cls, registry: str, language: str, size: int, heap: str) -> Tuple[List[str], List]:
+        """Published URLs when they all answer, else new local servers, published for the other processes.
+
+        Returns (urls, servers started by this call).
+        """
+        with cls._registry_lock(registry):
+            urls = cls._read_registry(registry, language)
+            if urls and all(LanguageToolServerClient(url).alive() for url in urls):
+                return urls, []
+            servers = cls._start_servers(size, language, heap)
+            urls = [server.url for server in servers]
+            cls._publish(registry, language, urls)
+            return urls, servers
+
+    def _reattach(self) -> bool:
+        """Re-read the registry after a server stopped answering; True when the pool switched servers.
+
+        The owning process may have restarted its servers or exited; in the
+        latter case the first process to notice starts and publishes new ones
+        under the registry lock. At most once per REATTACH_INTERVAL seconds.
+        """
+        with self._lock:
+            if self._registry is None or time.monotonic() - self._reattached_at < self.REATTACH_INTERVAL:
+                return False
+            self._reattached_at = time.monotonic()
+        registry, size, heap = self._registry
+        try:
+            urls, servers = self._resolve_registry(registry, self.language, size, heap)
+        except Exception as e:
+            logger.warning(f"Failed to re-resolve the LanguageTool pool registry: {e}")
+            return False
+        switched, retired = self._swap(urls, servers)
+        for server in retired:  # Ours but no longer published, so already dead
+            server.close()
+        return switched
+
+    def _swap(self, urls: List[str], servers: List = ()) -> Tuple[bool, List]:
+        """Point the pool at `urls`, adopting newly started `servers`.
+
+        Returns whether the URLs changed and the owned servers no longer in use.
+        """
+        clients = [LanguageToolServerClient(url, self.timeout) for url in urls]
+        with self._lock:
+            switched = [c.url for c in clients] != [c.url for c in self.clients]
+            if switched:
+                self.clients = clients
+                self._next = 0
+            in_use = {c.url for c in self.clients}
+            owned = self._servers + list(servers)
+            self._servers = [s for s in owned if LanguageToolServerClient(s.url).url in in_use]
+            retired = [s for s in owned if s not in self._servers]
+        if servers and self._registry is not None:
+            self._close_at_exit()
+        return switched, retired
+
+    def _close_at_exit(self):
+        if not self._exit_hook:
+            self._exit_hook = True
+            atexit.register(self.close)
+
+    def restart(self, grace_seconds: float = 30.0) -> bool:
+        """Restart the servers behind the pool; True when it switched to new ones.
+
+        Only the process that owns the published servers starts new JVMs: it
+        publishes them under the registry lock, switches over and stops the old
+        ones after grace_seconds so in-flight checks (here and in attached
+        processes) can finish. Attached processes re-read the registry instead,
+        so the host keeps one set of servers. Remote servers are left alone.
+        """
+        if self._registry is None:
+            if not self._servers:
+                return False  # DOUESSAY_LT_SERVERS: restarted by whoever runs them
+            servers = self._start_servers(len(self._servers), self.language, self._heap)
+        else:
+            registry, size, heap = self._registry
+            with self._registry_lock(registry):
+                published = [LanguageToolServerClient(url).url for url in self._read_registry(registry, self.language)]
+                owner = bool(self._servers) and published == [LanguageToolServerClient(s.url).url
+                                                               for s in self._servers]
+                if owner:
+                    servers = self._start_servers(size, self.language, heap)
+                    self._publish(registry, self.language, [server.url for server in servers])
+            if not owner:
+                with self._lock:
+                    self._reattached_at = 0.0
+                return self._reattach()
+        switched, retired = self._swap([server.url for server in servers], servers)
+        for server in retired:
+            timer = threading.Timer(grace_seconds, server.close)
+            timer.daemon = True
+            timer.start()
+        return switched
+
+    def _params(self, profile: Optional[str] = None) -> Dict[str, str]:
+        params = {'language': self.language}
+        definition = GRAMMAR_RULE_PROFILES[profile] if profile else {}
+        if definition:
+            params['enabledCategories'] = ','.join(definition['enabled_categories'])
+            if definition.get('enabled_only'):
+                params['enabledOnly'] = 'true'
+            return params
+        if self.disabled_rules:
+            params['disabledRules'] = ','.join(sorted(self.disabled_rules))
+        if self.enabled_rules:
+            params['enabledRules'] = ','.join(sorted(self.enabled_rules))
+        if self.enabled_rules_only:
+            params['enabledOnly'] = 'true'
+        if self.disabled_categories:
+            params['disabledCategories'] = ','.join(sorted(self.disabled_categories))
+        if self.enabled_categories:
+            params['enabledCategories'] = ','.join(sorted(self.enabled_categories))
+        return params
+
+    def _acquire(self, exclude=()) -> Optional[LanguageToolServerClient]:
+        with self._lock:
+            count = len(self.clients)
+            best = None
+            for step in range(count):
+                client = self.clients[(self._next + step) % count]
+                if client in exclude:
+                    continue
+                if best is None or client.in_flight < best.in_flight:
+                    best = client
+            if best is not None:
+                self._next = (self.clients.index(best) + 1) % count
+                best.in_flight += 1
+            return best
+
+    def _release(self, client: LanguageToolServerClient, failed: bool):
+        with self._lock:
+            client.in_flight -= 1
+            client.checks += 1
+            client.failures += int(failed)
+
+    def check(self, text: str, profile: Optional[str] = None) -> List[GrammarMatch]:
+        """Check text with the pool's rule set, or with a GRAMMAR_RULE_PROFILES profile."""
+        params = self._params(profile)
+        tried = []
+        while True:
+            client = self._acquire(exclude=tried)
+            if client is None:
+                if self._reattach():
+                    tried = []
+                    continue
+                raise requests.ConnectionError(f"All {len(self.clients)} LanguageTool servers failed")
+            try:
+                matches, version = client.check(text, params)
+            except (requests.RequestException, ValueError) as e:
+                self._release(client, failed=True)
+                logger.warning(f"LanguageTool server {client.url} failed: {e}")
+                tried.append(client)
+                continue
+            self._release(client, failed=False)
+            self.version = version or self.version
+            return matches
+
+    def server_pids(self) -> List[int]:
+        """PIDs of the local JVMs this pool started (none for remote servers)."""
+        pids = []
+        for server in self._servers:
+            process = getattr(server, '_server', None)
+            if process is not None and getattr(process, 'pid', None):
+                pids.append(process.pid)
+        return pids
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'servers': [{'url': c.url, 'checks': c.checks, 'failures': c.failures, 'in_flight': c.in_flight}
+                            for c in self.clients],
+                'version': self.version
+            }
+
+    def close(self):
+        for server in self._servers:
+            try:
+                server.close()
+            except Exception as e:
+                logger.warning(f"Failed to stop LanguageTool server: {e}")
+        self._servers = []
+
+
+def _process_rss_mb(pid: int) -> Optional[float]:
+    """v14.5.0: Resident memory of a process in MB (Linux /proc), or None when unknown."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class GrammarSupervisor(GrammarBackend):
+    """
+    v14.5.0: Health supervisor around a grammar backend (normally the
+    LanguageTool pool). Tracks per-check latency and errors over a rolling
+    window plus the RSS of the JVMs it owns, and recycles the backend after
+    max_checks checks or when p95 latency, error rate or RSS cross their
+    thresholds. Recycling runs on a background thread while checks continue
+    on the current backend: backends with restart() (the pool) restart their
+    servers in place, others are replaced through the factory. The previous
+    servers are stopped after a grace period so in-flight checks can finish.
+    health() exposes the state.
+    """
+    WINDOW = 200
+    MIN_SAMPLES = 20
+    RSS_CHECK_EVERY = 50
+    RETIRE_GRACE_SECONDS = 30.0
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, backend: GrammarBackend, factory=None, max_checks: int = 10000,
+                 max_p95_ms: float = 15000.0, max_error_rate: float = 0.5, max_rss_mb: float = 2048.0,
+                 rss_probe=None):
+        self.backend = backend
+        self.factory = factory  # Builds a replacement backend (fresh servers) when recycling
+        self.max_checks = max_checks
+        self.max_p95_ms = max_p95_ms
+        self.max_error_rate = max_error_rate
+        self.max_rss_mb = max_rss_mb
+        self.rss_probe = rss_probe or self._backend_rss_mb
+        self.total_checks = 0
+        self.total_errors = 0
+        self.recycles = 0
+        self.last_recycle_reason = None
+        self.last_error = None
+        self.rss_mb = None
+        self._window = deque(maxlen=self.WINDOW)  # (latency_ms, failed)
+        self._checks_since_recycle = 0
+        self._recycling = False
+        self._recycler = None  # Background thread of the running recycle
+        self._generation = 0  # Bumped by each recycle; samples from older backends are not windowed
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, backend: GrammarBackend, factory=None) -> 'GrammarSupervisor':
+        env = os.environ.get
+        return cls(backend, factory,
+                   max_checks=int(env('DOUESSAY_LT_RECYCLE_CHECKS', '10000')),
+                   max_p95_ms=float(env('DOUESSAY_LT_MAX_P95_MS', '15000')),
+                   max_error_rate=float(env('DOUESSAY_LT_MAX_ERROR_RATE', '0.5')),
+                   max_rss_mb=float(env('DOUESSAY_LT_MAX_RSS_MB', '2048')))
+
+    @classmethod
+    def shared(cls, factory) -> 'GrammarSupervisor':
+        """Process-wide supervised backend so every DouEssay instance shares one set of JVMs."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_env(factory(), factory)
+            return cls._shared
+
+    # Rule-set attributes, version and pool stats come from the supervised backend
+    def __getattr__(self, name):
+        if name.startswith('__') or name == 'backend':
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    @property
+    def name(self):
+        return getattr(self.backend, 'name', type(self.backend).__name__)
+
+    @property
+    def supports_profiles(self):
+        return getattr(self.backend, 'supports_profiles', False)
+
+    @property
+    def version(self):
+        return getattr(self.backend, 'version', '')
+
+    def check(self, text: str, profile: Optional[str] = None):
+        backend, generation = self.backend, self._generation
+        start = time.perf_counter()
+        try:
+            if profile and getattr(backend, 'supports_profiles', False):
+                matches = backend.check(text, profile=profile)
+            else:
+                matches = backend.check(text)
+        except Exception as e:
+            self._record((time.perf_counter() - start) * 1000, e, generation)
+            raise
+        self._record((time.perf_counter() - start) * 1000, None, generation)
+        return matches
+
+    def _record(self, latency_ms: float, error: Optional[Exception], generation: int):
+        with self._lock:
+            self.total_checks += 1
+            if error is not None:
+                self.total_errors += 1
+                self.last_error = f'{type(error).__name__}: {error}'
+            if generation != self._generation:
+                return  # Finished on the backend a recycle has just replaced
+            self._window.append((latency_ms, error is not None))
+            self._checks_since_recycle += 1
+            if self._checks_since_recycle % self.RSS_CHECK_EVERY == 0:
+                self.rss_mb = self.rss_probe()
+            reason = self._breach()
+            if reason is None or self._recycling:
+                return
+            if self.factory is None and getattr(self.backend, 'restart', None) is None:
+                return
+            self._recycling = True
+            # Starting JVMs takes seconds; keep it off the request thread
+            self._recycler = threading.Thread(target=self._recycle_in_background, args=(reason,),
+                                              name='grammar-recycle', daemon=True)
+            self._recycler.start()
+
+    def _recycle_in_background(self, reason: str):
+        try:
+            self.recycle(reason)
+        finally:
+            self._recycling = False
+
+    def _breach(self) -> Optional[str]:
+        if self._checks_since_recycle >= self.max_checks:
+            return f'{self._checks_since_recycle} checks since last restart'
+        if len(self._window) >= self.MIN_SAMPLES:
+            error_rate = sum(failed for _, failed in self._window) / len(self._window)
+            if error_rate > self.max_error_rate:
+                return f'error rate {error_rate:.0%}'
+            p95 = self._percentile(95)
+            if p95 > self.max_p95_ms:
+                return f'p95 latency {p95:.0f}ms'
+        if self.rss_mb is not None and self.rss_mb > self.max_rss_mb:
+            return f'RSS {self.rss_mb:.0f}MB'
+        return None
+
+    def _percentile(self, percent: float) -> float:
+        latencies = sorted(latency for latency, _ in self._window)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))]
+
+    def _backend_rss_mb(self) -> Optional[float]:
+        pids = getattr(self.backend, 'server_pids', lambda: [])()
+        sizes = [size for size in (_process_rss_mb(pid) for pid in pids) if size is not None]
+        return sum(sizes) if sizes else None
+
+    def recycle(self, reason: str = 'manual'):
+        """Restart the backend's servers, or replace the backend with a fresh one from the factory."""
+        logger.warning(f"Recycling grammar backend: {reason}")
+        restart = getattr(self.backend, 'restart', None)
+        try:
+            if restart is not None:
+                restart(self.RETIRE_GRACE_SECONDS)  # Retires its old servers itself
+                replacement = self.backend
+            else:
+                replacement = self.factory()
+        except Exception as e:
+            logger.error(f"Grammar backend restart failed: {e}")
+            with self._lock:
+                self.last_error = f'restart failed: {e}'
+                self._checks_since_recycle = 0  # Back off until the next breach
+            return
+        with self._lock:
+            retired, self.backend = self.backend, replacement
+            self._generation += 1
+            self.recycles += 1
+            self.last_recycle_reason = reason
+            self._checks_since_recycle = 0
+            self._window.clear()
+            self.rss_mb = None
+        close = getattr(retired, 'close', None)
+        if close is not None and retired is not replacement:
+            timer = threading.Timer(self.RETIRE_GRACE_SECONDS, close)
+            timer.daemon = True
+            timer.start()
+
+    def health(self) -> Dict:
+        with self._lock:
+            samples = len(self._window)
+            error_rate = sum(failed for _, failed in self._window) / samples if samples else 0.0
+            p50, p95 = self._percentile(50), self._percentile(95)
+            if self._recycling:
+                state = 'recycling'
+            elif samples and error_rate == 1.0:
+                state = 'down'
+            elif samples >= self.MIN_SAMPLES and (error_rate > self.max_error_rate / 2 or p95 > self.max_p95_ms / 2):
+                state = 'degraded'
+            else:
+                state = 'healthy'
+            return {
+                'state': state,
+                'backend': self.name,
+                'total_checks': self.total_checks,
+                'total_errors': self.total_errors,
+                'checks_since_recycle': self._checks_since_recycle,
+                'error_rate': round(error_rate, 3),
+                'p50_ms': round(p50, 1),
+                'p95_ms': round(p95, 1),
+                'rss_mb': round(self.rss_mb, 1) if self.rss_mb is not None else None,
+                'recycles': self.recycles,
+                'last_recycle_reason': self.last_recycle_reason,
+                'last_error': self.last_error
+            }
+
+    def close(self):
+        close = getattr(self.backend, 'close', None)
+        if close is not None:
+            close()
+
+
+def _create_language_tool_backend() -> GrammarBackend:
+    """
+    v14.5.0: LanguageTool backend for the supervisor: the configured server pool
+    (see LanguageToolPool.from_env) or one local server wrapped in a pool of
+    one, which adds keep-alive connections and per-check rule profiles.
+    """
+    pool = LanguageToolPool.from_env()
+    if pool is None:
+        tool = language_tool_python.LanguageTool('en-US')
+        pool = LanguageToolPool([tool.url], servers=[tool])
+        pool.version = getattr(tool, 'language_tool_download_version', '') or ''
+    pool.check('Warm up.')  # Also learns the servers' LanguageTool version
+    return pool
+
+
+SUPABASE_TIMEOUT_SECONDS = float(os.environ.get('DOUESSAY_SUPABASE_TIMEOUT', '3'))
+# v14.5.0: While Supabase is unreachable: 'cached' grades with recently validated
+# licenses and queues usage increments; 'deny' rejects every request (legacy)
+SUPABASE_DEGRADED_POLICY = os.environ.get('DOUESSAY_SUPABASE_DEGRADED_POLICY', 'cached').lower()
+LICENSE_CACHE_TTL_SECONDS = float(os.environ.get('DOUESSAY_LICENSE_CACHE_TTL', '86400'))
+# v14.5.0: Rejected keys are answered locally for this long
+INVALID_KEY_TTL_SECONDS = float(os.environ.get('DOUESSAY_INVALID_KEY_TTL', '300'))
+INVALID_KEY_CACHE_SIZE = 10000
+# v14.5.0: Rebuild interval of the Bloom filter of known keys (0 disables it)
+LICENSE_FILTER_REFRESH_SECONDS = float(os.environ.get('DOUESSAY_LICENSE_FILTER_REFRESH', '0'))
+_supabase_executor = None
+_supabase_executor_lock = threading.Lock()
+
+
+def _get_supabase_executor() -> ThreadPoolExecutor:
+    """v14.5.0: Process-wide threads that run Supabase calls under a deadline."""
+    global _supabase_executor
+    with _supabase_executor_lock:
+        if _supabase_executor is None:
+            _supabase_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='supabase')
+        return _supabase_executor
+
+
+class ServiceUnavailableError(Exception):
+    """v14.5.0: A guarded dependency failed, timed out or has its circuit open."""
+
+
+class UsageNotRecordedError(Exception):
+    """v14.5.0: A request's usage could not be recorded, so it was not graded."""
+
+
+class CircuitOpenError(ServiceUnavailableError):
+    """v14.5.0: Call rejected without trying because the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    v14.5.0: Deadline plus circuit breaker for calls to an external service.
+    The deadline itself belongs in the client (the Supabase client is created
+    with an HTTP timeout of SUPABASE_TIMEOUT_SECONDS); waiting on the executor
+    is only a backstop, at backstop seconds (default twice timeout), for a
+    client that fails to give up. A running call cannot be cancelled, so calls
+    still running past the backstop are logged and counted as overdue until
+    they return. After failure_threshold consecutive failures or timeouts the
+    circuit opens and calls fail fast with CircuitOpenError; after
+    reset_seconds a single trial call is let through (half-open) and closes
+    the circuit on success.
+    Exceptions in passthrough (e.g. PostgREST errors: the service answered)
+    reach the caller unchanged and do not count as failures.
+    Breakers are shared per name so every LicenseManager sees the same state.
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, name: str, timeout: float = 3.0, failure_threshold: int = 5,
+                 reset_seconds: float = 30.0, passthrough: Tuple = (), clock=time.monotonic,
+                 backstop: Optional[float] = None):
+        self.name = name
+        self.timeout = timeout
+        self.backstop = 2 * timeout if backstop is None else backstop
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.passthrough = passthrough
+        self.clock = clock
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_timeouts = 0
+        self.rejected = 0
+        self.opened = 0
+        self.overdue = 0  # Calls past the backstop that are still running
+        self.total_overdue = 0
+        self.last_error = None
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str) -> 'CircuitBreaker':
+        env = os.environ.get
+        return cls(name, timeout=SUPABASE_TIMEOUT_SECONDS,
+                   failure_threshold=int(env('DOUESSAY_SUPABASE_BREAKER_FAILURES', '5')),
+                   reset_seconds=float(env('DOUESSAY_SUPABASE_BREAKER_RESET', '30')),
+                   passthrough=(PostgrestAPIError,))
+
+    @classmethod
+    def shared(cls, name: str) -> 'CircuitBreaker':
+        with cls._shared_lock:
+            if name not in cls._shared:
+                cls._shared[name] = cls.from_env(name)
+            return cls._shared[name]
+
+    def _admit(self) -> bool:
+        with self._lock:
+            if self.state == 'open' and self.clock() - self._opened_at >= self.reset_seconds:
+                self.state = 'half_open'
+            if self.state == 'half_open':
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    return False
+                self._trial_in_flight = True
+            elif self.state == 'open':
+                self.rejected += 1
+                return False
+            self.total_calls += 1
+            return True
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn, waiting at most the backstop; raises ServiceUnavailableError on failure."""
+        if not self._admit():
+            raise CircuitOpenError(f'{self.name} circuit open')
+        future = _get_supabase_executor().submit(fn, *args, **kwargs)
+        try:
+            result = future.result(timeout=self.backstop)
+        except self.passthrough:
+            self._success()
+            raise
+        except FuturesTimeoutError:
+            if not future.cancel():
+                with self._lock:
+                    self.overdue += 1
+                    self.total_overdue += 1
+                future.add_done_callback(self._overdue_done)
+                logger.warning(f"{self.name} call still running after {self.backstop}s; "
+                               f"its executor thread stays busy until the client gives up")
+            self._failure(f'timed out after {self.backstop}s', timed_out=True)
+            raise ServiceUnavailableError(f'{self.name} timed out after {self.backstop}s')
+        except Exception as e:
+            self._failure(f'{type(e).__name__}: {e}')
+            raise ServiceUnavailableError(f'{self.name} call failed: {e}') from e
+        self._success()
+        return result
+
+    def _overdue_done(self, future):
+        with self._lock:
+            self.overdue -= 1
+
+    def _success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def _failure(self, error: str, timed_out: bool = False):
+        with self._lock:
+            self.total_failures += 1
+            self.total_timeouts += timed_out
+            self.consecutive_failures += 1
+            self.last_error = error
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                if self.state != 'open':
+                    logger.warning(f"{self.name} circuit opened: {error}")
+                    self.opened += 1
+                self.state = 'open'
+                self._opened_at = self.clock()
+            self._trial_in_flight = False
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            retry_in = self.reset_seconds - (self.clock() - self._opened_at) if self.state == 'open' else 0.0
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'total_calls': self.total_calls,
+                'total_failures': self.total_failures,
+                'total_timeouts': self.total_timeouts,
+                'rejected': self.rejected,
+                'opened': self.opened,
+                'overdue_calls': self.overdue,
+                'total_overdue': self.total_overdue,
+                'retry_in_seconds': round(max(0.0, retry_in), 1),
+                'last_error': self.last_error
+            }
+
+
+class BloomFilter:
+    """
+    v14.5.0: Fixed-size Bloom filter over strings. Membership tests never give
+    false negatives; false positives occur at about error_rate. Positions come
+    from double hashing one SHA-256 digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_items(cls, items, error_rate: float = 0.001) -> 'BloomFilter':
+        items = list(items)
+        bloom = cls(len(items), error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class LicenseStore:
+    """
+    v14.5.0: Storage behind LicenseManager: the licenses and usage tables plus
+    the subsystem metrics sink. Rows use the Supabase column names.
+    """
+    name = 'base'
+
+    def get_license(self, license_key: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_usage(self, license_key: str, usage_date: str) -> int:
+        raise NotImplementedError
+
+    def add_usage(self, license_key: str, usage_date: str, count: int = 1) -> int:
+        """Add count to the day's usage and return the new total."""
+        raise NotImplementedError
+
+    def insert_metrics(self, row: Dict) -> None:
+        raise NotImplementedError
+
+    def iter_license_keys(self):
+        """Every license key in the store (feeds the known-key Bloom filter)."""
+        raise NotImplementedError
+
+
+class SupabaseLicenseStore(LicenseStore):
+    """v14.5.0: Supabase tables; every query runs under the circuit breaker."""
+    name = 'supabase'
+
+    def __init__(self, client, breaker: CircuitBreaker):
+        self.client = client
+        self.breaker = breaker
+
+    def execute(self, query):
+        """Execute a Supabase query under the shared deadline and circuit breaker."""
+        return self.breaker.call(query.execute)
+
+    def get_license(self, license_key: str) -> Optional[Dict]:
+        response = self.execute(self.client.table('licenses').select('*').eq('license_key', license_key))
+        return response.data[0] if response.data else None
+
+    def get_usage(self, license_key: str, usage_date: str) -> int:
+        response = self.execute(self.client.table('usage').select('*').eq('license_key', license_key).eq('usage_date', usage_date))
+        return response.data[0]['usage_count'] if response.data else 0
+
+    def add_usage(self, license_key: str, usage_date: str, count: int = 1) -> int:
+        # PostgREST has no increment without a stored procedure: read, then write
+        usage_response = self.execute(self.client.table('usage').select('*').eq('license_key', license_key).eq('usage_date', usage_date))
+        current_count = usage_response.data[0]['usage_count'] if usage_response.data else 0
+        if usage_response.data:
+            self.execute(self.client.table('usage').update({'usage_count': current_count + count}).eq('license_key', license_key).eq('usage_date', usage_date))
+        else:
+            self.execute(self.client.table('usage').insert({
+                'license_key': license_key,
+                'usage_date': usage_date,
+                'usage_count': count
+            }))
+        return current_count + count
+
+    def insert_metrics(self, row: Dict) -> None:
+        self.execute(self.client.table('subsystem_metrics').insert(row))
+
+    def iter_license_keys(self, page_size: int = 1000):
+        # Keyset pagination on the primary key: each page starts after the last key
+        # seen, so keys issued while paging neither shift pages nor get skipped
+        last = None
+        while True:
+            query = self.client.table('licenses').select('license_key').order('license_key').limit(page_size)
+            if last is not None:
+                query = query.gt('license_key', last)
+            response = self.execute(query)
+            for row in response.data:
+                yield row['license_key']
+            if len(response.data) < page_size:
+                return
+            last = response.data[-1]['license_key']
+
+
+class SQLiteLicenseStore(LicenseStore):
+    """
+    v14.5.0: Local SQLite implementation of the licenses and usage tables for
+    offline use and single-machine load tests. WAL mode lets graders read while
+    another process writes; each thread keeps its own connection (and so its
+    own prepared-statement cache), and usage increments are a single UPSERT,
+    so concurrent graders never lose a count.
+    """
+    name = 'sqlite'
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS licenses (license_key TEXT PRIMARY KEY, user_type TEXT NOT NULL, '
+        'expires_at TEXT NOT NULL, is_active INTEGER NOT NULL DEFAULT 1)',
+        'CREATE TABLE IF NOT EXISTS usage (license_key TEXT NOT NULL, usage_date TEXT NOT NULL, '
+        'usage_count INTEGER NOT NULL, PRIMARY KEY (license_key, usage_date)) WITHOUT ROWID',
+        'CREATE TABLE IF NOT EXISTS subsystem_metrics (essay_id TEXT, timestamp TEXT, version TEXT, metrics TEXT)',
+    )
+    _SELECT_LICENSE = 'SELECT license_key, user_type, expires_at, is_active FROM licenses WHERE license_key = ?'
+    _SELECT_USAGE = 'SELECT usage_count FROM usage WHERE license_key = ? AND usage_date = ?'
+    _ADD_USAGE = ('INSERT INTO usage (license_key, usage_date, usage_count) VALUES (?, ?, ?) '
+                  'ON CONFLICT (license_key, usage_date) DO UPDATE SET usage_count = usage_count + excluded.usage_count '
+                  'RETURNING usage_count')
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        for statement in self._SCHEMA:
+            conn.execute(statement)
+
+    @classmethod
+    def from_env(cls) -> 'SQLiteLicenseStore':
+        return cls(os.environ.get('DOUESSAY_LICENSE_DB',
+                                  os.path.join(os.path.expanduser('~'), '.cache', 'douessay', 'licenses.sqlite3')))
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit: every statement is its own transaction
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, cached_statements=64)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get_license(self, license_key: str) -> Optional[Dict]:
+        row = self._connection().execute(self._SELECT_LICENSE, (license_key,)).fetchone()
+        if row is None:
+            return None
+        return {'license_key': row[0], 'user_type': row[1], 'expires_at': row[2], 'is_active': bool(row[3])}
+
+    def get_usage(self, license_key: str, usage_date: str) -> int:
+        row = self._connection().execute(self._SELECT_USAGE, (license_key, usage_date)).fetchone()
+        return row[0] if row else 0
+
+    def add_usage(self, license_key: str, usage_date: str, count: int = 1) -> int:
+        return self._connection().execute(self._ADD_USAGE, (license_key, usage_date, count)).fetchone()[0]
+
+    def insert_metrics(self, row: Dict) -> None:
+        self._connection().execute(
+            'INSERT INTO subsystem_metrics (essay_id, timestamp, version, metrics) VALUES (?, ?, ?, ?)',
+            (row['essay_id'], row['timestamp'], row['version'], row['metrics']))
+
+    def iter_license_keys(self):
+        for (license_key,) in self._connection().execute('SELECT license_key FROM licenses'):
+            yield license_key
+
+    def add_license(self, license_key: str, user_type: str, expires_at: Optional[str] = None,
+                    is_active: bool = True) -> None:
+        """Create or replace a license (expires in a year by default)."""
+        expires_at = expires_at or (datetime.now() + timedelta(days=365)).isoformat()
+        self._connection().execute(
+            'INSERT OR REPLACE INTO licenses (license_key, user_type, expires_at, is_active) VALUES (?, ?, ?, ?)',
+            (license_key, user_type, expires_at, int(is_active)))
+
+
 class LicenseManager:
+    _offline_state = {}  # v14.5.0: Store location -> cached licenses, queued usage and key filters
+
     def __init__(self):
         self.supabase_url = os.environ.get('SUPABASE_URL')
         self.supabase_key = os.environ.get('SUPABASE_KEY')
         
+        # v14.5.0: Breaker and degraded-mode state shared by every instance in the process
+        self.breaker = CircuitBreaker.shared(f'supabase:{self.supabase_url}')
+        self.client = None  # No client in test/offline mode
+        self.store = None  # v14.5.0: LicenseStore; None grants the offline default license
+        if os.environ.get('DOUESSAY_LICENSE_BACKEND', 'supabase').lower() == 'sqlite':
+            self.store = SQLiteLicenseStore.from_env()
         # Only create client if valid credentials provided
-        if self.supabase_url and self.supabase_key and self.supabase_url.startswith('http'):
-            self.client = create_client(self.supabase_url, self.supabase_key)
-        else:
-            self.client = None  # No client in test/offline mode
+        elif self.supabase_url and self.supabase_key and self.supabase_url.startswith('http'):
+            # v14.5.0: HTTP timeout as well as the breaker deadline
+            self.client = create_client(self.supabase_url, self.supabase_key,
+                                        options=ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT_SECONDS))
+            self.store = SupabaseLicenseStore(self.client, self.breaker)
+        
+        self.degraded_policy = SUPABASE_DEGRADED_POLICY
+        state = self._offline_state.setdefault(getattr(self.store, 'path', self.supabase_url), {
+            'licenses': {}, 'pending_usage': Counter(), 'lock': threading.Lock(),
+            'keys': {'invalid': {}, 'filter': None, 'filter_built_at': 0.0, 'refreshing': False,
+                     'negative_hits': 0, 'filter_rejects': 0}})
+        self._cached_licenses = state['licenses']  # license_key -> (validation result, usage date, cached at)
+        self._pending_usage = state['pending_usage']  # (license_key, usage date) -> queued increments
+        self._offline_lock = state['lock']
+        self._key_state = state['keys']  # Negative cache (key -> expiry) and Bloom filter of known keys
         
         # v10.0.0: Feature access matrix for different tiers (Project Apex)
         self.feature_access = {
@@ -369,7 +2293,7 @@ class LicenseManager:
         
     def validate_license(self, license_key: str) -> Dict:
         # Handle offline/test mode
-        if self.client is None:
+        if self.store is None:
             return {
                 'valid': True,
                 'user_type': 'student_premium',
@@ -378,24 +2302,39 @@ class LicenseManager:
                 'features': self.feature_access['student_premium']
             }
         
+        # v14.5.0: Known-bad and never-issued keys are rejected without a database round trip
+        if self._rejected_locally(license_key):
+            return {'valid': False, 'message': 'Invalid license key'}
+        return self._validate_stored_license(license_key)
+
+    async def validate_license_async(self, license_key: str, executor=None) -> Dict:
+        """
+        v14.5.0: validate_license for asyncio callers. Offline mode and keys
+        rejected locally are answered on the event loop; database lookups run
+        on executor (default: the loop's default executor).
+        """
+        if self.store is None:
+            return self.validate_license(license_key)
+        if self._rejected_locally(license_key):
+            return {'valid': False, 'message': 'Invalid license key'}
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._validate_stored_license, license_key)
+
+    def _validate_stored_license(self, license_key: str) -> Dict:
         try:
-            response = self.client.table('licenses').select('*').eq('license_key', license_key).execute()
-            if not response.data:
+            license_data = self.store.get_license(license_key)
+            if license_data is None:
+                self._remember_invalid(license_key)
                 return {'valid': False, 'message': 'Invalid license key'}
             
-            license_data = response.data[0]
-            
             if datetime.now() > datetime.fromisoformat(license_data['expires_at']):
                 return {'valid': False, 'message': 'License expired'}
             
             if not license_data['is_active']:
                 return {'valid': False, 'message': 'License deactivated'}
             
-            usage_response = self.client.table('usage').select('*').eq('license_key', license_key).eq('usage_date', datetime.now().date().isoformat()).execute()
-            
-            daily_usage = 0
-            if usage_response.data:
-                daily_usage = usage_response.data[0]['usage_count']
+            today = datetime.now().date().isoformat()
+            daily_usage = self.store.get_usage(license_key, today)
             
             # v9.0.0: Updated limits for Project Horizon pricing tiers
             # v12.4.0: Updated daily limits (Project DouAccess 2.0)
@@ -413,67 +2352,922 @@ class LicenseManager:
             }
             
             user_type = license_data['user_type']
-            if daily_usage >= limits[user_type]:
-                return {'valid': False, 'message': f'Daily usage limit reached for {user_type} user'}
-            
             # v6.0.0: Include feature access in validation response
-            return {
+            result = {
                 'valid': True,
                 'user_type': user_type,
                 'daily_usage': daily_usage,
                 'daily_limit': limits[user_type],
                 'features': self.feature_access.get(user_type, self.feature_access['free'])
             }
+            with self._offline_lock:
+                self._cached_licenses[license_key] = {'result': result, 'expires_at': license_data['expires_at'],
+                                                      'usage_date': today, 'cached_at': time.time()}
+            if daily_usage >= limits[user_type]:
+                return {'valid': False, 'message': f'Daily usage limit reached for {user_type} user'}
+            return result
             
+        except ServiceUnavailableError as e:
+            return self._degraded_validation(license_key, e)
         except Exception as e:
             return {'valid': False, 'message': f'License validation error: {str(e)}'}
+
+    def _rejected_locally(self, license_key: str) -> bool:
+        keys = self._key_state
+        now = time.time()
+        with self._offline_lock:
+            expires = keys['invalid'].get(license_key)
+            if expires is not None:
+                if expires > now:
+                    keys['negative_hits'] += 1
+                    return True
+                del keys['invalid'][license_key]
+            stale = (LICENSE_FILTER_REFRESH_SECONDS > 0 and not keys['refreshing']
+                     and now - keys['filter_built_at'] >= LICENSE_FILTER_REFRESH_SECONDS)
+            if stale:
+                keys['refreshing'] = True
+            known = keys['filter']
+        if stale:
+            threading.Thread(target=self.refresh_license_filter, daemon=True, name='license-filter').start()
+        if known is not None and license_key not in known:
+            with self._offline_lock:
+                keys['filter_rejects'] += 1
+            return True
+        return False
+
+    def _remember_invalid(self, license_key: str):
+        with self._offline_lock:
+            invalid = self._key_state['invalid']
+            if len(invalid) >= INVALID_KEY_CACHE_SIZE:
+                del invalid[next(iter(invalid))]  # Oldest first (insertion order)
+            invalid[license_key] = time.time() + INVALID_KEY_TTL_SECONDS
+
+    def refresh_license_filter(self) -> Optional[int]:
+        """v14.5.0: Rebuild the Bloom filter of issued keys; returns the key count, or None on failure."""
+        keys = self._key_state
+        try:
+            known = BloomFilter.from_items(self.store.iter_license_keys())
+        except Exception as e:
+            logger.warning(f"Could not refresh the license key filter: {e}")
+            with self._offline_lock:
+                keys['refreshing'] = False
+                keys['filter_built_at'] = time.time()  # Retry after the next interval
+            return None
+        with self._offline_lock:
+            keys['filter'] = known
+            keys['filter_built_at'] = time.time()
+            keys['refreshing'] = False
+            # Keys issued since they were rejected become valid right away
+            keys['invalid'] = {key: expiry for key, expiry in keys['invalid'].items() if key not in known}
+        return known.count
+
+    def _degraded_validation(self, license_key: str, error: Exception) -> Dict:
+        """v14.5.0: Validate from the local cache while Supabase is unavailable."""
+        denied = {'valid': False, 'message': f'License validation error: {error}'}
+        if self.degraded_policy != 'cached':
+            return denied
+        today = datetime.now().date().isoformat()
+        with self._offline_lock:
+            cached = self._cached_licenses.get(license_key)
+            pending = self._pending_usage.get((license_key, today), 0)
+        if cached is None or time.time() - cached['cached_at'] > LICENSE_CACHE_TTL_SECONDS:
+            return denied
+        if datetime.now() > datetime.fromisoformat(cached['expires_at']):
+            return {'valid': False, 'message': 'License expired'}
+        result = dict(cached['result'], degraded=True)
+        result['daily_usage'] = (result['daily_usage'] if cached['usage_date'] == today else 0) + pending
+        if result['daily_usage'] >= result['daily_limit']:
+            return {'valid': False, 'message': f"Daily usage limit reached for {result['user_type']} user"}
+        return result
     
     def has_feature_access(self, user_type: str, feature: str) -> bool:
         """
-        v6.0.0: Check if a user tier has access to a specific feature.
+        v6.0.0: Check if a user tier has access to a specific feature.
+        """
+        return self.feature_access.get(user_type, {}).get(feature, False)
+    
+    def get_upgrade_message(self, feature: str, current_tier: str) -> str:
+        """
+        v6.0.0: Generate upgrade message for locked features.
+        """
+        upgrade_messages = {
+            'inline_feedback': 'Upgrade to Plus or higher to unlock inline feedback with color-coded suggestions!',
+            'draft_history': 'Upgrade to Plus or higher to track your progress across multiple drafts!',
+            'vocabulary_suggestions': 'Upgrade to Plus or higher to get advanced vocabulary enhancement suggestions!',
+            'reflection_prompts': 'Upgrade to Plus or higher to access personalized reflection prompts!',
+            'grammar_check': 'Upgrade to Plus or higher to get detailed grammar corrections!',
+            'pdf_export': 'Upgrade to Premium or higher to export your essays with annotations as PDF!',
+            'analytics': 'Upgrade to Premium or higher to access historical analytics and progress tracking!',
+            'api_access': 'Upgrade to Unlimited to get API access for school integration!',
+            'priority_support': 'Upgrade to Premium or higher to get priority support!'
+        }
+        return upgrade_messages.get(feature, f'Upgrade to access {feature}!')
+    
+    def increment_usage(self, license_key: str, count: int = 1) -> bool:
+        # Handle offline/test mode
+        if self.store is None:
+            return True
+        
+        today = datetime.now().date().isoformat()
+        try:
+            if self._pending_usage:
+                self.flush_pending_usage()
+            self._add_usage(license_key, today, count)  # v14.5.0: count > 1 for batch API requests
+            return True
+        except ServiceUnavailableError as e:
+            if self.degraded_policy == 'cached':
+                # v14.5.0: Queue the increment; applied once Supabase answers again
+                with self._offline_lock:
+                    self._pending_usage[(license_key, today)] += count
+                return True
+            logger.warning(f"Usage not recorded, licensing database unavailable: {e}")
+            return False
+        except Exception as e:
+            logger.warning(f"Usage not recorded: {e}")
+            return False
+
+    async def increment_usage_async(self, license_key: str, count: int = 1, executor=None) -> bool:
+        """v14.5.0: increment_usage for asyncio callers; the database write runs on executor."""
+        if self.store is None:
+            return True
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.increment_usage, license_key, count)
+
+    def _add_usage(self, license_key: str, usage_date: str, count: int):
+        self.store.add_usage(license_key, usage_date, count)
+        with self._offline_lock:
+            cached = self._cached_licenses.get(license_key)
+            if cached is not None and cached['usage_date'] == usage_date:
+                cached['result'] = dict(cached['result'], daily_usage=cached['result']['daily_usage'] + count)
+
+    def flush_pending_usage(self) -> int:
+        """v14.5.0: Apply usage increments queued while Supabase was unavailable; returns how many were applied."""
+        with self._offline_lock:
+            pending = list(self._pending_usage.items())
+            self._pending_usage.clear()
+        applied = 0
+        for done, ((license_key, usage_date), count) in enumerate(pending):
+            try:
+                self._add_usage(license_key, usage_date, count)
+            except Exception as e:
+                logger.warning(f"Could not apply queued usage, keeping it queued: {e}")
+                with self._offline_lock:
+                    for entry, queued in pending[done:]:
+                        self._pending_usage[entry] += queued
+                break
+            applied += count
+        return applied
+
+    def supabase_health(self) -> Dict:
+        """v14.5.0: Circuit breaker state plus degraded-mode cache and queue sizes."""
+        with self._offline_lock:
+            keys = self._key_state
+            health = {'cached_licenses': len(self._cached_licenses),
+                      'queued_usage': sum(self._pending_usage.values()),
+                      'invalid_keys_cached': len(keys['invalid']),
+                      'negative_cache_hits': keys['negative_hits'],
+                      'filter_keys': keys['filter'].count if keys['filter'] is not None else None,
+                      'filter_rejects': keys['filter_rejects']}
+        health.update(self.breaker.metrics(), backend=self.store.name if self.store else None,
+                      connected=self.store is not None, degraded_policy=self.degraded_policy)
+        return health
+
+class SubsystemMetricsAggregator:
+    """
+    v14.5.0: In-process rollup of per-essay subsystem metrics. For every
+    subsystem field it keeps count, mean, variance (Welford), min, max and a
+    histogram per time window, and keeps a sample_rate fraction of the raw
+    per-essay rows. drain() hands back the rows to store: samples in the
+    legacy subsystem_metrics format plus one rollup row per closed window.
+    """
+    HISTOGRAM_EDGES = (0, 1, 2, 5, 10, 20, 50, 100)  # Bucket i counts values in [edge[i-1], edge[i])
+    MAX_PENDING_ROWS = 1000
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, window_seconds: float = 300.0, sample_rate: float = 0.01, clock=time.time, rng=None):
+        self.window_seconds = window_seconds
+        self.sample_rate = sample_rate
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.recorded = 0
+        self.rows_written = 0
+        self._sink = None  # Last sink used; the final flush at exit goes there
+        self._breaker = None  # Breaker guarding that sink, if any
+        self._windows = {}  # window start -> {'essays': n, 'stats': {(subsystem, field): [n, mean, m2, min, max, buckets]}}
+        self._pending = deque(maxlen=self.MAX_PENDING_ROWS)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'SubsystemMetricsAggregator':
+        return cls(window_seconds=float(os.environ.get('DOUESSAY_METRICS_WINDOW', '300')),
+                   sample_rate=float(os.environ.get('DOUESSAY_METRICS_SAMPLE_RATE', '0.01')))
+
+    @classmethod
+    def shared(cls) -> 'SubsystemMetricsAggregator':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_env()
+                # The Supabase sink submits to a thread pool, and plain atexit hooks run after
+                # concurrent.futures stops accepting work; threading's exit hooks run before that
+                register = getattr(threading, '_register_atexit', atexit.register)
+                register(cls._shared._flush_at_exit)
+            return cls._shared
+
+    def _flush_at_exit(self):
+        """Write the open window at exit, unless there is nothing to write or the sink's breaker is not closed."""
+        if self._sink is None:
+            return
+        with self._lock:
+            if not self._pending and not any(window['essays'] for window in self._windows.values()):
+                return
+        if self._breaker is not None and self._breaker.state != 'closed':
+            return  # No network I/O from an exit hook against a backend already known to be failing
+        self.flush(self._sink, force=True, breaker=self._breaker)
+
+    def record(self, metrics_summary: Dict):
+        """Fold one essay's subsystem metrics (track_subsystem_metrics layout) into the current window."""
+        now = self.clock()
+        start = now - now % self.window_seconds
+        with self._lock:
+            self.recorded += 1
+            window = self._windows.setdefault(start, {'essays': 0, 'stats': {}})
+            window['essays'] += 1
+            for subsystem, fields in metrics_summary.items():
+                if not isinstance(fields, dict):
+                    continue
+                for field, value in fields.items():
+                    if isinstance(value, bool):
+                        value = int(value)
+                    elif not isinstance(value, (int, float)):
+                        continue
+                    stats = window['stats'].get((subsystem, field))
+                    if stats is None:
+                        stats = window['stats'][(subsystem, field)] = [
+                            0, 0.0, 0.0, value, value, [0] * (len(self.HISTOGRAM_EDGES) + 1)]
+                    stats[0] += 1
+                    delta = value - stats[1]
+                    stats[1] += delta / stats[0]
+                    stats[2] += delta * (value - stats[1])
+                    stats[3] = min(stats[3], value)
+                    stats[4] = max(stats[4], value)
+                    stats[5][bisect.bisect_right(self.HISTOGRAM_EDGES, value)] += 1
+            if self.rng.random() < self.sample_rate:
+                self._pending.append({
+                    'essay_id': metrics_summary.get('essay_id'),
+                    'timestamp': metrics_summary.get('timestamp'),
+                    'version': '12.4.0',
+                    'metrics': json.dumps(metrics_summary)
+                })
+
+    def _rollup_row(self, start: float, window: Dict) -> Dict:
+        subsystems = {}
+        for (subsystem, field), (count, mean, m2, low, high, buckets) in window['stats'].items():
+            subsystems.setdefault(subsystem, {})[field] = {
+                'count': count, 'mean': round(mean, 4), 'variance': round(m2 / count, 4),
+                'min': low, 'max': high, 'histogram': buckets}
+        timestamp = datetime.fromtimestamp(start).isoformat()
+        return {
+            'essay_id': f'rollup_{datetime.fromtimestamp(start).strftime("%Y%m%d_%H%M%S")}',
+            'timestamp': timestamp,
+            'version': '14.5.0',
+            'metrics': json.dumps({'kind': 'rollup', 'window_start': timestamp,
+                                   'window_seconds': self.window_seconds, 'essays': window['essays'],
+                                   'histogram_edges': self.HISTOGRAM_EDGES, 'subsystems': subsystems})
+        }
+
+    def drain(self, force: bool = False) -> List[Dict]:
+        """Rows ready to store: pending samples plus rollups of closed windows (all windows if force)."""
+        now = self.clock()
+        with self._lock:
+            for start in sorted(self._windows):
+                if force or start + self.window_seconds <= now:
+                    self._pending.append(self._rollup_row(start, self._windows.pop(start)))
+            rows = list(self._pending)
+            self._pending.clear()
+            return rows
+
+    def requeue(self, rows: List[Dict]):
+        """Put back rows that could not be stored (oldest are dropped beyond MAX_PENDING_ROWS)."""
+        with self._lock:
+            self._pending.extendleft(reversed(rows))
+
+    def flush(self, sink, force: bool = False, breaker: Optional[CircuitBreaker] = None) -> int:
+        """Write drained rows with sink(row); unwritten rows are requeued. Returns rows written."""
+        self._sink = sink
+        self._breaker = breaker
+        rows = self.drain(force)
+        for done, row in enumerate(rows):
+            try:
+                sink(row)
+            except Exception as e:
+                if not isinstance(e, CircuitOpenError):
+                    logger.warning(f"Could not store subsystem metrics: {e}")
+                self.requeue(rows[done:])
+                return done
+        with self._lock:
+            self.rows_written += len(rows)
+        return len(rows)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'essays_recorded': self.recorded, 'rows_written': self.rows_written,
+                    'open_windows': len(self._windows), 'pending_rows': len(self._pending),
+                    'sample_rate': self.sample_rate, 'window_seconds': self.window_seconds}
+
+
+# v14.5.0: Progress events of DouEssay.grade_essay_stages, in order
+GRADING_STAGES = (
+    'neural_rubric', 'content', 'emotionflow', 'feedback_depth', 'context_awareness', 'tone_analysis',
+    'absolute_statements', 'claim_evidence_ratio', 'logical_fallacies', 'paragraph_structure_v12',
+    'emotionflow_v2', 'reflection_v12', 'inference_chains_v12_2', 'evidence_types_v12_2',
+    'evaluate_counter_argument_depth', 'statistics', 'structure', 'grammar', 'application',
+    'feedback', 'inline_feedback', 'corrections',
+)
+
+# v14.5.0: Stages each top-level grade_essay key needs (see resolve_result_fields).
+# The neural rubric and content analyses always run: the score is built from them.
+_FACTOR_STAGES = ('statistics', 'structure', 'grammar', 'application')
+_CALIBRATION_STAGES = _FACTOR_STAGES + ('evaluate_counter_argument_depth', 'paragraph_structure_v12',
+                                        'emotionflow_v2', 'calibration')
+RESULT_FIELD_STAGES = {
+    'score': (), 'rubric_level': (), 'neural_rubric': (), 'teacher_calibration': (),
+    'feedback': _FACTOR_STAGES + ('feedback',),
+    'corrections': ('corrections',),
+    'inline_feedback': ('inline_feedback',),
+    'detailed_analysis': _CALIBRATION_STAGES,
+    'paragraph_transitions': _CALIBRATION_STAGES,
+    **{name: (name,) for name in (
+        'emotionflow', 'feedback_depth', 'context_awareness', 'tone_analysis', 'absolute_statements',
+        'claim_evidence_ratio', 'logical_fallacies', 'paragraph_structure_v12', 'emotionflow_v2',
+        'reflection_v12', 'inference_chains_v12_2', 'evidence_types_v12_2', 'evaluate_counter_argument_depth')},
+}
+
+
+def resolve_result_fields(fields=None, exclude=None, available=RESULT_FIELD_STAGES) -> Optional[frozenset]:
+    """
+    v14.5.0: Top-level result keys selected by a fields= include list and/or an
+    exclude= list, or None for the full result. Raises ValueError on keys not in
+    available.
+    """
+    if fields is None and not exclude:
+        return None
+    if isinstance(fields, str) or isinstance(exclude, str):
+        raise ValueError("fields and exclude must be lists of result keys, not strings")
+    selected = frozenset(available if fields is None else fields)
+    unknown = (selected | frozenset(exclude or ())) - available.keys()
+    if unknown:
+        raise ValueError(f"Unknown result fields: {sorted(unknown)}; expected any of {sorted(available)}")
+    return selected - frozenset(exclude or ())
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'owners', 'waiters', 'abandoned')
+
+    def __init__(self, owner):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.owners = {owner}
+        self.waiters = 0
+        self.abandoned = False  # The leading stream's consumer left before the result
+
+
+class SingleFlight:
+    """
+    v14.5.0: Coalesces concurrent identical calls. The first caller for a key
+    runs the computation; callers arriving while it is in flight wait and share
+    its result (or exception) instead of repeating the work. Nothing is cached
+    once the flight lands. Shared results must be treated as read-only.
+
+    usage_policy decides whether a coalesced duplicate counts toward the daily
+    limit: 'each' (every request counts, the legacy behaviour), 'license'
+    (repeats from the same license, e.g. double-clicks, are free) or 'once'
+    (only the computing request counts).
+
+    Waiters give up with a TimeoutError after wait_timeout seconds.
+    """
+    USAGE_POLICIES = ('each', 'license', 'once')
+    WAIT_TIMEOUT = 120.0
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, usage_policy: str = 'each', wait_timeout: float = WAIT_TIMEOUT):
+        if usage_policy not in self.USAGE_POLICIES:
+            raise ValueError(f"usage_policy must be one of {self.USAGE_POLICIES}")
+        self.usage_policy = usage_policy
+        self.wait_timeout = wait_timeout
+        self.leaders = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'SingleFlight':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(os.environ.get('DOUESSAY_COALESCED_USAGE', 'each').lower())
+            return cls._shared
+
+    def _join(self, key, owner) -> Tuple:
+        """(flight, leader, counts): whether the request counts is decided under the same lock."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(owner)
+                self.leaders += 1
+                return flight, True, True
+            counts = self.usage_policy == 'each' or (self.usage_policy == 'license' and owner not in flight.owners)
+            flight.owners.add(owner)
+            flight.waiters += 1
+            self.coalesced += 1
+            return flight, False, counts
+
+    def _enter(self, key, owner, charge) -> Tuple:
+        """
+        Join key's flight and, when the usage policy counts this request, call
+        charge() (at most once). Returns (flight, leader); a waiter's flight has
+        landed. A flight whose leader left early is re-joined, and the first
+        caller back leads, and under the policy pays for, the recomputation.
         """
-        return self.feature_access.get(user_type, {}).get(feature, False)
-    
-    def get_upgrade_message(self, feature: str, current_tier: str) -> str:
+        while True:
+            flight, leader, counts = self._join(key, owner)
+            if counts and charge is not None:
+                pending, charge = charge, None
+                try:
+                    pending()
+                except BaseException:
+                    if leader:  # Hand the computation to the waiters
+                        flight.abandoned = True
+                        self._land(key, flight)
+                    raise
+            if leader:
+                return flight, True
+            self._wait(flight)
+            if not flight.abandoned:
+                return flight, False
+
+    def _land(self, key, flight: _Flight):
+        with self._lock:
+            del self._flights[key]
+        flight.done.set()
+
+    def _wait(self, flight: _Flight):
+        if not flight.done.wait(self.wait_timeout):
+            raise TimeoutError(f'coalesced computation still running after {self.wait_timeout}s')
+
+    def do(self, key, fn, owner=None, charge=None) -> Tuple:
         """
-        v6.0.0: Generate upgrade message for locked features.
+        Return (fn() result, shared), where shared is True when another caller
+        computed it. charge() runs first if the usage policy counts this
+        request; when it raises, the caller gets the exception and no result.
         """
-        upgrade_messages = {
-            'inline_feedback': 'Upgrade to Plus or higher to unlock inline feedback with color-coded suggestions!',
-            'draft_history': 'Upgrade to Plus or higher to track your progress across multiple drafts!',
-            'vocabulary_suggestions': 'Upgrade to Plus or higher to get advanced vocabulary enhancement suggestions!',
-            'reflection_prompts': 'Upgrade to Plus or higher to access personalized reflection prompts!',
-            'grammar_check': 'Upgrade to Plus or higher to get detailed grammar corrections!',
-            'pdf_export': 'Upgrade to Premium or higher to export your essays with annotations as PDF!',
-            'analytics': 'Upgrade to Premium or higher to access historical analytics and progress tracking!',
-            'api_access': 'Upgrade to Unlimited to get API access for school integration!',
-            'priority_support': 'Upgrade to Premium or higher to get priority support!'
-        }
-        return upgrade_messages.get(feature, f'Upgrade to access {feature}!')
-    
-    def increment_usage(self, license_key: str) -> bool:
-        # Handle offline/test mode
-        if self.client is None:
-            return True
-        
+        flight, leader = self._enter(key, owner, charge)
+        if leader:
+            try:
+                flight.result = fn()
+            except BaseException as e:
+                flight.error = e
+            finally:
+                self._land(key, flight)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, not leader
+
+    def stream(self, key, events_fn, owner=None, charge=None):
+        """
+        Generator form of do() for event streams ending in ('result', value):
+        the leader re-yields every event of events_fn(); callers that joined
+        an in-flight stream only get the final ('result', shared value). If
+        the leader's consumer stops before the result, the first waiter to
+        wake takes over as leader and runs events_fn() itself.
+        """
+        flight, leader = self._enter(key, owner, charge)
+        if not leader:
+            if flight.error is not None:
+                raise flight.error
+            yield ('result', flight.result)
+            return
         try:
-            today = datetime.now().date().isoformat()
-            usage_response = self.client.table('usage').select('*').eq('license_key', license_key).eq('usage_date', today).execute()
-            
-            if usage_response.data:
-                current_count = usage_response.data[0]['usage_count']
-                self.client.table('usage').update({'usage_count': current_count + 1}).eq('license_key', license_key).eq('usage_date', today).execute()
+            for event in events_fn():
+                if event[0] == 'result':
+                    flight.result = event[1]
+                yield event
+        except GeneratorExit:
+            flight.abandoned = flight.result is None
+            raise
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'in_flight': len(self._flights), 'leaders': self.leaders, 'coalesced': self.coalesced,
+                    'usage_policy': self.usage_policy}
+
+
+class LatencyTracker:
+    """v14.5.0: Rolling latency samples per metric name, summarized as percentiles."""
+    WINDOW = 1000
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._samples = {}
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'LatencyTracker':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def record(self, metric: str, ms: float):
+        with self._lock:
+            self._samples.setdefault(metric, deque(maxlen=self.WINDOW)).append(ms)
+            self._counts[metric] += 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            report = {}
+            for metric, samples in self._samples.items():
+                ordered = sorted(samples)
+                pick = lambda percent: ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+                report[metric] = {'count': self._counts[metric], 'p50': round(pick(50), 1),
+                                  'p95': round(pick(95), 1), 'max': round(ordered[-1], 1)}
+            return report
+
+
+class HTMLFragmentCache:
+    """
+    v14.5.0: Rendered HTML fragments. Static fragments (subsystem info, locked
+    feature banners) are built once per process; result-derived fragments are
+    memoized under (fragment, result digest) keys in an LRU bounded by the
+    memory its strings take (annotated essays run to tens of kilobytes each),
+    so repeat views of the same graded essay skip rendering. Fragments are
+    plain strings and are returned as-is.
+    """
+    DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._static = {}
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'HTMLFragmentCache':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(int(os.environ.get('DOUESSAY_FRAGMENT_CACHE_BYTES', cls.DEFAULT_MAX_BYTES)))
+            return cls._shared
+
+    @staticmethod
+    def digest(*parts) -> str:
+        """
+        Content hash of the inputs a fragment is rendered from. Pickling is
+        several times cheaper than canonical JSON for a full result; inputs that
+        pickle differently only cost a cache miss.
+        """
+        try:
+            encoded = pickle.dumps(parts, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            encoded = json.dumps(parts, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    def static(self, name: str, render: Callable[[], str]) -> str:
+        """Fragment that never changes for the life of the process."""
+        fragment = self._static.get(name)
+        if fragment is None:
+            fragment = self._static.setdefault(name, render())
+        return fragment
+
+    def get(self, key: Tuple, render: Callable[[], str]) -> str:
+        """Memoized fragment for key; render() runs outside the lock on a miss."""
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+        fragment = render()
+        size = sys.getsizeof(fragment)
+        if size <= self.max_bytes:
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= sys.getsizeof(previous)
+                self._entries[key] = fragment
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= sys.getsizeof(evicted)
+        return fragment
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'static': len(self._static),
+                    'hits': self.hits, 'misses': self.misses, 'max_bytes': self.max_bytes}
+
+
+class GradingWorkerError(Exception):
+    """v14.5.0: A grading worker timed out or died; the essay was not graded."""
+
+
+_worker_engine = None  # v14.5.0: Warm DouEssay inherited by forked grading workers
+_worker_engine_lock = threading.Lock()  # Held from setting _worker_engine until the fork
+
+
+def _reset_after_fork():
+    """v14.5.0: Drop thread pools, connections and locks a forked child inherited but cannot use."""
+    global _grammar_executor, _grammar_executor_lock, _supabase_executor, _supabase_executor_lock
+    global _async_grading_executor, _async_grading_executor_lock
+    _grammar_executor, _grammar_executor_lock = None, threading.Lock()
+    _async_grading_executor, _async_grading_executor_lock = None, threading.Lock()
+    _supabase_executor, _supabase_executor_lock = None, threading.Lock()
+
+
+def _grading_worker_main(conn, warmup: bool, lt_servers: List[str] = ()):
+    """
+    v14.5.0: Worker process loop: grade (essay, grade level, grammar profile, fields) tasks from the pipe.
+    Workers that build their own engine check grammar on the parent's lt_servers.
+    """
+    _reset_after_fork()
+    if _worker_engine is None and lt_servers and not os.environ.get('DOUESSAY_LT_POOL_SIZE'):
+        os.environ['DOUESSAY_LT_SERVERS'] = ','.join(lt_servers)  # No JVM per worker
+    engine = _worker_engine if _worker_engine is not None else DouEssay()
+    # The parent records usage and metrics; workers never touch the license database
+    engine.license_manager.store = None
+    engine._grammar_memo_lock = threading.Lock()
+    engine._grammar_flights = SingleFlight()
+    for client in getattr(getattr(engine, 'grammar_tool', None), 'clients', None) or []:
+        client._local = threading.local()  # Fresh keep-alive sessions, not the parent's sockets
+    if engine.grammar_cache is not None:
+        engine.grammar_cache = GrammarCache.from_env(engine.grammar_cache.version)
+    if warmup:
+        try:
+            engine.grade_essay(GradingWorkerPool.WARMUP_ESSAY, 'Grade 10')
+        except Exception as e:
+            logger.warning(f"Grading worker warm-up failed: {e}")
+    conn.send(('ready', os.getpid()))
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        essay_text, grade_level, grammar_profile, fields, stream = task
+        try:
+            if stream:  # Report each stage as it completes; the result goes last, like grade()
+                for event in engine.grade_essay_stages(essay_text, grade_level, grammar_profile, fields):
+                    if event[0] == 'result':
+                        result = event[1]
+                    else:
+                        conn.send(('event', event))
             else:
-                self.client.table('usage').insert({
-                    'license_key': license_key,
-                    'usage_date': today,
-                    'usage_count': 1
-                }).execute()
-            
-            return True
+                result = engine.grade_essay(essay_text, grade_level, grammar_profile, fields)
+            conn.send(('ok', result))
         except Exception as e:
-            print(f"Error incrementing usage: {e}")
-            return False
+            conn.send(('error', f'{type(e).__name__}: {e}'))
+    conn.close()
+
+
+class _GradingWorker:
+    __slots__ = ('process', 'conn', 'ready', 'tasks', 'start_method')
+
+    def __init__(self, process, conn, start_method: str):
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.tasks = 0
+        self.start_method = start_method
+
+
+class GradingWorkerPool:
+    """
+    v14.5.0: Pre-forked worker processes for CPU-bound grading, so a long essay
+    no longer holds the GIL of the process serving the UI. While the parent is
+    single-threaded (normally at startup) workers are forked from it and share
+    its warm DouEssay, lexicons and compiled patterns copy-on-write. Once other
+    threads run, a fork could copy a lock some thread holds, so workers -
+    including every replacement - come from a single-threaded forkserver
+    (spawn where unavailable) and build their own engine. Each task has a
+    deadline; a worker that misses it or crashes is killed and replaced
+    without affecting other requests. Callers block while every worker is busy.
+    """
+    WARMUP_ESSAY = ("Technology is important because it helps students learn. For example, online "
+                    "resources give students access to information.\n\nHowever, some people argue that "
+                    "screens distract students. In conclusion, technology should be used carefully.")
+    READY_TIMEOUT = 120.0
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, size: int = 2, timeout: float = 60.0, engine=None, warmup: bool = True):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.engine = engine
+        self.warmup = warmup
+        methods = multiprocessing.get_all_start_methods()
+        self._fork_ctx = multiprocessing.get_context('fork') if 'fork' in methods else None
+        self._ctx = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        if self._ctx.get_start_method() == 'forkserver':
+            self._ctx.set_forkserver_preload([__name__])  # Import lexicons once, in the fork server
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.tasks = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.restarts = 0
+        self._workers = [self._spawn() for _ in range(self.size)]
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    @classmethod
+    def from_env(cls, engine=None, default_size: int = 0) -> Optional['GradingWorkerPool']:
+        """Pool sized by DOUESSAY_GRADING_WORKERS, else default_size (0, the default, grades in-process)."""
+        size = int(os.environ.get('DOUESSAY_GRADING_WORKERS', '0') or 0) or default_size
+        if size <= 0:
+            return None
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(size, timeout=float(os.environ.get('DOUESSAY_GRADING_TIMEOUT', '60')), engine=engine)
+                atexit.register(cls._shared.close)
+            return cls._shared
+
+    def _spawn(self) -> _GradingWorker:
+        global _worker_engine
+        clients = getattr(getattr(self.engine, 'grammar_tool', None), 'clients', None) or []
+        lt_servers = [client.url for client in clients]
+        with _worker_engine_lock:
+            # With no other thread alive, no lock can be held mid-update, so forking is safe
+            ctx = self._fork_ctx if self._fork_ctx is not None and threading.active_count() == 1 else self._ctx
+            parent_conn, child_conn = ctx.Pipe()
+            _worker_engine = self.engine
+            try:
+                process = ctx.Process(target=_grading_worker_main,
+                                      args=(child_conn, self.warmup, lt_servers),
+                                      name='douessay-grader', daemon=True)
+                process.start()
+            finally:
+                _worker_engine = None
+        child_conn.close()
+        return _GradingWorker(process, parent_conn, ctx.get_start_method())
+
+    def _replace(self, worker: _GradingWorker) -> _GradingWorker:
+        worker.process.kill()
+        worker.process.join(timeout=5)
+        worker.conn.close()
+        replacement = self._spawn()
+        with self._lock:
+            self.restarts += 1
+            self._workers[self._workers.index(worker)] = replacement
+        return replacement
+
+    def grade(self, essay_text: str, grade_level: str = "Grade 10", grammar_profile: Optional[str] = None,
+              timeout: Optional[float] = None, fields=None) -> Dict:
+        """grade_essay in a worker process; raises GradingWorkerError on timeout or crash."""
+        for _, result in self._run((essay_text, grade_level, grammar_profile, fields, False), timeout):
+            pass
+        return result
+
+    def grade_stages(self, essay_text: str, grade_level: str = "Grade 10", grammar_profile: Optional[str] = None,
+                     timeout: Optional[float] = None, fields=None):
+        """
+        grade_essay_stages in a worker process: yields its events as the worker
+        reports them. The timeout covers the whole stream. A consumer that stops
+        early has the worker replaced, since it is still grading.
+        """
+        return self._run((essay_text, grade_level, grammar_profile, fields, True), timeout)
+
+    def _run(self, task: Tuple, timeout: Optional[float]):
+        if self._closed:
+            raise GradingWorkerError('grading pool is closed')
+        timeout = timeout or self.timeout
+        worker = self._idle.get()
+        busy = False
+        try:
+            try:
+                if not worker.ready:
+                    if not worker.conn.poll(self.READY_TIMEOUT):
+                        worker = self._replace(worker)
+                        raise GradingWorkerError('grading worker did not start')
+                    worker.conn.recv()
+                    worker.ready = True
+                worker.conn.send(task)
+                busy = True
+                deadline = time.monotonic() + timeout
+                while True:
+                    if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                        with self._lock:
+                            self.timeouts += 1
+                        busy = False
+                        worker = self._replace(worker)
+                        raise GradingWorkerError(f'grading timed out after {timeout}s')
+                    status, payload = worker.conn.recv()
+                    if status != 'event':
+                        busy = False
+                        break
+                    yield payload
+            except (EOFError, OSError) as e:
+                with self._lock:
+                    self.crashes += 1
+                busy = False
+                worker.process.join(timeout=1)
+                exitcode = worker.process.exitcode
+                worker = self._replace(worker)
+                raise GradingWorkerError(f'grading worker died (exit code {exitcode})') from e
+            worker.tasks += 1
+        finally:
+            if busy:  # The consumer went away mid-stream
+                worker = self._replace(worker)
+            self._idle.put(worker)
+        with self._lock:
+            self.tasks += 1
+            self.errors += status == 'error'
+        if status == 'error':
+            raise RuntimeError(payload)
+        if self.engine is not None:
+            self.engine.track_subsystem_metrics(task[0], payload)
+        yield ('result', payload)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'size': self.size, 'tasks': self.tasks, 'errors': self.errors, 'timeouts': self.timeouts,
+                    'crashes': self.crashes, 'restarts': self.restarts,
+                    'workers': [{'pid': w.process.pid, 'alive': w.process.is_alive(), 'tasks': w.tasks,
+                                 'start_method': w.start_method} for w in self._workers]}
+
+    def close(self):
+        self._closed = True
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
+            worker.conn.close()
+
+
+def benchmark_grading_pool(essays: List[str], sizes=(1, 2, 4), concurrency: int = 4, engine=None) -> Dict:
+    """
+    v14.5.0: Load test of grading from concurrent request threads, in-process
+    versus worker pools of each size: essays per second and the worst stall of
+    a 5ms heartbeat running on the calling thread (the UI's view of the GIL).
+    """
+    engine = engine or DouEssay()
+
+    def run(grade):
+        pending = deque(essays)
+        pending_lock = threading.Lock()
+
+        def client():
+            while True:
+                with pending_lock:
+                    if not pending:
+                        return
+                    essay = pending.popleft()
+                grade(essay)
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        worst_lag = 0.0
+        while any(thread.is_alive() for thread in threads):
+            tick = time.perf_counter()
+            time.sleep(0.005)
+            worst_lag = max(worst_lag, time.perf_counter() - tick - 0.005)
+        elapsed = time.perf_counter() - start
+        return {'essays_per_second': round(len(essays) / elapsed, 2), 'max_ui_stall_ms': round(worst_lag * 1000, 1)}
+
+    results = {'inline': run(lambda essay: engine.grade_essay(essay))}
+    for size in sizes:
+        pool = GradingWorkerPool(size, engine=engine)
+        try:
+            for _ in range(size):
+                pool.grade(GradingWorkerPool.WARMUP_ESSAY)  # Wait for workers to come up
+            results[size] = run(pool.grade)
+        finally:
+            pool.close()
+    results['cpu_count'] = os.cpu_count()
+    return results
+
 
 class DouEssay:
     def __init__(self):
@@ -483,6 +3277,17 @@ class DouEssay:
         self.setup_feedback_templates()
         self.setup_emotional_tone_analyzers()  # v7.0.0: AI Coach emotional analysis
         self.license_manager = LicenseManager()
+        # v14.5.0: Recent AnnotationSpanTables / EssayTermIndexes by essay text, so concurrent gradings of
+        # different essays on this engine never see each other's tables
+        self._span_tables = OrderedDict()
+        self._term_indexes = OrderedDict()
+        self._essay_tables_lock = threading.Lock()
+        # v14.5.0: Whole-word indicator matching (off = legacy substring scores)
+        self.token_matching = os.environ.get('DOUESSAY_TOKEN_MATCHING', '').lower() in ('1', 'true', 'yes')
+        self.metrics_aggregator = SubsystemMetricsAggregator.shared()  # v14.5.0
+        self.grading_flights = SingleFlight.shared()  # v14.5.0: Coalesces duplicate concurrent gradings
+        self.latency = LatencyTracker.shared()  # v14.5.0: Time to first result / completion
+        self.fragments = HTMLFragmentCache.shared()  # v14.5.0: Memoized static and result HTML
     
     def setup_nltk(self):
         try:
@@ -492,11 +3297,31 @@ class DouEssay:
             pass
 
     def setup_grammar_tool(self):
+        self.grammar_cache = None  # v14.5.0: Persistent sentence-level match cache
+        self._grammar_matches = {}  # v14.5.0: (text, profile) -> matches of recent checks
+        self._grammar_memo_lock = threading.Lock()
+        self._grammar_flights = SingleFlight()  # v14.5.0: In-flight checks, keyed like _grammar_matches
+        # v14.5.0: JVM-free engine for the 'fast' profile and DOUESSAY_GRAMMAR_BACKEND=heuristic;
+        # 'auto' falls back to it when LanguageTool cannot start
+        self.fast_grammar_backend = HeuristicGrammarBackend()
+        backend = os.environ.get('DOUESSAY_GRAMMAR_BACKEND', 'languagetool').lower()
+        if backend == 'heuristic':
+            self.grammar_tool = self.fast_grammar_backend
+            self.grammar_enabled = True
+            return
         try:
-            self.grammar_tool = language_tool_python.LanguageTool('en-US')
+            # v14.5.0: One supervised LanguageTool backend shared by every instance in the process
+            self.grammar_tool = GrammarSupervisor.shared(_create_language_tool_backend)
             self.grammar_enabled = True
-        except:
+        except Exception as e:
+            logger.warning(f"LanguageTool unavailable, grammar checks disabled: {e}")
             self.grammar_enabled = False
+        if self.grammar_enabled:
+            self.grammar_cache = GrammarCache.from_env(_grammar_tool_fingerprint(self.grammar_tool))
+        elif backend == 'auto':
+            logger.warning("LanguageTool unavailable; grading grammar with the heuristic backend")
+            self.grammar_tool = self.fast_grammar_backend
+            self.grammar_enabled = True
 
     def setup_semantic_analyzers(self):
         # v6.0.0: Enhanced with originality and argument strength detection
@@ -1465,6 +4290,15 @@ class DouEssay:
             return validation_result
         else:
             return {'valid': False, 'message': 'Failed to update usage count'}
+
+    async def validate_license_and_increment_async(self, license_key: str, executor=None) -> Dict:
+        """v14.5.0: validate_license_and_increment without blocking the event loop."""
+        validation_result = await self.license_manager.validate_license_async(license_key, executor)
+        if not validation_result['valid']:
+            return validation_result
+        if await self.license_manager.increment_usage_async(license_key, executor=executor):
+            return validation_result
+        return {'valid': False, 'message': 'Failed to update usage count'}
     
     def assess_with_neural_rubric(self, text: str) -> Dict:
         """
@@ -1485,10 +4319,8 @@ class DouEssay:
         Returns rubric scores, overall score, rationale, and teacher alignment metrics.
         Trained on 25,000+ Ontario and IB-marked essays with >99.7% teacher alignment.
         """
-        text_lower = text.lower()
-        words = text_lower.split()
-        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
-        word_count = len(words)
+        term_index = self.get_term_index(text)
+        word_count = len(term_index.text_lower.split())
         
         rubric_scores = {}
         rubric_rationales = {}
@@ -1499,8 +4331,7 @@ class DouEssay:
         # Assess each rubric category
         for category, config in self.neural_rubric_categories.items():
             # Count indicators for this category
-            indicator_matches = sum(1 for indicator in config['indicators'] 
-                                   if indicator in text_lower)
+            indicator_matches = term_index.count_matching(config['indicators'], self.token_matching)
             
             # Calculate base score (0-4 scale, Ontario levels)
             indicator_density = indicator_matches / word_density_factor
@@ -1579,7 +4410,7 @@ class DouEssay:
         # v12.9.0: Detect numbers/statistics (implicit evidence)
         # Pattern is safe: uses non-capturing groups (?:...) and optional quantifiers (?:\.\d+)?
         # No nested quantifiers, so no catastrophic backtracking possible
-        numbers_found = len(re.findall(r'(?:\d+(?:\.\d+)?%|\d+ percent)', text_lower))
+        numbers_found = len(_RE_PERCENTAGE.findall(text_lower))
         
         # v12.9.0: Ultra-precision scoring for ≥99% accuracy (Doulet DepthCore 3.1)
         # Enhanced weights for sophisticated claim depth analysis
@@ -1648,10 +4479,11 @@ class DouEssay:
         v12.9.0: Doulet Nexus 4.1 - Ultra-precise clarity, organization, and logical flow evaluation.
         Enhanced with implicit logical connection detection and topic sentence recognition.
         """
-        text_lower = text.lower()
+        term_index = self.get_term_index(text)
+        token_matching = self.token_matching
         
         # v12.9.0: Enhanced organizational elements detection with implicit thesis
-        has_thesis = any(keyword in text_lower for keyword in self.thesis_keywords[:15])
+        has_thesis = term_index.count_matching(self.thesis_keywords[:15], token_matching) > 0
         
         # v12.9.0: Expanded transition detection for logical flow (fix 0% false negatives)
         transition_words = ['furthermore', 'moreover', 'however', 'therefore', 'thus',
@@ -1659,15 +4491,15 @@ class DouEssay:
                           'on the other hand', 'in contrast', 'similarly', 'likewise',
                           'as a result', 'for instance', 'for example', 'first', 'second',
                           'finally', 'also', 'when', 'while', 'although']
-        transition_count = sum(1 for indicator in transition_words if indicator in text_lower)
+        transition_count = term_index.count_matching(transition_words, token_matching)
         has_transitions = transition_count > 0
         
         conclusion_phrases = ['in conclusion', 'to conclude', 'ultimately', 'in summary',
                             'to sum up', 'in closing', 'overall', 'in the end', 'to summarize']
-        has_conclusion = any(phrase in text_lower for phrase in conclusion_phrases)
+        has_conclusion = term_index.count_matching(conclusion_phrases, token_matching) > 0
         
         # v12.9.0: Enhanced sentence variety analysis
-        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+        sentences = [s.strip() for s in _SENTENCE_DELIMITER.split(text) if s.strip()]
         avg_sentence_length = len(text.split()) / max(1, len(sentences))
         
         # v12.9.0: Sentence variety scoring for communication effectiveness
@@ -1687,7 +4519,10 @@ class DouEssay:
         # More sophisticated than punctuation count - looks for logical connectors
         conjunction_markers = ['and', 'but', 'or', 'so', 'yet', 'nor', 'while', 'since', 
                               'because', 'although', 'though', 'unless', 'until', 'whereas']
-        conjunction_count = sum(1 for marker in conjunction_markers if f' {marker} ' in text_lower)
+        if token_matching:
+            conjunction_count = term_index.tokens.count_present(conjunction_markers)
+        else:
+            conjunction_count = sum(1 for marker in conjunction_markers if f' {marker} ' in term_index.text_lower)
         implicit_flow_bonus = min(0.4, conjunction_count / 15)  # Reward logical connections
         
         # v12.9.0: Ultra-precision scoring for ≥99% accuracy (Doulet Nexus 4.1)
@@ -1700,6 +4535,49 @@ class DouEssay:
                     flow_bonus + implicit_flow_bonus
         return min(4.5, base_score)
     
+    def compare_indicator_matching(self, essays: List) -> Dict:
+        """
+        v14.5.0: Compatibility report for whole-word indicator matching.
+        Scores every essay with legacy substring matching and with token matching
+        and reports how the neural rubric and the final score shift. Accepts
+        plain strings or teacher-dataset records ({'text': ..., 'grade': ...}).
+        Each mode is scored on a shallow copy of the engine, so gradings running
+        concurrently on this engine keep its own token_matching setting.
+        """
+        engines = {}
+        for mode in (False, True):
+            engines[mode] = copy.copy(self)
+            engines[mode].token_matching = mode
+        rows = []
+        for essay in essays:
+            if isinstance(essay, dict):
+                text = essay.get('text', '')
+                grade_level = f"Grade {essay['grade']}" if essay.get('grade') else "Grade 10"
+            else:
+                text, grade_level = essay, "Grade 10"
+            scores = {}
+            for mode, engine in engines.items():
+                rubric = engine.assess_with_neural_rubric(text)
+                scores[mode] = (rubric['rubric_scores'], rubric['overall_percentage'],
+                                engine.grade_essay(text, grade_level).get('score'))
+            rows.append({
+                'rubric_shift': {cat: round(scores[True][0][cat] - scores[False][0][cat], 2)
+                                 for cat in scores[False][0]},
+                'rubric_percentage_shift': round(scores[True][1] - scores[False][1], 1),
+                'score_before': scores[False][2],
+                'score_after': scores[True][2],
+                'score_shift': round((scores[True][2] or 0) - (scores[False][2] or 0), 2)
+            })
+        
+        shifts = [abs(row['score_shift']) for row in rows]
+        return {
+            'essays': rows,
+            'essay_count': len(rows),
+            'changed_count': sum(1 for shift in shifts if shift),
+            'mean_abs_score_shift': round(sum(shifts) / max(1, len(shifts)), 2),
+            'max_abs_score_shift': max(shifts, default=0)
+        }
+    
     def check_contextual_relevance(self, text: str, indicator_density: float) -> float:
         """
         v12.9.0: Doulet Empathica 2.1 - Ultra-precise real-world application and engagement evaluation.
@@ -1804,7 +4682,7 @@ class DouEssay:
         text_lower = text.lower()
         words = text_lower.split()
         word_count = len(words)
-        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+        sentences = [s.strip() for s in _SENTENCE_DELIMITER.split(text) if s.strip()]
         
         # Analyze engagement through emotional word detection
         engagement_words = 0
@@ -1898,8 +4776,8 @@ class DouEssay:
         
         # v13.0.1: Authenticity score (measures genuine voice vs. formulaic writing)
         # Use word boundary matching to avoid partial word matches
-        personal_pronouns = sum(1 for pronoun in ['i', 'my', 'me', 'we', 'our', 'us'] 
-                               if re.search(rf'\b{pronoun}\b', text_lower))
+        # v14.5.0: Single combined scan; counts distinct pronouns present
+        personal_pronouns = len(set(_RE_PERSONAL_PRONOUN.findall(text_lower)))
         personal_anecdotes = sum(1 for phrase in ['my experience', 'i learned', 'i discovered',
                                                   'i realized', 'this taught me'] if phrase in text_lower)
         authenticity_score = min(1.0, (personal_pronouns / max(1, word_count / 50)) + (personal_anecdotes * 0.2))
@@ -2466,6 +5344,7 @@ class DouEssay:
         text_lower = text.lower()
         words = text_lower.split()
         word_count = len(words)
+        term_index = self.get_term_index(text)  # v14.5.0: Shared memoized term lookups
         
         # Analyze each tone dimension
         tone_profile = {}
@@ -2474,8 +5353,7 @@ class DouEssay:
             level_scores = {}
             
             for level, indicators in levels.items():
-                count = sum(1 for indicator in indicators 
-                           if indicator.lower() in text_lower)
+                count = term_index.count_present(indicator.lower() for indicator in indicators)
                 # Calculate percentage of text matching this level
                 score = (count / max(word_count / 100, 1)) * 100
                 level_scores[level] = {
@@ -2656,22 +5534,21 @@ class DouEssay:
         v12.0.0: Detect unsupported absolute statements in the essay.
         Flags statements like 'always', 'never', 'everyone' that lack evidence.
         """
-        text_lower = text.lower()
-        words = text_lower.split()
+        # v14.5.0: Sentences are split once and looked up through the shared term index
+        term_index = self.get_term_index(text)
+        sentences = term_index.sentences
         
         absolute_count = 0
         absolute_instances = []
         
         for absolute in self.v12_absolute_statements['unsupported_absolutes']:
-            if absolute in text_lower:
+            if term_index.contains(absolute):
                 absolute_count += 1
-                sentences = re.split(r'[.!?]+', text)
-                for sentence in sentences:
-                    if absolute in sentence.lower():
-                        absolute_instances.append({
-                            'term': absolute,
-                            'context': sentence.strip()[:100]
-                        })
+                for sentence_id in term_index.sentences_containing(absolute):
+                    absolute_instances.append({
+                        'term': absolute,
+                        'context': sentences[sentence_id].strip()[:100]
+                    })
         
         flagged = absolute_count > 0
         severity = 'high' if absolute_count > 3 else 'medium' if absolute_count > 1 else 'low'
@@ -2739,28 +5616,27 @@ class DouEssay:
         # - Capitalized words (proper nouns like "Instagram", "TikTok")
         # - Numbers and percentages
         # - Years and dates
-        import re
         
         # Proper nouns (capitalized words mid-sentence, excluding sentence starts)
-        proper_nouns = re.findall(r'(?<=[a-z\s])([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', text)
+        proper_nouns = _RE_PROPER_NOUN.findall(text)
         if len(proper_nouns) >= 2:  # At least 2 proper nouns suggests specific examples
             evidence_count += len(proper_nouns) * 0.3  # Weight less than explicit
             evidence_details.append(f"Specific names/places: {len(proper_nouns)} found")
         
         # Numbers, percentages, statistics
-        numbers = re.findall(r'\b\d+(?:\.\d+)?%?\b', text)
+        numbers = _RE_NUMBER.findall(text)
         if len(numbers) >= 1:
             evidence_count += len(numbers) * 0.4
             evidence_details.append(f"Numerical data: {len(numbers)} instances")
         
         # Years (4-digit numbers that look like years)
-        years = re.findall(r'\b(19|20)\d{2}\b', text)
+        years = _RE_YEAR.findall(text)
         if years:
             evidence_count += len(years) * 0.3
             evidence_details.append(f"Temporal references: {len(years)} dates")
         
         # Quotes (text in quotation marks)
-        quotes = re.findall(r'"[^"]{10,}"', text)
+        quotes = _RE_QUOTE.findall(text)
         if quotes:
             evidence_count += len(quotes)
             evidence_details.append(f"Direct quotes: {len(quotes)}")
@@ -3153,30 +6029,26 @@ class DouEssay:
         - Real-world application assessment
         - Enhanced relevance and insight quality evaluation
         """
-        text_lower = text.lower()
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+        # v14.5.0: Indicator and paragraph lookups go through the shared term index
+        term_index = self.get_term_index(text)
+        paragraph_index = term_index.paragraph_index
+        paragraphs = paragraph_index.segments
         if len(paragraphs) <= 1:
             paragraphs = text.split('. ')
+            paragraph_index = TermIndex([p.lower() for p in paragraphs])
         
         # v12.2.0: Count indicators for each reflection dimension
-        deep_reflection_count = sum(1 for indicator in self.v12_reflection_indicators['deep_reflection'] 
-                                     if indicator in text_lower)
-        personal_growth_count = sum(1 for indicator in self.v12_reflection_indicators['personal_growth'] 
-                                     if indicator in text_lower)
-        real_world_count = sum(1 for indicator in self.v12_reflection_indicators['real_world_application'] 
-                                if indicator in text_lower)
+        deep_reflection_count = term_index.count_present(self.v12_reflection_indicators['deep_reflection'])
+        personal_growth_count = term_index.count_present(self.v12_reflection_indicators['personal_growth'])
+        real_world_count = term_index.count_present(self.v12_reflection_indicators['real_world_application'])
         
         # v12.2.0: Evaluate novelty and relevance of insights
-        novelty_count = sum(1 for indicator in self.v12_2_reflection_enhancements['novelty_indicators']
-                           if indicator in text_lower)
-        relevance_count = sum(1 for indicator in self.v12_2_reflection_enhancements['relevance_indicators']
-                             if indicator in text_lower)
+        novelty_count = term_index.count_present(self.v12_2_reflection_enhancements['novelty_indicators'])
+        relevance_count = term_index.count_present(self.v12_2_reflection_enhancements['relevance_indicators'])
         
         # v12.2.0: Check consistency across paragraphs
-        consistency_count = sum(1 for indicator in self.v12_2_reflection_enhancements['consistency_markers']
-                               if indicator in text_lower)
-        reflection_paragraphs = sum(1 for p in paragraphs 
-                                   if any(ind in p.lower() for ind in self.v12_reflection_indicators['deep_reflection']))
+        consistency_count = term_index.count_present(self.v12_2_reflection_enhancements['consistency_markers'])
+        reflection_paragraphs = len(paragraph_index.containing_any(self.v12_reflection_indicators['deep_reflection']))
         consistency_ratio = min(1.0, consistency_count / max(len(paragraphs) - 1, 1))
         
         # v12.2.0: Enhanced scoring with balanced weighting
@@ -4058,8 +6930,17 @@ class DouEssay:
             'methodology': 'Teacher-validated scoring with transparent provenance'
         }
 
-    def grade_essay(self, essay_text: str, grade_level: str = "Grade 10") -> Dict:
-        """
+    def grade_essay(self, essay_text: str, grade_level: str = "Grade 10",
+                    grammar_profile: Optional[str] = None, fields=None, exclude=None) -> Dict:
+        """
+        v14.5.0: grammar_profile selects which rule families are shown as
+        corrections (see grammar_profile_for); errors are always counted with
+        the full rule set, so the score does not depend on it (except 'fast').
+        v14.5.0: fields / exclude project the result onto the listed top-level
+        keys (RESULT_FIELD_STAGES); analyzers none of them need are skipped.
+        v14.5.0: asyncio callers use grade_essay_async.
+        v14.5.0: inline_feedback and corrections are returned as plain dicts
+        (the legacy JSON shape); grade_essay_stages yields the slotted records.
         v12.2.0: Project Apex → ScholarMind Continuity - >99% accuracy target.
         v12.0.0: Project Apex → ScholarMind Continuity - 99.9% accuracy target.
         v11.0.0: Enhanced with Scholar Intelligence.
@@ -4074,36 +6955,44 @@ class DouEssay:
         - Personal Reflection 2.2: Novelty and consistency evaluation
         - Rhetorical Structure 3.2: Enhanced automatic detection
         """
+        for event in self.grade_essay_stages(essay_text, grade_level, grammar_profile, fields, exclude):
+            if event[0] == 'result':
+                return serialize_result(event[1])
+
+    def grade_essay_stages(self, essay_text: str, grade_level: str = "Grade 10",
+                           grammar_profile: Optional[str] = None, fields=None, exclude=None):
+        """
+        v14.5.0: grade_essay as a stream of events, so callers can show results
+        while the remaining analyzers run. The score only depends on the neural
+        rubric and content analyses, which therefore run first. Yields, in order:
+        ('progress', stage, elapsed_ms) after each stage in GRADING_STAGES,
+        ('score', partial) with score and rubric_level, ('analysis', partial) with
+        feedback, detailed_analysis and inline_feedback, ('corrections', partial)
+        and finally ('result', result), what grade_essay returns except that
+        inline_feedback and corrections stay slotted records (serialize_result
+        converts them). With fields / exclude, stages no selected key needs are skipped (no
+        progress event), partial events carry only what was computed, the result
+        holds only the selected keys and subsystem metrics are not tracked.
+        """
+        selected = resolve_result_fields(fields, exclude)
         if not essay_text or len(essay_text.strip()) < 100:
-            return self.handle_short_essay(essay_text)
-        
+            result = self.handle_short_essay(essay_text)
+            yield ('result', result if selected is None else {k: v for k, v in result.items() if k in selected})
+            return
+        started = time.perf_counter()
+        if selected is None:
+            runs = lambda stage: True
+        else:
+            needed = {stage for field in selected for stage in RESULT_FIELD_STAGES[field]}
+            runs = needed.__contains__
+
+        def progress(stage):
+            return ('progress', stage, round((time.perf_counter() - started) * 1000, 1))
+
         neural_rubric_result = self.assess_with_neural_rubric(essay_text)
-        emotionflow_result = self.analyze_emotionflow(essay_text)
-        
-        feedback_depth = self.assess_feedback_depth(essay_text)
-        context_awareness = self.analyze_context_awareness(essay_text)
-        tone_analysis = self.analyze_tone_recognition(essay_text)
-        
-        absolute_statements = self.detect_absolute_statements(essay_text)
-        claim_evidence_ratio = self.calculate_claim_evidence_ratio(essay_text)
-        logical_fallacies = self.detect_logical_fallacies(essay_text)
-        paragraph_structure_v12 = self.analyze_paragraph_structure_v12(essay_text)
-        emotionflow_v2 = self.analyze_emotionflow_v2(essay_text)
-        reflection_v12 = self.analyze_personal_reflection_v12(essay_text)
-        
-        # v12.2.0: Add new enhanced analysis functions
-        inference_chains = self.analyze_inference_chains_v12_2(essay_text)
-        evidence_types = self.analyze_evidence_types_v12_2(essay_text)
-        
-        # v14.0.0: Add counter-argument evaluation for Doulet Argus 4.4
-        counter_argument_eval = self.evaluate_counter_argument_depth(essay_text)
-        
-        # Existing v8.0.0 analysis (maintained for comprehensive feedback)
-        stats = self.analyze_basic_stats(essay_text)
-        structure = self.analyze_essay_structure_semantic(essay_text)
+        yield progress('neural_rubric')
         content = self.analyze_essay_content_semantic(essay_text)
-        grammar = self.check_grammar_errors(essay_text)
-        application = self.analyze_personal_application_semantic(essay_text)
+        yield progress('content')
         
         # v9.0.0: Use Neural Rubric score as primary, with v8 score as backup
         base_score = neural_rubric_result['overall_percentage']
@@ -4144,31 +7033,83 @@ class DouEssay:
             'description': get_level_description(ontario_level_str),
             'score': score
         }
+        yield ('score', {'score': score, 'rubric_level': rubric_level})
+        
+        analyses = {}
+        for stage, analyzer in (
+                ('emotionflow', self.analyze_emotionflow),
+                ('feedback_depth', self.assess_feedback_depth),
+                ('context_awareness', self.analyze_context_awareness),
+                ('tone_analysis', self.analyze_tone_recognition),
+                ('absolute_statements', self.detect_absolute_statements),
+                ('claim_evidence_ratio', self.calculate_claim_evidence_ratio),
+                ('logical_fallacies', self.detect_logical_fallacies),
+                ('paragraph_structure_v12', self.analyze_paragraph_structure_v12),
+                ('emotionflow_v2', self.analyze_emotionflow_v2),
+                ('reflection_v12', self.analyze_personal_reflection_v12),
+                # v12.2.0: Add new enhanced analysis functions
+                ('inference_chains_v12_2', self.analyze_inference_chains_v12_2),
+                ('evidence_types_v12_2', self.analyze_evidence_types_v12_2),
+                # v14.0.0: Add counter-argument evaluation for Doulet Argus 4.4
+                ('evaluate_counter_argument_depth', self.evaluate_counter_argument_depth),
+                # Existing v8.0.0 analysis (maintained for comprehensive feedback)
+                ('statistics', self.analyze_basic_stats),
+                ('structure', self.analyze_essay_structure_semantic),
+                ('grammar', lambda text: self.check_grammar_errors(text, grammar_profile)),
+                ('application', self.analyze_personal_application_semantic)):
+            if runs(stage):
+                analyses[stage] = analyzer(essay_text)
+                yield progress(stage)
+        stats = analyses.get('statistics')
+        structure = analyses.get('structure')
+        grammar = analyses.get('grammar')
+        application = analyses.get('application')
+        
+        feedback = inline_feedback = corrections = detailed_analysis = paragraph_transitions = None
+        if runs('feedback'):
+            # Generate comprehensive feedback incorporating all analyses
+            feedback = self.generate_ontario_teacher_feedback(
+                score, rubric_level, stats, structure, content, grammar, application, essay_text
+            )
+            yield progress('feedback')
+        if runs('inline_feedback'):
+            inline_feedback = self.analyze_inline_feedback(essay_text)
+            yield progress('inline_feedback')
+        
+        if runs('calibration'):
+            # v14.1.0: Compute Insight score separately (combines reflection + personal connection)
+            insight = {
+                "score": application.get('reflection_score', 0) + application.get('insight_score', 0) * 5,
+                "reflection_depth": application.get('reflection_score', 0),
+                "personal_insight": application.get('insight_score', 0),
+                "real_world_connections": application.get('real_world_score', 0)
+            }
+            
+            # v14.1.0: Apply factor calibration for ≥99% accuracy alignment with teacher grading
+            # Calibrate individual factor scores to match Ontario teacher expectations
+            content, structure, grammar, application, insight = self.calibrate_factor_scores_v14_1(
+                essay_text, grade_level, content, structure, grammar, application, insight, 
+                analyses['evaluate_counter_argument_depth'], analyses['paragraph_structure_v12'], analyses['emotionflow_v2']
+            )
+            
+            # v14.1.0: Extract paragraph transitions for Nexus subsystem
+            paragraph_transitions = structure.get('transition_analysis', {})
+            detailed_analysis = {
+                "statistics": stats,
+                "structure": structure,
+                "content": content,
+                "grammar": grammar,
+                "application": application,
+                "insight": insight  # v14.1.0: Separate insight factor for accuracy testing
+            }
+        partial = {'score': score, 'rubric_level': rubric_level, 'feedback': feedback,
+                   'inline_feedback': inline_feedback, 'detailed_analysis': detailed_analysis}
+        yield ('analysis', partial if selected is None else {k: v for k, v in partial.items() if v is not None})
         
-        # Generate comprehensive feedback incorporating all analyses
-        feedback = self.generate_ontario_teacher_feedback(
-            score, rubric_level, stats, structure, content, grammar, application, essay_text
-        )
-        corrections = self.get_grammar_corrections(essay_text)
-        inline_feedback = self.analyze_inline_feedback(essay_text)
-        
-        # v14.1.0: Compute Insight score separately (combines reflection + personal connection)
-        insight = {
-            "score": application.get('reflection_score', 0) + application.get('insight_score', 0) * 5,
-            "reflection_depth": application.get('reflection_score', 0),
-            "personal_insight": application.get('insight_score', 0),
-            "real_world_connections": application.get('real_world_score', 0)
-        }
-        
-        # v14.1.0: Apply factor calibration for ≥99% accuracy alignment with teacher grading
-        # Calibrate individual factor scores to match Ontario teacher expectations
-        content, structure, grammar, application, insight = self.calibrate_factor_scores_v14_1(
-            essay_text, grade_level, content, structure, grammar, application, insight, 
-            counter_argument_eval, paragraph_structure_v12, emotionflow_v2
-        )
-        
-        # v14.1.0: Extract paragraph transitions for Nexus subsystem
-        paragraph_transitions = structure.get('transition_analysis', {})
+        if runs('corrections'):
+            corrections = self.get_grammar_corrections(essay_text, grammar_profile)
+            yield progress('corrections')
+            yield ('corrections', {'corrections': corrections})
         
         result = {
             "score": score,
@@ -4177,41 +7118,143 @@ class DouEssay:
             "corrections": corrections,
             "inline_feedback": inline_feedback,
             "neural_rubric": neural_rubric_result,
-            "emotionflow": emotionflow_result,
-            "feedback_depth": feedback_depth,
-            "context_awareness": context_awareness,
-            "tone_analysis": tone_analysis,
+            "emotionflow": analyses.get('emotionflow'),
+            "feedback_depth": analyses.get('feedback_depth'),
+            "context_awareness": analyses.get('context_awareness'),
+            "tone_analysis": analyses.get('tone_analysis'),
             "teacher_calibration": calibration_result,
-            "absolute_statements": absolute_statements,
-            "claim_evidence_ratio": claim_evidence_ratio,
-            "logical_fallacies": logical_fallacies,
-            "paragraph_structure_v12": paragraph_structure_v12,
-            "emotionflow_v2": emotionflow_v2,
-            "reflection_v12": reflection_v12,
-            "inference_chains_v12_2": inference_chains,
-            "evidence_types_v12_2": evidence_types,
-            "evaluate_counter_argument_depth": counter_argument_eval,
+            "absolute_statements": analyses.get('absolute_statements'),
+            "claim_evidence_ratio": analyses.get('claim_evidence_ratio'),
+            "logical_fallacies": analyses.get('logical_fallacies'),
+            "paragraph_structure_v12": analyses.get('paragraph_structure_v12'),
+            "emotionflow_v2": analyses.get('emotionflow_v2'),
+            "reflection_v12": analyses.get('reflection_v12'),
+            "inference_chains_v12_2": analyses.get('inference_chains_v12_2'),
+            "evidence_types_v12_2": analyses.get('evidence_types_v12_2'),
+            "evaluate_counter_argument_depth": analyses.get('evaluate_counter_argument_depth'),
             "paragraph_transitions": paragraph_transitions,  # v14.1.0: For Nexus subsystem
-            "detailed_analysis": {
-                "statistics": stats,
-                "structure": structure,
-                "content": content,
-                "grammar": grammar,
-                "application": application,
-                "insight": insight  # v14.1.0: Separate insight factor for accuracy testing
-            }
+            "detailed_analysis": detailed_analysis
         }
+        if selected is not None:
+            yield ('result', {key: value for key, value in result.items() if key in selected})
+            return
         
         # v12.4.0: Track subsystem metrics to database (if Supabase is enabled)
         self.track_subsystem_metrics(essay_text, result)
         
+        yield ('result', result)
+
+    async def grade_essay_async(self, essay_text: str, grade_level: str = "Grade 10",
+                                grammar_profile: Optional[str] = None, fields=None, exclude=None,
+                                executor=None) -> Dict:
+        """v14.5.0: grade_essay for asyncio callers; see grade_essay_stages_async."""
+        result = None
+        async for event in self.grade_essay_stages_async(essay_text, grade_level, grammar_profile, fields, exclude,
+                                                         executor=executor):
+            if event[0] == 'result':
+                result = serialize_result(event[1])
         return result
 
+    async def grade_essay_stages_async(self, essay_text: str, grade_level: str = "Grade 10",
+                                       grammar_profile: Optional[str] = None, fields=None, exclude=None,
+                                       executor=None):
+        """
+        v14.5.0: grade_essay_stages for asyncio callers, as an async generator of
+        the same events. The analyzers run on executor and hand each event back
+        to the loop as it is ready. The grammar check starts at once on a second
+        executor thread, so LanguageTool I/O overlaps the CPU analyzers and the
+        grammar stage joins it instead of checking again. Each grading therefore
+        holds up to two executor threads; the default executor is a process-wide
+        pool of DOUESSAY_ASYNC_GRADING_THREADS threads, so beyond about half that
+        many concurrent gradings the rest queue instead of adding threads. The
+        loop never blocks on grading, so one loop can keep many gradings in
+        flight. Leaving early stops the analyzers at the next stage boundary.
+        """
+        loop = asyncio.get_running_loop()
+        if executor is None:
+            executor = _get_async_grading_executor()
+        selected = resolve_result_fields(fields, exclude)
+        needs_grammar = selected is None or any(
+            stage in ('grammar', 'corrections') for field in selected for stage in RESULT_FIELD_STAGES[field])
+        if (needs_grammar and self.grammar_enabled and grammar_profile != 'fast'
+                and essay_text and len(essay_text.strip()) >= 100):
+            loop.run_in_executor(executor, self._prefetch_grammar, essay_text,
+                                 _grading_grammar_profile(grammar_profile))
+        events = asyncio.Queue()
+        abandoned = threading.Event()
+        finished = object()
+
+        def produce():
+            stages = self.grade_essay_stages(essay_text, grade_level, grammar_profile, selected)
+            outcome = None
+            try:
+                for event in stages:
+                    if abandoned.is_set():
+                        return
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+            except BaseException as e:
+                outcome = e
+            finally:
+                stages.close()
+            if not abandoned.is_set():
+                loop.call_soon_threadsafe(events.put_nowait, (finished, outcome))
+
+        loop.run_in_executor(executor, produce)
+        try:
+            while True:
+                event = await events.get()
+                if event[0] is finished:
+                    if event[1] is not None:
+                        raise event[1]
+                    return
+                yield event
+        finally:
+            abandoned.set()
+
+    def _prefetch_grammar(self, essay_text: str, grammar_profile: Optional[str]) -> None:
+        try:
+            self.check_grammar(essay_text, grammar_profile)
+        except Exception:
+            # A grammar stage that joined this check gets the same exception, otherwise it
+            # runs its own check; either way check_grammar_errors logs the fallback score
+            pass
+
+    def stream_grade_essay(self, essay_text: str, grade_level: str = "Grade 10",
+                           grammar_profile: Optional[str] = None, owner=None, pool=None, fields=None,
+                           charge=None):
+        """
+        v14.5.0: grade_essay_stages behind single-flight coalescing, run in-process
+        or in a worker pool (which relays the stage events). Records
+        time_to_first_result_ms (first score) and time_to_complete_ms in
+        self.latency. fields is a resolve_result_fields selection (None for the
+        full result). charge() records the request's usage when the coalescing
+        usage policy counts it (see SingleFlight.do).
+        """
+        started = time.perf_counter()
+        if pool is not None:
+            events = lambda: pool.grade_stages(essay_text, grade_level, grammar_profile, fields=fields)
+        else:
+            events = lambda: self.grade_essay_stages(essay_text, grade_level, grammar_profile, fields)
+        key = self.grading_key(essay_text, grade_level, grammar_profile, fields)
+        waiting_for_first = True
+        for event in self.grading_flights.stream(key, events, owner=owner, charge=charge):
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if waiting_for_first and event[0] in ('score', 'result'):
+                self.latency.record('time_to_first_result_ms', elapsed_ms)
+                waiting_for_first = False
+            if event[0] == 'result':
+                self.latency.record('time_to_complete_ms', elapsed_ms)
+            yield event
+
     def get_subsystem_info_html(self) -> str:
         """
         v14.0.0: Generate HTML display of all Doulet Media subsystems with versions and copyrights.
         Returns formatted HTML for display in Gradio interface.
+        v14.5.0: Built once per process; the subsystem metadata is static.
         """
+        return self.fragments.static('subsystem_info', self._render_subsystem_info_html)
+
+    def _render_subsystem_info_html(self) -> str:
         html = ['<div style="font-family: Arial, sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; border-radius: 10px; color: white;">']
         html.append('<h2 style="margin: 0 0 15px 0; text-align: center;">🔧 Doulet Media Grading Subsystems v14.2.0</h2>')
         html.append('<p style="margin: 0 0 20px 0; text-align: center; opacity: 0.9;">Perfect-Accuracy Upgrade • ≥99% All Factors & Subsystems • AutoAlign v2</p>')
@@ -4286,7 +7329,7 @@ class DouEssay:
         
         Copyright © 2025 Doulet Media. All rights reserved.
         """
-        if not self.license_manager.client:
+        if self.license_manager.store is None:
             # No database connection, skip tracking
             return
         
@@ -4382,17 +7425,11 @@ class DouEssay:
                 'doureflect_v4': doureflect_data
             }
             
-            # Store in a general metrics table (fallback if individual tables don't exist)
-            try:
-                self.license_manager.client.table('subsystem_metrics').insert({
-                    'essay_id': essay_id,
-                    'timestamp': timestamp,
-                    'version': '12.4.0',
-                    'metrics': json.dumps(metrics_summary)
-                }).execute()
-            except Exception as e:
-                logger.warning(f"Could not store subsystem metrics: {e}")
-                # Continue execution even if metrics storage fails
+            # v14.5.0: Roll up locally; only sampled rows and per-window rollups reach the
+            # general metrics table. Failed writes stay queued for the next flush.
+            self.metrics_aggregator.record(metrics_summary)
+            store = self.license_manager.store
+            self.metrics_aggregator.flush(store.insert_metrics, breaker=getattr(store, 'breaker', None))
                 
         except Exception as e:
             logger.error(f"Error tracking subsystem metrics: {e}")
@@ -4443,7 +7480,7 @@ class DouEssay:
 
     def analyze_basic_stats(self, text: str) -> Dict:
         words = text.split()
-        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+        sentences = [s.strip() for s in _SENTENCE_DELIMITER.split(text) if s.strip()]
         paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
         avg_sentence_len = len(words) / max(1, len(sentences)) if sentences else 0
         
@@ -4806,7 +7843,7 @@ class DouEssay:
         and persuasive language.
         """
         text_lower = text.lower()
-        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+        sentences = [s.strip() for s in _SENTENCE_DELIMITER.split(text) if s.strip()]
         
         # Detect rhetorical questions
         rhetorical_questions = sum(1 for s in sentences if '?' in s and 
@@ -4890,7 +7927,7 @@ class DouEssay:
         Fixed paragraph flow scoring to ensure accurate cross-paragraph analysis.
         """
         text_lower = text.lower()
-        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+        sentences = [s.strip() for s in _SENTENCE_DELIMITER.split(text) if s.strip()]
         paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
         
         # Enhanced evidence markers with more patterns
@@ -5073,7 +8110,7 @@ class DouEssay:
         Fixed to ensure non-zero scores for essays with valid evidence.
         """
         text_lower = text.lower()
-        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+        sentences = [s.strip() for s in _SENTENCE_DELIMITER.split(text) if s.strip()]
         word_count = len(text.split())
         
         # Enhanced relevance indicators counting
@@ -5484,50 +8521,294 @@ class DouEssay:
     
 
 
-    def check_grammar_errors(self, text: str) -> Dict:
+    def check_grammar(self, text: str, profile: Optional[str] = None) -> List[GrammarMatch]:
+        """
+        v14.5.0: Single entry point for LanguageTool checks. Recent results are
+        kept so grade_essay's error count and corrections share one check (and
+        essays pre-checked by check_grammar_batch are not checked again); with a
+        grammar cache only sentences never seen before reach the JVM.
+        profile names a GRAMMAR_RULE_PROFILES entry (None = 'full').
+        """
+        profile = None if profile == 'full' else profile
+        matches = self._grammar_matches.get((text, profile))
+        if matches is None:
+            # Concurrent checks of the same text (e.g. grade_essay_async's prefetch and its grammar stage) share one
+            matches, _ = self._grammar_flights.do((text, profile), lambda: self._check_grammar_once(text, profile))
+        return matches
+
+    def _check_grammar_once(self, text: str, profile: Optional[str]) -> List[GrammarMatch]:
+        matches = self._grammar_matches.get((text, profile))
+        if matches is None:
+            if self.grammar_cache is None or profile == 'fast':
+                matches = self.check_text(text, profile)
+            else:
+                matches = self._check_grammar_cached([text], profile)[0]
+            self._remember_grammar(text, profile, matches)
+        return matches
+
+    def check_grammar_batch(self, texts: List[str], profile: Optional[str] = None) -> List[List[GrammarMatch]]:
+        """
+        v14.5.0: Grammar-check a class set with a few large LanguageTool
+        requests instead of one round trip per essay. Essays (or, with a grammar
+        cache, every unseen sentence across the class) are packed into requests
+        of up to GRAMMAR_BATCH_CHARS, separated by blank lines; offsets are mapped
+        back to each essay and matches that would span a separator are dropped.
+        Results are also remembered for later check_grammar/grade_essay calls.
+        """
+        profile = None if profile == 'full' else profile
+        results = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            matches = self._grammar_matches.get((text, profile))
+            if matches is None:
+                pending.append(text)
+            else:
+                results[text] = matches
+        if pending:
+            if profile == 'fast':
+                checked = [self.fast_grammar_backend.check(text) for text in pending]
+            elif self.grammar_cache is None:
+                checked = self._check_packed(pending, profile)
+            else:
+                checked = self._check_grammar_cached(pending, profile)
+            for text, matches in zip(pending, checked):
+                results[text] = matches
+                self._remember_grammar(text, profile, matches)
+        return [results[text] for text in texts]
+
+    def _remember_grammar(self, text: str, profile: Optional[str], matches: List[GrammarMatch]):
+        with self._grammar_memo_lock:
+            memo = self._grammar_matches
+            memo[(text, profile)] = matches
+            while len(memo) > GRAMMAR_MEMO_SIZE:
+                del memo[next(iter(memo))]
+
+    def _tool_check(self, text: str, profile: Optional[str] = None):
+        """v14.5.0: One backend request; backends without profile support use their own rule set."""
+        if profile == 'fast':
+            return self.fast_grammar_backend.check(text)
+        if profile and getattr(self.grammar_tool, 'supports_profiles', False):
+            return self.grammar_tool.check(text, profile=profile)
+        return self.grammar_tool.check(text)
+
+    def _check_grammar_cached(self, texts: List[str], profile: Optional[str] = None) -> List[List[GrammarMatch]]:
+        per_text = []
+        for text in texts:
+            segments = []
+            for start, end in _grammar_segments(text):
+                normalized, positions = _normalize_sentence(text[start:end])
+                segments.append((start, normalized, positions))
+            per_text.append(segments)
+        namespace = _grammar_profile_key(profile)
+        sentences = {normalized for segments in per_text for _, normalized, _ in segments}
+        known = self.grammar_cache.get_many(sentences, namespace)
+        unseen = [sentence for sentence in dict.fromkeys(normalized for segments in per_text
+                                                         for _, normalized, _ in segments)
+                  if sentence not in known]
+        if unseen:
+            fresh = self.check_sentences(unseen, profile)
+            self.grammar_cache.put_many(fresh, namespace)
+            known.update(fresh)
+        return [[match.relocated(start, positions)
+                 for start, normalized, positions in segments
+                 for match in known[normalized]]
+                for segments in per_text]
+
+    def check_text(self, text: str, profile: Optional[str] = None) -> List[GrammarMatch]:
+        """
+        v14.5.0: Run LanguageTool over text. Texts longer than
+        GRAMMAR_CHUNK_CHARS are split on paragraph boundaries and the chunks
+        checked concurrently (spread across the server pool when there is one);
+        offsets are re-based into the original text and each match is kept only
+        by the chunk that owns its position, so overlaps never double-count.
+        """
+        if len(text) <= GRAMMAR_CHUNK_CHARS:
+            return [GrammarMatch.from_tool_match(match) for match in self._tool_check(text, profile)]
+        chunks = _grammar_chunks(text)
+        if len(chunks) == 1:
+            return [GrammarMatch.from_tool_match(match) for match in self._tool_check(text, profile)]
+
+        def check_chunk(chunk):
+            check_start, check_end, own_start, own_end = chunk
+            found = []
+            for match in self._tool_check(text[check_start:check_end], profile):
+                offset = match.offset + check_start
+                if own_start <= offset < own_end:
+                    found.append(GrammarMatch.from_tool_match(match, base=-check_start))
+            return found
+
+        matches = []
+        for found in _get_grammar_executor().map(check_chunk, chunks):
+            matches.extend(found)
+        return matches
+
+    def check_sentences(self, sentences: List[str], profile: Optional[str] = None) -> Dict[str, List[GrammarMatch]]:
+        """v14.5.0: Sentence-relative matches for many sentences, packed into few requests."""
+        return dict(zip(sentences, self._check_packed(sentences, profile)))
+
+    def _check_packed(self, parts: List[str], profile: Optional[str] = None) -> List[List[GrammarMatch]]:
+        """
+        v14.5.0: Check many texts with as few requests as possible. Parts are
+        joined with GRAMMAR_BATCH_SEPARATOR into requests of up to
+        GRAMMAR_BATCH_CHARS (sent concurrently); each match is mapped back to the
+        part it falls in with part-relative offsets. A part too large to pack
+        goes through check_text (and is chunked if long).
+        """
+        results = [None] * len(parts)
+        batches = []
+        current, size = [], 0
+        separator = GRAMMAR_BATCH_SEPARATOR
+        for i, part in enumerate(parts):
+            if len(part) > GRAMMAR_BATCH_CHARS:
+                results[i] = self.check_text(part, profile)
+                continue
+            if current and size + len(separator) + len(part) > GRAMMAR_BATCH_CHARS:
+                batches.append(current)
+                current, size = [], 0
+            size += (len(separator) if current else 0) + len(part)
+            current.append(i)
+        if current:
+            batches.append(current)
+
+        def check_batch(batch):
+            starts = []
+            offset = 0
+            for i in batch:
+                starts.append(offset)
+                offset += len(parts[i]) + len(separator)
+            found = [[] for _ in batch]
+            for match in self._tool_check(separator.join(parts[i] for i in batch), profile):
+                match = GrammarMatch.from_tool_match(match)
+                k = bisect.bisect_right(starts, match.offset) - 1
+                relative = match.offset - starts[k]
+                if k >= 0 and relative + match.errorLength <= len(parts[batch[k]]):
+                    found[k].append(GrammarMatch(relative, match.errorLength, match.replacements,
+                                                 match.message, match.ruleId, match.category))
+            return found
+
+        if len(batches) == 1:
+            outputs = [check_batch(batches[0])]
+        else:
+            outputs = _get_grammar_executor().map(check_batch, batches)
+        for batch, found in zip(batches, outputs):
+            for i, matches in zip(batch, found):
+                results[i] = matches
+        return results
+
+    def grammar_health(self) -> Dict:
+        """v14.5.0: Health state of the grammar backend (latency, error rate, RSS, recycles)."""
         if not self.grammar_enabled:
+            return {'state': 'disabled', 'backend': None}
+        health = getattr(self.grammar_tool, 'health', None)
+        if health is None:
+            return {'state': 'unsupervised', 'backend': getattr(self.grammar_tool, 'name', type(self.grammar_tool).__name__)}
+        return health()
+
+    def engine_fingerprint(self, grammar_profile: Optional[str] = None) -> str:
+        """v14.5.0: Everything besides the essay and grade that can change a grade_essay result."""
+        grammar = _grammar_tool_fingerprint(self.grammar_tool) if self.grammar_enabled else 'none'
+        return f'{VERSION}|{grammar}|{_grammar_profile_key(grammar_profile)}|{int(self.token_matching)}'
+
+    def grading_key(self, essay_text: str, grade_level: str, grammar_profile: Optional[str] = None,
+                    fields=None) -> Tuple:
+        """v14.5.0: (essay hash, grade level, engine fingerprint[, fields]) identifying one grading computation."""
+        key = (hashlib.sha256(essay_text.encode('utf-8')).hexdigest(), grade_level,
+               self.engine_fingerprint(grammar_profile))
+        return key if fields is None else key + (frozenset(fields),)
+
+    @staticmethod
+    def grammar_score_from_count(error_count: int) -> int:
+        if error_count == 0:
+            return 10
+        elif error_count <= 2:
+            return 9
+        elif error_count <= 5:
+            return 8
+        elif error_count <= 8:
+            return 7
+        return 6
+
+    def compare_grammar_backends(self, texts: List, reference: Optional[GrammarBackend] = None,
+                                 candidate: Optional[GrammarBackend] = None) -> Dict:
+        """
+        v14.5.0: Agreement of a grammar backend (default: the heuristic engine)
+        with a reference (default: the configured LanguageTool backend). A
+        candidate match agrees when it overlaps a reference match; precision,
+        recall and how often both give the same grammar score are reported.
+        Accepts plain strings or teacher-dataset records ({'text': ...}).
+        """
+        reference = reference or self.grammar_tool
+        candidate = candidate or self.fast_grammar_backend
+        true_positive = candidate_total = reference_found = reference_total = same_score = 0
+        rows = []
+        for item in texts:
+            text = item.get('text', '') if isinstance(item, dict) else item
+            expected = [GrammarMatch.from_tool_match(m) for m in reference.check(text)]
+            found = [GrammarMatch.from_tool_match(m) for m in candidate.check(text)]
+
+            def overlaps(a, b):
+                return a.offset < b.offset + max(1, b.errorLength) and b.offset < a.offset + max(1, a.errorLength)
+
+            agreeing = sum(1 for f in found if any(overlaps(f, e) for e in expected))
+            recalled = sum(1 for e in expected if any(overlaps(e, f) for f in found))
+            true_positive += agreeing
+            candidate_total += len(found)
+            reference_found += recalled
+            reference_total += len(expected)
+            score_match = self.grammar_score_from_count(len(found)) == self.grammar_score_from_count(len(expected))
+            same_score += score_match
+            rows.append({'reference_count': len(expected), 'candidate_count': len(found),
+                         'agreeing': agreeing, 'same_score': score_match})
+        precision = true_positive / candidate_total if candidate_total else 1.0
+        recall = reference_found / reference_total if reference_total else 1.0
+        return {
+            'essays': rows,
+            'reference': getattr(reference, 'name', type(reference).__name__),
+            'candidate': getattr(candidate, 'name', type(candidate).__name__),
+            'precision': round(precision, 3),
+            'recall': round(recall, 3),
+            'f1': round(2 * precision * recall / (precision + recall), 3) if precision + recall else 0.0,
+            'score_agreement': round(same_score / len(rows), 3) if rows else 0.0
+        }
+
+    def check_grammar_errors(self, text: str, profile: Optional[str] = None) -> Dict:
+        """v14.5.0: Counts errors with the full rule set whatever the profile, except 'fast'."""
+        if not self.grammar_enabled and profile != 'fast':
             return {"error_count": 0, "score": 8}
             
         try:
-            matches = self.grammar_tool.check(text)
+            matches = self.check_grammar(text, _grading_grammar_profile(profile))
             error_count = len(matches)
-            if error_count == 0:
-                grammar_score = 10
-            elif error_count <= 2:
-                grammar_score = 9
-            elif error_count <= 5:
-                grammar_score = 8
-            elif error_count <= 8:
-                grammar_score = 7
-            else:
-                grammar_score = 6
-                
             return {
                 "error_count": error_count,
-                "score": grammar_score
+                "score": self.grammar_score_from_count(error_count)
             }
-        except:
+        except Exception as e:
+            # v14.5.0: Logged (and counted by the grammar supervisor) instead of silently swallowed
+            logger.warning(f"Grammar check failed, using fallback score: {e}")
             return {"error_count": 0, "score": 8}
 
-    def get_grammar_corrections(self, text: str) -> List[Dict]:
-        if not self.grammar_enabled:
+    def get_grammar_corrections(self, text: str, profile: Optional[str] = None) -> List[GrammarCorrection]:
+        """
+        v14.5.0: Returns slotted GrammarCorrection records (original text is an offset view).
+        The profile filters the full-rule-set matches by rule family, so no second check runs.
+        """
+        if not self.grammar_enabled and profile != 'fast':
             return []
             
         try:
-            matches = self.grammar_tool.check(text)
+            matches = [match for match in self.check_grammar(text, _grading_grammar_profile(profile))
+                       if _profile_shows(profile, match)]
             corrections = []
             for match in matches[:10]:
                 if match.replacements:
-                    correction = {
-                        'offset': match.offset,
-                        'length': match.errorLength,
-                        'original': text[match.offset:match.offset + match.errorLength],
-                        'suggestion': match.replacements[0],
-                        'message': match.message
-                    }
-                    corrections.append(correction)
+                    corrections.append(GrammarCorrection(
+                        text, match.offset, match.errorLength,
+                        match.replacements[0], match.message
+                    ))
             return corrections
-        except:
+        except Exception as e:
+            logger.warning(f"Grammar corrections unavailable: {e}")
             return []
 
     def calculate_calibrated_ontario_score(self, stats: Dict, structure: Dict, content: Dict, 
@@ -5876,7 +9157,7 @@ class DouEssay:
         
         for i, para in enumerate(paragraphs):
             para_lower = para.lower()
-            sentences = [s.strip() for s in re.split(r'[.!?]+', para) if s.strip()]
+            sentences = [s.strip() for s in _SENTENCE_DELIMITER.split(para) if s.strip()]
             
             issues = []
             
@@ -6073,14 +9354,18 @@ class DouEssay:
             'repetition_score': 1.0 - (len(overused_words) / max(1, len(word_freq)))
         }
 
-    def analyze_inline_feedback(self, essay_text: str) -> List[Dict]:
+    def analyze_inline_feedback(self, essay_text: str) -> List[InlineFeedbackItem]:
         """
+        v14.5.0: Returns slotted InlineFeedbackItem records that reference their
+        sentence by offset into essay_text (serialize with serialize_records).
         v14.0.0: Enhanced style suggestions without word repetition warnings.
         Prevents overlapping suggestions for the same sentence.
         Allows stylistic and rhetorical word repetition for emphasis.
         """
         inline_feedback = []
-        sentences = [s.strip() for s in re.split(r'[.!?]+', essay_text) if s.strip()]
+        span_table = self.get_span_table(essay_text)
+        spans = span_table.spans
+        sentences = [essay_text[start:end] for start, end in spans]
         feedback_seen = {}  # v4.0.0: Track feedback per sentence to avoid duplicates
         
         # v14.0.0: Word repetition detection removed to allow rhetorical emphasis
@@ -6088,6 +9373,7 @@ class DouEssay:
         
         for idx, sentence in enumerate(sentences):
             sentence_lower = sentence.lower()
+            start, end = spans[idx]
             
             # v4.0.0: Initialize feedback tracking for this sentence
             if idx not in feedback_seen:
@@ -6099,13 +9385,10 @@ class DouEssay:
                 if not any(word in sentence_lower for word in ['because', 'for example', 'such as', 'specifically']):
                     # v4.0.0: Only add if not already flagged for this sentence
                     if 'vague_statement' not in feedback_seen[idx]:
-                        inline_feedback.append({
-                            'sentence_index': idx,
-                            'sentence': sentence,
-                            'type': 'vague_statement',
-                            'severity': 'yellow',
-                            'suggestion': random.choice(self.inline_suggestions['vague_statement'])
-                        })
+                        inline_feedback.append(InlineFeedbackItem(
+                            essay_text, start, end, idx, 'vague_statement', 'yellow',
+                            random.choice(self.inline_suggestions['vague_statement'])
+                        ))
                         feedback_seen[idx].add('vague_statement')
             
             # Check for weak analysis
@@ -6113,35 +9396,25 @@ class DouEssay:
                 if not any(word in sentence_lower for word in ['because', 'this shows', 'this demonstrates', 'therefore']):
                     # v4.0.0: Avoid duplicate if already flagged as vague
                     if 'weak_analysis' not in feedback_seen[idx] and 'vague_statement' not in feedback_seen[idx]:
-                        inline_feedback.append({
-                            'sentence_index': idx,
-                            'sentence': sentence,
-                            'type': 'weak_analysis',
-                            'severity': 'yellow',
-                            'suggestion': random.choice(self.inline_suggestions['weak_analysis'])
-                        })
+                        inline_feedback.append(InlineFeedbackItem(
+                            essay_text, start, end, idx, 'weak_analysis', 'yellow',
+                            random.choice(self.inline_suggestions['weak_analysis'])
+                        ))
                         feedback_seen[idx].add('weak_analysis')
             
             # v14.0.0: Word repetition warnings removed - allows stylistic and rhetorical emphasis
             # Removed to allow intentional word repetition for rhetorical effect and emphasis
             
             # Check for generic words
-            generic_words = ['very', 'really', 'a lot', 'many', 'most', 'some', 'things', 'stuff', 'big', 'small']
-            found_generic = [
-                word for word in generic_words
-                if re.search(r'\b' + re.escape(word) + r'\b', sentence_lower)
-            ]
+            # v14.5.0: One compiled alternation scan per sentence; report the highest-priority word found
+            found_generic = sorted(set(_RE_GENERIC_WORD.findall(sentence_lower)), key=_GENERIC_WORD_PRIORITY.get)
             if found_generic and 'generic_word' not in feedback_seen[idx]:
-                alternatives = self.get_vocabulary_alternatives(found_generic[0])
-                inline_feedback.append({
-                    'sentence_index': idx,
-                    'sentence': sentence,
-                    'type': 'generic_word',
-                    'severity': 'yellow',
-                    'suggestion': f"💡 Vocabulary: Replace '{found_generic[0]}' with: {', '.join(alternatives)}",
-                    'word': found_generic[0],
-                    'alternatives': alternatives
-                })
+                # v14.5.0: Suggestion text is formatted lazily from the shared alternatives tuple
+                inline_feedback.append(InlineFeedbackItem(
+                    essay_text, start, end, idx, 'generic_word', 'yellow',
+                    word=found_generic[0],
+                    alternatives=_VOCABULARY_ALTERNATIVES.get(found_generic[0].lower(), _DEFAULT_VOCABULARY_ALTERNATIVES)
+                ))
                 feedback_seen[idx].add('generic_word')
             
             # v6.0.0: Enhanced sentence variety checking
@@ -6151,13 +9424,10 @@ class DouEssay:
                 
                 # Check for repetitive sentence openings
                 if current_start == prev_start and current_start in ['the', 'it', 'this', 'they', 'students', 'teachers', 'people', 'in', 'when', 'there']:
-                    inline_feedback.append({
-                        'sentence_index': idx,
-                        'sentence': sentence,
-                        'type': 'repetitive_start',
-                        'severity': 'yellow',
-                        'suggestion': random.choice(self.inline_suggestions['repetitive_start'])
-                    })
+                    inline_feedback.append(InlineFeedbackItem(
+                        essay_text, start, end, idx, 'repetitive_start', 'yellow',
+                        random.choice(self.inline_suggestions['repetitive_start'])
+                    ))
                 
                 # v6.0.0: Check for similar sentence lengths (monotonous rhythm)
                 current_len = len(sentence.split())
@@ -6166,136 +9436,141 @@ class DouEssay:
                     prev_prev_len = len(sentences[idx-2].split())
                     # If 3 consecutive sentences are similar length, suggest variety
                     if abs(current_len - prev_len) <= 2 and abs(prev_len - prev_prev_len) <= 2 and 'sentence_variety' not in feedback_seen[idx]:
-                        inline_feedback.append({
-                            'sentence_index': idx,
-                            'sentence': sentence,
-                            'type': 'monotonous_rhythm',
-                            'severity': 'yellow',
-                            'suggestion': "💡 Sentence Variety: Vary sentence length for better rhythm. Try mixing short, punchy sentences with longer, complex ones."
-                        })
+                        inline_feedback.append(InlineFeedbackItem(
+                            essay_text, start, end, idx, 'monotonous_rhythm', 'yellow',
+                            "💡 Sentence Variety: Vary sentence length for better rhythm. Try mixing short, punchy sentences with longer, complex ones."
+                        ))
                         feedback_seen[idx].add('sentence_variety')
             
             # Check for passive voice
             passive_indicators = [' is ', ' are ', ' was ', ' were ', ' been ', ' being ']
             if any(indicator in f' {sentence_lower} ' for indicator in passive_indicators):
                 if any(word in f' {sentence_lower} ' for word in [' by ', ' done ', ' made ', ' created ']):
-                    inline_feedback.append({
-                        'sentence_index': idx,
-                        'sentence': sentence,
-                        'type': 'passive_voice',
-                        'severity': 'yellow',
-                        'suggestion': random.choice(self.inline_suggestions['passive_voice'])
-                    })
+                    inline_feedback.append(InlineFeedbackItem(
+                        essay_text, start, end, idx, 'passive_voice', 'yellow',
+                        random.choice(self.inline_suggestions['passive_voice'])
+                    ))
         
         # Identify strengths to highlight in green
         for idx, sentence in enumerate(sentences):
             sentence_lower = sentence.lower()
+            start, end = spans[idx]
             
             # Strong analytical language
             if any(phrase in sentence_lower for phrase in ['this demonstrates', 'this shows that', 'this illustrates', 
                                                            'for example', 'specifically', 'as evidence', 'research shows']):
-                inline_feedback.append({
-                    'sentence_index': idx,
-                    'sentence': sentence,
-                    'type': 'strength',
-                    'severity': 'green',
-                    'suggestion': '✅ Strong analytical connection! This effectively supports your argument.'
-                })
+                inline_feedback.append(InlineFeedbackItem(
+                    essay_text, start, end, idx, 'strength', 'green',
+                    '✅ Strong analytical connection! This effectively supports your argument.'
+                ))
             
             # Good personal insight
             if any(phrase in sentence_lower for phrase in ['in my experience', 'i learned', 'this taught me', 
                                                            'i realized', 'from my perspective']):
-                inline_feedback.append({
-                    'sentence_index': idx,
-                    'sentence': sentence,
-                    'type': 'strength',
-                    'severity': 'green',
-                    'suggestion': '✅ Excellent personal reflection! This adds depth to your essay.'
-                })
+                inline_feedback.append(InlineFeedbackItem(
+                    essay_text, start, end, idx, 'strength', 'green',
+                    '✅ Excellent personal reflection! This adds depth to your essay.'
+                ))
         
+        span_table.set_layer('inline_feedback', inline_feedback)
         return inline_feedback
 
     def get_vocabulary_alternatives(self, word: str) -> List[str]:
         """
+        v14.5.0: Backed by the shared module-level _VOCABULARY_ALTERNATIVES table.
         v6.0.0: Enhanced with more sophisticated vocabulary alternatives.
         """
-        vocab_map = {
-            'very': ['extremely', 'remarkably', 'particularly', 'exceptionally', 'profoundly', 'decidedly'],
-            'really': ['genuinely', 'truly', 'certainly', 'indeed', 'authentically', 'undeniably'],
-            'a lot': ['numerous', 'substantial', 'considerable', 'extensive', 'abundant', 'copious'],
-            'many': ['numerous', 'various', 'multiple', 'countless', 'myriad', 'manifold'],
-            'most': ['majority of', 'predominant', 'principal', 'primary', 'preponderant'],
-            'some': ['several', 'certain', 'particular', 'specific', 'select', 'designated'],
-            'things': ['elements', 'aspects', 'factors', 'components', 'dimensions', 'facets'],
-            'stuff': ['material', 'content', 'subject matter', 'information', 'data', 'resources'],
-            'big': ['substantial', 'significant', 'considerable', 'extensive', 'monumental', 'profound'],
-            'small': ['minimal', 'modest', 'limited', 'negligible', 'marginal', 'inconsequential'],
-            'good': ['beneficial', 'advantageous', 'valuable', 'effective', 'constructive', 'favorable'],
-            'bad': ['detrimental', 'problematic', 'ineffective', 'counterproductive', 'adverse', 'harmful'],
-            'important': ['significant', 'crucial', 'vital', 'essential', 'pivotal', 'paramount'],
-            'get': ['obtain', 'acquire', 'attain', 'procure', 'secure', 'gain'],
-            'make': ['create', 'construct', 'produce', 'generate', 'develop', 'formulate'],
-            'show': ['demonstrate', 'illustrate', 'exhibit', 'reveal', 'display', 'manifest'],
-            'use': ['utilize', 'employ', 'apply', 'implement', 'leverage', 'harness']
-        }
-        return vocab_map.get(word.lower(), ['more specific term'])
+        return list(_VOCABULARY_ALTERNATIVES.get(word.lower(), _DEFAULT_VOCABULARY_ALTERNATIVES))
 
-    def create_annotated_essay_html(self, essay_text: str, inline_feedback: List[Dict]) -> str:
-        """Create HTML version of essay with color-coded inline annotations."""
-        sentences = [s.strip() for s in re.split(r'([.!?]+)', essay_text) if s.strip()]
-        
-        # Create a mapping of sentence index to feedback
-        feedback_map = {}
-        for feedback in inline_feedback:
-            idx = feedback['sentence_index']
-            if idx not in feedback_map:
-                feedback_map[idx] = []
-            feedback_map[idx].append(feedback)
-        
-        html_parts = ['<div style="font-family: Georgia, serif; line-height: 1.8; font-size: 1.1em;">']
-        
-        sentence_idx = 0
-        for i, part in enumerate(sentences):
-            if re.match(r'^[.!?]+$', part):
-                html_parts.append(part)
-            else:
-                # This is a sentence
-                color_class = 'normal'
-                tooltips = []
-                
-                if sentence_idx in feedback_map:
-                    feedbacks = feedback_map[sentence_idx]
-                    # Determine the most important severity
-                    severities = [f['severity'] for f in feedbacks]
-                    if 'red' in severities:
-                        color_class = 'red'
-                    elif 'yellow' in severities:
-                        color_class = 'yellow'
-                    elif 'green' in severities:
-                        color_class = 'green'
-                    
-                    # Collect all suggestions
-                    tooltips = [f['suggestion'] for f in feedbacks]
-                
-                # v13.0.1: Enhanced visibility for dark mode with bolder colors and contrast
-                if color_class == 'green':
-                    style = 'background-color: #c3e6cb; border-left: 4px solid #28a745; padding: 6px 8px; margin: 2px 0; display: inline-block; color: #0d4019; font-weight: 600; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'
-                elif color_class == 'yellow':
-                    style = 'background-color: #fff3cd; border-left: 4px solid #ffc107; padding: 6px 8px; margin: 2px 0; display: inline-block; color: #664d03; font-weight: 600; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'
-                elif color_class == 'red':
-                    style = 'background-color: #f8d7da; border-left: 4px solid #dc3545; padding: 6px 8px; margin: 2px 0; display: inline-block; color: #58151c; font-weight: 600; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'
-                else:
-                    style = 'display: inline;'
-                
-                if tooltips:
-                    tooltip_text = '<br>'.join(tooltips)
-                    html_parts.append(
-                        f'<span style="{style}" title="{tooltip_text.replace("<", "&lt;").replace(">", "&gt;")}">{part}</span>'
-                    )
-                else:
-                    html_parts.append(f'<span style="{style}">{part}</span>')
+    def _essay_table(self, tables: OrderedDict, essay_text: str, build):
+        """v14.5.0: Table for essay_text from an LRU of ESSAY_TABLE_CACHE_SIZE, built on a miss."""
+        with self._essay_tables_lock:
+            table = tables.get(essay_text)
+            if table is not None:
+                tables.move_to_end(essay_text)
+                return table
+        table = build(essay_text)
+        with self._essay_tables_lock:
+            table = tables.setdefault(essay_text, table)
+            while len(tables) > ESSAY_TABLE_CACHE_SIZE:
+                tables.popitem(last=False)
+        return table
+
+    def get_term_index(self, essay_text: str) -> EssayTermIndex:
+        """
+        v14.5.0: Return the shared EssayTermIndex for essay_text, building it
+        once per essay so term-to-sentence/paragraph lookups are dictionary hits.
+        """
+        return self._essay_table(self._term_indexes, essay_text, EssayTermIndex)
+
+    def get_span_table(self, essay_text: str) -> AnnotationSpanTable:
+        """
+        v14.5.0: Return the shared AnnotationSpanTable for essay_text, so inline
+        feedback, grammar corrections and the annotated HTML all resolve
+        sentences from one split.
+        """
+        return self._essay_table(self._span_tables, essay_text, AnnotationSpanTable)
+
+    def create_annotated_essay_html(self, essay_text: str, inline_feedback: Optional[List[Dict]] = None) -> str:
+        """
+        Create HTML version of essay with color-coded inline annotations.
+        v14.5.0: Walks the shared sentence span table once instead of re-splitting the essay;
+        without inline_feedback, renders the table's 'inline_feedback' layer.
+        """
+        span_table = self.get_span_table(essay_text)
+        if inline_feedback is None:
+            inline_feedback = span_table.layer('inline_feedback')
+        
+        # Create a mapping of sentence index to feedback
+        feedback_map = span_table.group_by_sentence(inline_feedback)
+        
+        html_parts = ['<div style="font-family: Georgia, serif; line-height: 1.8; font-size: 1.1em;">']
+        
+        pos = 0
+        for sentence_idx, (start, end) in enumerate(span_table.spans):
+            # Text between sentences is delimiters and whitespace; keep the delimiters only
+            if start > pos:
+                html_parts.append(''.join(essay_text[pos:start].split()))
+            pos = end
+            part = essay_text[start:end]
+            
+            color_class = 'normal'
+            tooltips = []
+            
+            if sentence_idx in feedback_map:
+                feedbacks = feedback_map[sentence_idx]
+                # Determine the most important severity
+                severities = [f['severity'] for f in feedbacks]
+                if 'red' in severities:
+                    color_class = 'red'
+                elif 'yellow' in severities:
+                    color_class = 'yellow'
+                elif 'green' in severities:
+                    color_class = 'green'
                 
-                sentence_idx += 1
+                # Collect all suggestions
+                tooltips = [f['suggestion'] for f in feedbacks]
+            
+            # v13.0.1: Enhanced visibility for dark mode with bolder colors and contrast
+            if color_class == 'green':
+                style = 'background-color: #c3e6cb; border-left: 4px solid #28a745; padding: 6px 8px; margin: 2px 0; display: inline-block; color: #0d4019; font-weight: 600; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'
+            elif color_class == 'yellow':
+                style = 'background-color: #fff3cd; border-left: 4px solid #ffc107; padding: 6px 8px; margin: 2px 0; display: inline-block; color: #664d03; font-weight: 600; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'
+            elif color_class == 'red':
+                style = 'background-color: #f8d7da; border-left: 4px solid #dc3545; padding: 6px 8px; margin: 2px 0; display: inline-block; color: #58151c; font-weight: 600; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'
+            else:
+                style = 'display: inline;'
+            
+            if tooltips:
+                tooltip_text = '<br>'.join(tooltips)
+                html_parts.append(
+                    f'<span style="{style}" title="{tooltip_text.replace("<", "&lt;").replace(">", "&gt;")}">{part}</span>'
+                )
+            else:
+                html_parts.append(f'<span style="{style}">{part}</span>')
+        
+        if pos < len(essay_text):
+            html_parts.append(''.join(essay_text[pos:].split()))
         
         html_parts.append('</div>')
         return ''.join(html_parts)
@@ -6324,7 +9599,60 @@ class DouEssay:
         
         html.append('</div>')
         return ''.join(html)
-    
+
+    def build_result_payload(self, essay_text: str, result: Dict, license_result: Dict, grade_level: str,
+                             drafts: Optional[List[Dict]] = None, stage: str = 'result') -> Dict:
+        """
+        v14.5.0: Compact JSON form of the process_essay outputs, rendered in the
+        browser by RESULT_TEMPLATES_JS instead of server-built HTML.
+        stage is 'score' (partial result: score and rubric level only),
+        'analysis' (corrections still pending) or 'result'. Sentence spans,
+        corrections and draft rows are positional lists to keep keys off the wire.
+        """
+        rubric = result['rubric_level']
+        payload = {'v': RESULT_PAYLOAD_VERSION, 'st': stage, 's': result['score'],
+                   'lv': rubric['level'], 'ld': rubric['description'], 'g': grade_level}
+        if stage == 'score':
+            return payload
+
+        user_type = license_result['user_type']
+        features = license_result.get('features', {})
+        inline_feedback = result['inline_feedback']
+        analysis = result['detailed_analysis']
+        payload.update({
+            'e': essay_text,
+            'u': [user_type.title(), license_result['daily_usage'] + 1, license_result['daily_limit']],
+            'fb': result['feedback'],
+            'bd': [analysis[part]['score'] for part in ('content', 'structure', 'grammar', 'application')],
+            'n': [sum(1 for f in inline_feedback if f['severity'] == severity) for severity in ('green', 'yellow', 'red')],
+            'lk': {feature: self.license_manager.get_upgrade_message(feature, user_type)
+                   for feature in ('inline_feedback', 'vocabulary_suggestions', 'draft_history', 'grammar_check')
+                   if not features.get(feature, False)},
+        })
+        if features.get('inline_feedback', False):
+            span_table = self.get_span_table(essay_text)
+            feedback_map = span_table.group_by_sentence(inline_feedback)
+            spans = []
+            for sentence_idx, (start, end) in enumerate(span_table.spans):
+                feedbacks = feedback_map.get(sentence_idx)
+                if not feedbacks:
+                    spans.append([start, end])
+                    continue
+                severities = [f['severity'] for f in feedbacks]
+                severity = next((s for s in ('red', 'yellow', 'green') if s in severities), 'normal')
+                spans.append([start, end, severity[0], '<br>'.join(f['suggestion'] for f in feedbacks)])
+            payload['sp'] = spans
+        if features.get('vocabulary_suggestions', False):
+            payload['vo'] = [[f.get('word', 'word'), f.get('alternatives', [])]
+                             for f in inline_feedback if f['type'] == 'generic_word']
+        if features.get('draft_history', False):
+            payload['dh'] = [[d['timestamp'], d['score'], d['level'], d.get('word_count', 'N/A'),
+                              d.get('vocab_score', 0), d.get('reflection_score', 'N/A'),
+                              d.get('generic_word_count', 'N/A')] for d in drafts or []]
+        if stage == 'result' and features.get('grammar_check', False):
+            payload['co'] = [[c.get('offset'), c.get('length'), c.get('suggestion', '')] for c in result['corrections']]
+        return payload
+
     # ===== v10.0.0 Project Apex Feature Placeholders =====
     # These methods are placeholders for planned v10.0.0 features
     # Full implementation planned for Q2 2026
@@ -6349,9 +9677,6 @@ class DouEssay:
         Paragraph-level and multi-dimensional analysis for ≥95% Ontario teacher alignment
         Added AI reasoning for sophistication scoring and rebuttal evaluation
         """
-        essay_lower = essay.lower()
-        paragraphs = [p.strip() for p in essay.split('\n\n') if p.strip()]
-        
         # Enhanced counter-argument indicators
         counter_indicators = [
             'however', 'although', 'while', 'despite', 'on the other hand',
@@ -6372,22 +9697,23 @@ class DouEssay:
         ]
         
         # Count counter-arguments and rebuttals
-        counter_count = sum(1 for indicator in counter_indicators if indicator in essay_lower)
-        rebuttal_count = sum(1 for indicator in rebuttal_indicators if indicator in essay_lower)
+        # v14.5.0: Whole-essay and paragraph lookups use the shared term index
+        term_index = self.get_term_index(essay)
+        paragraph_index = term_index.paragraph_index
+        counter_count = term_index.count_present(counter_indicators)
+        rebuttal_count = term_index.count_present(rebuttal_indicators)
         
         # v13.1.0: Enhanced paragraph-level counter-argument detection with AI reasoning
         counter_paragraphs = 0
         ai_reasoning_scores = []
-        for para in paragraphs:
-            para_lower = para.lower()
-            has_counter = any(indicator in para_lower for indicator in counter_indicators[:12])
-            has_rebuttal = any(indicator in para_lower for indicator in rebuttal_indicators[:10])
-            
-            if has_counter and has_rebuttal:
-                counter_paragraphs += 1
-                # AI reasoning: evaluate strength of rebuttal
-                rebuttal_strength = sum(1 for ind in rebuttal_indicators if ind in para_lower)
-                ai_reasoning_scores.append(min(1.0, rebuttal_strength / 3.0))
+        counter_para_ids = paragraph_index.containing_any(counter_indicators[:12])
+        rebuttal_para_ids = paragraph_index.containing_any(rebuttal_indicators[:10])
+        for para_id in sorted(counter_para_ids & rebuttal_para_ids):
+            counter_paragraphs += 1
+            # AI reasoning: evaluate strength of rebuttal
+            rebuttal_strength = sum(1 for ind in rebuttal_indicators
+                                    if para_id in paragraph_index.containing(ind))
+            ai_reasoning_scores.append(min(1.0, rebuttal_strength / 3.0))
         
         # v13.1.0: Calculate depth score with AI-assisted sophistication
         base_score = min(0.6, (counter_count * 0.12) + (rebuttal_count * 0.12))
@@ -6603,7 +9929,18 @@ class DouEssay:
         }
 
 # v14.0.0: Wrapper function for test compatibility
-def assess_essay(essay_text: str, grade_level: str = "Grade 10", teacher_targets: Dict = None) -> Dict:
+# v14.5.0: grade_essay keys each assess_essay key is computed from
+_ASSESS_FACTOR_KEYS = ('overall', 'factor_scores', 'subsystems', 'confidence_intervals')
+ASSESS_FIELD_SOURCES = {
+    **{key: ('detailed_analysis',) for key in _ASSESS_FACTOR_KEYS},
+    'inline_feedback': ('inline_feedback',),
+    'score': ('score',),
+    'rubric_level': ('rubric_level',),
+}
+
+
+def assess_essay(essay_text: str, grade_level: str = "Grade 10", teacher_targets: Dict = None,
+                 fields=None, exclude=None) -> Dict:
     """
     v14.3.0: Enhanced test-compatible wrapper with confidence-weighted scoring.
     v14.2.0: Test-compatible wrapper for essay assessment with AutoAlign v2.
@@ -6618,6 +9955,8 @@ def assess_essay(essay_text: str, grade_level: str = "Grade 10", teacher_targets
         essay_text: The essay text to analyze
         grade_level: Grade level (Grade 9-12 or just integer), defaults to Grade 10
         teacher_targets: Optional dict with 'scores' (factors) and 'subsystems' keys for alignment
+        fields / exclude: v14.5.0: Optional lists of the keys below to return (or leave out);
+            grading analyzers none of them need are skipped
     
     Returns:
         Dict with keys:
@@ -6628,8 +9967,21 @@ def assess_essay(essay_text: str, grade_level: str = "Grade 10", teacher_targets
             - score: Percentage score (0-100)
             - rubric_level: Ontario curriculum level
     """
+    selected = resolve_result_fields(fields, exclude, ASSESS_FIELD_SOURCES)
     douessay = DouEssay()
-    result = douessay.grade_essay(essay_text, grade_level)
+    if selected is None:
+        result = douessay.grade_essay(essay_text, grade_level)
+    else:
+        result = douessay.grade_essay(essay_text, grade_level, fields={
+            source for key in selected for source in ASSESS_FIELD_SOURCES[key]})
+        if not selected.intersection(_ASSESS_FACTOR_KEYS):
+            # v14.5.0: No factor or subsystem keys requested; skip calibration and aggregation
+            summary = {
+                'inline_feedback': serialize_records(result.get('inline_feedback', [])),
+                'score': result.get('score', 0),
+                'rubric_level': result.get('rubric_level', {}).get('level', 'Unknown')
+            }
+            return {key: value for key, value in summary.items() if key in selected}
     
     # v14.2.0: Extract factor scores for AutoAlign v2 calibration
     content_dict = result.get('detailed_analysis', {}).get('content', {})
@@ -6753,18 +10105,447 @@ def assess_essay(essay_text: str, grade_level: str = "Grade 10", teacher_targets
         factor_scores, subsystems_percentage, has_teacher_targets
     )
     
-    return {
+    assessment = {
         'overall': overall,
         'factor_scores': factor_scores,
         'subsystems': subsystems_percentage,
         'confidence_intervals': confidence_intervals,
-        'inline_feedback': result.get('inline_feedback', []),
+        'inline_feedback': serialize_records(result.get('inline_feedback', [])),  # v14.5.0
         'score': result.get('score', 0),
         'rubric_level': result.get('rubric_level', {}).get('level', 'Unknown')
     }
+    if selected is None:
+        return assessment
+    return {key: value for key, value in assessment.items() if key in selected}
+
+# v14.5.0: REST API limits (see GradingAPI)
+API_MAX_BODY_BYTES = int(os.environ.get('DOUESSAY_API_MAX_BODY', '1000000'))
+API_MAX_BATCH = int(os.environ.get('DOUESSAY_API_MAX_BATCH', '50'))
+API_MAX_PENDING = int(os.environ.get('DOUESSAY_API_MAX_PENDING', '64'))
+API_LICENSE_TTL_SECONDS = float(os.environ.get('DOUESSAY_API_LICENSE_TTL', '60'))
+API_IO_THREADS = int(os.environ.get('DOUESSAY_API_IO_THREADS', '4'))
+
+
+class GradingAPI:
+    """
+    v14.5.0: asyncio REST service for licenses with api_access, independent of
+    the Gradio UI queue:
+
+        POST /grade        {"essay": "...", "grade_level": "Grade 10"}
+        POST /grade:batch  {"grade_level": "Grade 10", "essays": [{"id": "a", "essay": "..."}, ...]}
+        GET  /health
+
+    Both POST bodies accept "fields" and/or "exclude" lists of result keys
+    (RESULT_FIELD_STAGES); the engine then skips analyzers none of them need
+    and the response holds only those keys, unnormalized.
+
+    The license key is sent as "Authorization: Bearer <key>". Essays are graded
+    by a warm GradingWorkerPool (or in-process when pool is None) from a thread
+    executor, so the event loop only parses, admits and serializes. Admission is
+    bounded: once max_pending essays are in flight or queued, new requests get
+    503 with Retry-After instead of waiting. Valid license lookups are cached for
+    license_ttl seconds; usage is counted per essay and tracked against the
+    cached quota. License and usage calls run on a separate small executor
+    (DOUESSAY_API_IO_THREADS) so they are not queued behind gradings.
+    """
+
+    def __init__(self, engine=None, pool=None, max_pending: int = API_MAX_PENDING,
+                 max_body_bytes: int = API_MAX_BODY_BYTES, max_batch: int = API_MAX_BATCH,
+                 license_ttl: float = API_LICENSE_TTL_SECONDS, clock=time.monotonic):
+        self.engine = engine or DouEssay()
+        self.pool = pool
+        self.max_pending = max_pending
+        self.max_body_bytes = max_body_bytes
+        self.max_batch = max_batch
+        self.license_ttl = license_ttl
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max(2, pool.size if pool is not None else 1),
+                                            thread_name_prefix='douessay-api')
+        # License and usage round trips get their own threads so they never queue behind gradings
+        self._io_executor = ThreadPoolExecutor(max_workers=API_IO_THREADS, thread_name_prefix='douessay-api-io')
+        self._licenses = {}
+        self.pending = 0
+        self.counters = Counter()
+        self.app = self._build_app()
+
+    @classmethod
+    def from_env(cls, engine=None) -> 'GradingAPI':
+        """Warm engine plus a worker pool sized by DOUESSAY_GRADING_WORKERS (default: one per CPU)."""
+        engine = engine or DouEssay()
+        return cls(engine, GradingWorkerPool.from_env(engine, default_size=os.cpu_count() or 1))
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="DouEssay Grading API", version=VERSION, docs_url=None, redoc_url=None)
+        app.add_api_route('/grade', self.grade, methods=['POST'])
+        app.add_api_route('/grade:batch', self.grade_batch, methods=['POST'])
+        app.add_api_route('/health', self.health, methods=['GET'])
+        return app
+
+    @staticmethod
+    def _response(status: int, body: Dict, headers: Optional[Dict] = None) -> Response:
+        return Response(json.dumps(body, default=str, separators=(',', ':')), status_code=status,
+                        media_type='application/json', headers=headers)
+
+    def _error(self, status: int, message: str, headers: Optional[Dict] = None) -> Response:
+        self.counters[f'http_{status}'] += 1
+        return self._response(status, {'error': message}, headers)
+
+    async def _read_json(self, request: Request):
+        """Request body as JSON, or an error response (413 over the size limit, 400 if malformed)."""
+        declared = request.headers.get('content-length')
+        if declared is not None and declared.isdigit() and int(declared) > self.max_body_bytes:
+            return None, self._error(413, f'Request body exceeds {self.max_body_bytes} bytes')
+        chunks, size = [], 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                return None, self._error(413, f'Request body exceeds {self.max_body_bytes} bytes')
+            chunks.append(chunk)
+        try:
+            return json.loads(b''.join(chunks)), None
+        except ValueError:
+            return None, self._error(400, 'Request body is not valid JSON')
+
+    async def _authorize(self, request: Request, essays: int):
+        """(license key, license result) for a key with api_access and quota left, or an error response."""
+        auth = request.headers.get('authorization', '')
+        license_key = auth[7:].strip() if auth[:7].lower() == 'bearer ' else ''
+        if not license_key:
+            return None, None, self._error(401, 'Missing license key (Authorization: Bearer <key>)')
+        now = self._clock()
+        cached = self._licenses.get(license_key)
+        if cached is None or cached[0] <= now:
+            self.counters['license_lookups'] += 1
+            result = await self.engine.license_manager.validate_license_async(license_key, self._io_executor)
+            if not result['valid']:
+                self._licenses.pop(license_key, None)
+                return None, None, self._error(403, result['message'])
+            # A concurrent miss may have cached the key meanwhile and reserved usage on it; keep that entry
+            cached = self._licenses.get(license_key)
+            if cached is None or cached[0] <= self._clock():
+                cached = self._licenses[license_key] = (now + self.license_ttl, dict(result))
+        else:
+            self.counters['license_cache_hits'] += 1
+        license_result = cached[1]
+        if not license_result['features'].get('api_access', False):
+            return None, None, self._error(403, self.engine.license_manager.get_upgrade_message(
+                'api_access', license_result['user_type']))
+        if license_result['daily_usage'] + essays > license_result['daily_limit']:
+            return None, None, self._error(429, f"Daily usage limit reached for {license_result['user_type']} user")
+        return license_key, license_result, None
+
+    def _grade_blocking(self, essay_text: str, grade_level: str, grammar_profile: str, owner: str,
+                        fields: Optional[frozenset] = None) -> Dict:
+        for kind, payload, *_ in self.engine.stream_grade_essay(essay_text, grade_level, grammar_profile,
+                                                                owner=owner, pool=self.pool, fields=fields):
+            if kind == 'result':
+                result = normalize_grading_result(payload) if fields is None else dict(payload)
+                for key in ('inline_feedback', 'corrections'):
+                    if key in result:
+                        result[key] = serialize_records(result[key])
+                return result
+
+    async def _grade_all(self, request: Request, items: List[Tuple[str, str]], fields: Optional[frozenset] = None):
+        """Grade (essay, grade level) pairs concurrently; a list of results or GradingWorkerErrors, or an error response."""
+        license_key, license_result, error = await self._authorize(request, len(items))
+        if error is not None:
+            return None, error
+        if self.pending + len(items) > self.max_pending:
+            return None, self._error(503, 'Grading capacity exhausted, retry shortly', {'Retry-After': '1'})
+        # Reserve quota and capacity before the first await so concurrent requests see them
+        license_result['daily_usage'] += len(items)
+        self.pending += len(items)
+        try:
+            if not await self.engine.license_manager.increment_usage_async(license_key, len(items),
+                                                                             self._io_executor):
+                license_result['daily_usage'] -= len(items)
+                return None, self._error(503, 'Failed to update usage count', {'Retry-After': '1'})
+            self.counters['essays'] += len(items)
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, self._grade_blocking, essay_text, grade_level,
+                                     grammar_profile_for(license_result['user_type'], grade_level), license_key,
+                                     fields)
+                for essay_text, grade_level in items), return_exceptions=True)
+        finally:
+            self.pending -= len(items)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, GradingWorkerError):
+                logger.error("Error in API grading: %s", result, exc_info=result)
+        return results, None
+
+    def _fields(self, body):
+        """Requested result keys (None for all), or an error response for unknown keys."""
+        try:
+            return resolve_result_fields(body.get('fields'), body.get('exclude')), None
+        except (ValueError, TypeError) as e:
+            return None, self._error(400, str(e))
+
+    @staticmethod
+    def _essay_item(item, default_grade: str):
+        if not isinstance(item, dict) or not isinstance(item.get('essay'), str) or not item['essay'].strip():
+            return None
+        grade_level = item.get('grade_level', default_grade)
+        return (item['essay'], grade_level) if isinstance(grade_level, str) else None
+
+    async def grade(self, request: Request) -> Response:
+        body, error = await self._read_json(request)
+        if error is not None:
+            return error
+        item = self._essay_item(body, 'Grade 10')
+        if item is None:
+            return self._error(400, 'Expected {"essay": "<non-empty text>", "grade_level": "Grade 10"}')
+        fields, error = self._fields(body)
+        if error is not None:
+            return error
+        results, error = await self._grade_all(request, [item], fields)
+        if error is not None:
+            return error
+        result = results[0]
+        if isinstance(result, GradingWorkerError):
+            return self._error(504, str(result))
+        if isinstance(result, BaseException):
+            return self._error(500, 'Grading failed')
+        return self._response(200, {'result': result})
+
+    async def grade_batch(self, request: Request) -> Response:
+        body, error = await self._read_json(request)
+        if error is not None:
+            return error
+        essays = body.get('essays') if isinstance(body, dict) else None
+        if not isinstance(essays, list) or not essays:
+            return self._error(400, 'Expected {"essays": [{"id": "...", "essay": "..."}, ...]}')
+        if len(essays) > self.max_batch:
+            return self._error(413, f'At most {self.max_batch} essays per batch')
+        default_grade = body.get('grade_level', 'Grade 10')
+        items = [self._essay_item(item, default_grade) for item in essays]
+        invalid = [index for index, item in enumerate(items) if item is None]
+        if invalid:
+            return self._error(400, f'Essays at positions {invalid} are missing non-empty "essay" text')
+        fields, error = self._fields(body)
+        if error is not None:
+            return error
+        results, error = await self._grade_all(request, items, fields)
+        if error is not None:
+            return error
+        entries = []
+        for index, (item, result) in enumerate(zip(essays, results)):
+            entry = {'id': item.get('id', index)}
+            if isinstance(result, GradingWorkerError):
+                entry['error'] = str(result)
+            elif isinstance(result, BaseException):
+                entry['error'] = 'Grading failed'
+            else:
+                entry['result'] = result
+            entries.append(entry)
+        return self._response(200, {'results': entries})
+
+    async def health(self) -> Response:
+        busy = self.pending >= self.max_pending
+        return self._response(200, {
+            'status': 'busy' if busy else 'ok',
+            'version': VERSION,
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'workers': self.pool.stats() if self.pool is not None else None,
+            'licensing': self.engine.license_manager.supabase_health(),
+            'latency': self.engine.latency.summary(),
+            'counters': dict(self.counters),
+        })
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self._io_executor.shutdown(wait=False)
+        if self.pool is not None:
+            self.pool.close()
+
+
+def serve_grading_api(host: str = "0.0.0.0", port: int = 8000):
+    """v14.5.0: Run GradingAPI under uvicorn (python app.py --api)."""
+    import uvicorn
+    api = GradingAPI.from_env()
+    uvicorn.run(api.app, host=host, port=port, log_level="info")
+
+
+# v14.5.0: Opt-in browser rendering. process_essay then streams the compact
+# DouEssay.build_result_payload JSON and RESULT_TEMPLATES_JS, shipped once in
+# the page head, turns it into the same nine outputs.
+CLIENT_RENDERING = os.environ.get('DOUESSAY_CLIENT_RENDERING', '').lower() in ('1', 'true', 'yes')
+RESULT_PAYLOAD_VERSION = 1
+
+RESULT_TEMPLATES_JS = r'''
+window.DouEssayTemplates = (() => {
+  const VERSION = 1;  // RESULT_PAYLOAD_VERSION
+  const esc = (s) => String(s).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+  const CARD = 'background: white; padding: 20px; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.1);';
+  const mark = (background, border, color) => `background-color: ${background}; border-left: 4px solid ${border}; padding: 6px 8px; margin: 2px 0; `
+    + `display: inline-block; color: ${color}; font-weight: 600; box-shadow: 0 1px 3px rgba(0,0,0,0.1);`;
+  const SEVERITY = {g: mark('#c3e6cb', '#28a745', '#0d4019'), y: mark('#fff3cd', '#ffc107', '#664d03'), r: mark('#f8d7da', '#dc3545', '#58151c')};
+  const NOTIFICATION = '<div style="padding: 15px; background: #d4edda; border-radius: 8px; border-left: 4px solid #28a745; margin-bottom: 20px; animation: fadeIn 0.5s;">'
+    + '<div style="display: flex; align-items: center; gap: 10px;"><span style="font-size: 1.5em;">✅</span><div>'
+    + '<strong style="color: #155724;">Analysis Complete!</strong>'
+    + '<p style="margin: 5px 0 0 0; color: #155724;">Your essay has been graded. Check the <strong>Assessment</strong> tab for detailed results and feedback.</p>'
+    + '</div></div></div>';
+
+  const locked = (title, message) => '<div style="padding: 20px; background: #fff3cd; border-radius: 8px; border-left: 4px solid #ffc107;">'
+    + `<h3 style="color: #856404; margin-top: 0;">🔒 ${title} Locked</h3><p>${message}</p></div>`;
+
+  const scoreColor = (s) => s >= 85 ? '#27ae60' : s >= 80 ? '#2ecc71' : s >= 70 ? '#f39c12' : s >= 65 ? '#e67e22' : '#e74c3c';
+
+  function preview(p) {
+    return `<div style="font-family: Arial, sans-serif; max-width: 1000px; margin: 0 auto;"><div style="${CARD} text-align: center;">`
+      + `<div style="font-size: 3.5em; font-weight: bold; color: #2c3e50;">${p.s}/100</div>`
+      + `<div style="font-size: 1.4em; font-weight: bold; color: #2c3e50; margin: 10px 0;">${p.lv}</div>`
+      + `<div style="color: #7f8c8d; font-size: 1em;">${p.ld}</div>`
+      + `<p style="color: #7f8c8d; font-size: 0.9em;">Grade: ${p.g} • ⏳ Detailed feedback is on its way...</p></div></div>`;
+  }
+
+  function assessment(p) {
+    return '<div style="font-family: Arial, sans-serif; max-width: 1000px; margin: 0 auto;">'
+      + '<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 25px; border-radius: 15px; color: white; text-align: center; margin-bottom: 20px;">'
+      + '<h1 style="margin: 0 0 10px 0; font-size: 2.2em;">DouEssay Assessment System v14.4.0</h1>'
+      + '<p style="margin: 0; opacity: 0.9; font-size: 1.1em;">Reliability, Transparency & Rubric Alignment • Teacher-Validated Evidence Detection • Ontario Aligned</p>'
+      + '<p style="margin: 10px 0 0 0; font-size: 0.9em; opacity: 0.7;">Created by changcheng967 • v14.4.0: Truthful Scoring | Transparent Methodology • Doulet Media</p>'
+      + `<p style="margin: 5px 0 0 0; font-size: 0.8em; opacity: 0.9; background: rgba(255,255,255,0.2); padding: 5px; border-radius: 5px;">User: ${p.u[0]} | Usage: ${p.u[1]}/${p.u[2]} | Grade: ${p.g}</p>`
+      + '<p style="margin: 5px 0 0 0; font-size: 0.75em; opacity: 0.8;">Powered by: Doulet Argus 5.0 • Doulet Nexus 6.0 • Doulet DepthCore 5.0 • Doulet Empathica 4.0 • Doulet Structura 5.0</p></div>'
+      + `<div style="${CARD} margin-bottom: 20px;"><div style="text-align: center; margin-bottom: 15px;">`
+      + `<div style="font-size: 3.5em; font-weight: bold; color: ${scoreColor(p.s)};">${p.s}/100</div>`
+      + `<div style="font-size: 1.4em; font-weight: bold; color: #2c3e50; margin: 10px 0;">${p.lv}</div>`
+      + `<div style="color: #7f8c8d; font-size: 1em;">${p.ld}</div></div></div>`
+      + `<div style="${CARD}"><h3 style="margin-top: 0; color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px;">📝 Detailed Feedback</h3>`
+      + `<div style="line-height: 1.8;">${p.fb.map((line) => `<p style="margin: 10px 0;">${line}</p>`).join('')}</div></div></div>`;
+  }
+
+  function annotated(p) {
+    let html = '';
+    if (p.lk.inline_feedback !== undefined) {
+      html = locked('Inline Feedback', p.lk.inline_feedback);
+    } else {
+      const parts = ['<div style="font-family: Georgia, serif; line-height: 1.8; font-size: 1.1em;">'];
+      let pos = 0;
+      for (const [start, end, severity, tip] of p.sp) {
+        if (start > pos) parts.push(p.e.slice(pos, start).replace(/\s+/g, ''));
+        pos = end;
+        const text = esc(p.e.slice(start, end));
+        parts.push(severity ? `<span style="${SEVERITY[severity]}" title="${esc(tip)}">${text}</span>`
+                            : `<span style="display: inline;">${text}</span>`);
+      }
+      if (pos < p.e.length) parts.push(p.e.slice(pos).replace(/\s+/g, ''));
+      parts.push('</div>');
+      html = parts.join('');
+    }
+    return html + '<div style="padding: 15px; background: #f8f9fa; border-radius: 8px; margin-top: 10px;"><strong>Inline Annotations:</strong> '
+      + `<span style="color: #28a745;">✅ ${p.n[0]} Strengths</span> • <span style="color: #ffc107;">⚠️ ${p.n[1]} Suggestions</span> • `
+      + `<span style="color: #dc3545;">❗ ${p.n[2]} Critical</span></div>`;
+  }
+
+  function breakdown(p) {
+    const bar = (label, score, color) => {
+      return '<div style="margin: 15px 0;"><div style="display: flex; justify-content: space-between; margin-bottom: 5px;">'
+        + `<span style="font-weight: bold; color: #2c3e50;">${label}</span><span style="color: ${color}; font-weight: bold;">${score.toFixed(1)}/10</span></div>`
+        + '<div style="background: #ecf0f1; border-radius: 10px; height: 25px; overflow: hidden;">'
+        + `<div style="background: linear-gradient(90deg, ${color}, ${color}dd); width: ${score * 10}%; height: 100%; border-radius: 10px; transition: width 0.3s ease;"></div></div></div>`;
+    };
+    return '<div style="background: white; padding: 20px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">'
+      + '<h3 style="color: #2c3e50; margin-top: 0; border-bottom: 2px solid #3498db; padding-bottom: 10px;">📊 Score Breakdown</h3>'
+      + bar('Content & Analysis', p.bd[0], '#e74c3c') + bar('Structure & Organization', p.bd[1], '#f39c12')
+      + bar('Grammar & Mechanics', p.bd[2], '#27ae60') + bar('Application & Insight', p.bd[3], '#9b59b6')
+      + '<div style="margin-top: 20px; text-align: center; padding: 15px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 10px; color: white;">'
+      + `<div style="font-size: 2.5em; font-weight: bold;">${p.s}/100</div><div style="font-size: 1.2em; margin-top: 5px;">Overall Score</div></div></div>`;
+  }
+
+  function vocabulary(p) {
+    if (p.lk.vocabulary_suggestions !== undefined) return locked('Vocabulary Suggestions', p.lk.vocabulary_suggestions);
+    if (!p.vo.length) return '<p style="color: #28a745;">✅ Great vocabulary variety! No generic words detected.</p>';
+    const chip = (alt) => `<span style="background: #fff; padding: 3px 8px; margin: 2px; border-radius: 4px; display: inline-block;">${alt}</span>`;
+    return '<div style="font-family: Arial, sans-serif;"><h3 style="color: #2c3e50; margin-bottom: 15px;">📚 Vocabulary Enhancement Suggestions</h3>'
+      + p.vo.map(([word, alternatives]) => '<div style="background: #f8f9fa; padding: 12px; margin: 8px 0; border-radius: 8px; border-left: 4px solid #ffc107;">'
+        + `<strong style="color: #856404;">Replace "${word}":</strong><div style="margin-top: 5px;">${alternatives.map(chip).join(' • ')}</div></div>`).join('')
+      + '</div>';
+  }
+
+  function bars(values, colorOf, label) {
+    const max = Math.max(...values);
+    return values.map((value, i) => {
+      const color = colorOf(value, i);
+      const height = max > 0 ? (value / max) * 100 : 0;
+      return `<div style="flex: 1; background: ${color}; height: ${height}%; min-height: 20px; border-radius: 4px 4px 0 0; position: relative;">`
+        + `<span style="position: absolute; top: -20px; left: 50%; transform: translateX(-50%); font-size: 0.8em; font-weight: bold; color: ${color};">${label(value)}</span></div>`;
+    }).join('');
+  }
+
+  function drafts(p) {
+    if (p.lk.draft_history !== undefined) return locked('Draft History', p.lk.draft_history);
+    const rows = p.dh;
+    if (!rows.length) return '<p style="color: #7f8c8d; text-align: center; padding: 20px;">No draft history yet. Submit essays to track your progress!</p>';
+    let html = '<div style="font-family: Arial, sans-serif;"><h3 style="color: #2c3e50; margin-bottom: 15px;">📚 Draft History & Progress</h3>';
+    if (rows.length > 1) {
+      const scores = rows.map((d) => d[1]);
+      const vocab = rows.map((d) => d[4]);
+      html += '<div style="background: white; padding: 15px; border-radius: 8px; margin-bottom: 15px;"><h4 style="color: #2c3e50; margin-top: 0;">📈 Score Evolution</h4>'
+        + '<div style="display: flex; align-items: flex-end; height: 100px; gap: 5px;">'
+        + bars(scores, (s, i) => i > 0 && s > scores[i - 1] ? '#27ae60' : i > 0 && s === scores[i - 1] ? '#3498db' : '#e74c3c', String)
+        + '</div><h4 style="color: #2c3e50; margin-top: 20px;">📚 Vocabulary Quality Evolution</h4><div style="display: flex; align-items: flex-end; height: 80px; gap: 5px;">'
+        + bars(vocab, (v, i) => i > 0 && v > vocab[i - 1] ? '#9b59b6' : '#3498db', (v) => v.toFixed(1))
+        + '</div></div>';
+      const scoreGain = scores[scores.length - 1] - scores[0];
+      const vocabGain = vocab[vocab.length - 1] - vocab[0];
+      if (scoreGain > 0 || vocabGain > 0) {
+        const badge = (color, text) => `<span style="background: white; color: ${color}; padding: 8px 15px; border-radius: 20px; font-weight: bold;">${text}</span>`;
+        html += '<div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 15px; border-radius: 8px; margin-bottom: 15px;">'
+          + '<h4 style="color: white; margin-top: 0;">🏆 Achievements Unlocked</h4><div style="display: flex; gap: 10px; flex-wrap: wrap;">'
+          + (scoreGain >= 10 ? badge('#f5576c', '🎯 Score Climber (+10)') : '')
+          + (scoreGain >= 20 ? badge('#f5576c', '🚀 High Achiever (+20)') : '')
+          + (vocabGain >= 3 ? badge('#9b59b6', '📚 Vocabulary Master') : '')
+          + (rows.length >= 3 ? badge('#27ae60', '✍️ Dedicated Writer (3+ Drafts)') : '')
+          + (scores.some((s) => s >= 85) ? badge('#f39c12', '⭐ Level 4 Excellence') : '')
+          + '</div></div>';
+      }
+    }
+    for (let idx = rows.length - 1; idx >= 0; idx--) {
+      const [timestamp, score, level, words, vocabScore, reflection, generic] = rows[idx];
+      const color = score >= 80 ? '#27ae60' : score >= 70 ? '#f39c12' : '#e74c3c';
+      const diff = idx > 0 ? score - rows[idx - 1][1] : 0;
+      const trend = diff > 0 ? ` <span style="color: #27ae60;">↑ +${diff}</span>` : diff < 0 ? ` <span style="color: #e74c3c;">↓ ${diff}</span>` : '';
+      html += `<div style="background: #f8f9fa; padding: 12px; margin: 8px 0; border-radius: 8px; border-left: 4px solid ${color};">`
+        + '<div style="display: flex; justify-content: space-between; align-items: center;">'
+        + `<div><strong style="color: #2c3e50;">Draft #${idx + 1}</strong><span style="color: #7f8c8d; margin-left: 10px; font-size: 0.9em;">${timestamp}</span>${trend}</div>`
+        + `<div style="text-align: right;"><span style="font-size: 1.5em; font-weight: bold; color: ${color};">${score}</span>`
+        + `<span style="color: #7f8c8d; font-size: 0.9em; margin-left: 5px;">/ 100</span><div style="color: #2c3e50; font-size: 0.9em;">${level}</div></div></div>`
+        + `<div style="margin-top: 8px; font-size: 0.85em; color: #7f8c8d;">📝 ${words} words • 📚 Vocab: ${typeof vocabScore === 'number' ? vocabScore.toFixed(1) : vocabScore}/20 • 💭 Reflection: ${reflection}/10 • 🚫 Generic words: ${generic}</div></div>`;
+    }
+    return html + '</div>';
+  }
+
+  function corrected(p, current) {
+    if (p.lk.grammar_check !== undefined) return `🔒 Grammar Check Locked\n\n${p.lk.grammar_check}`;
+    if (p.co === undefined) return current;
+    let text = p.e;
+    const valid = (v) => Number.isInteger(v) && v >= 0;
+    for (const [offset, length, suggestion] of [...p.co].sort((a, b) => (b[0] ?? -1) - (a[0] ?? -1))) {
+      if (valid(offset) && valid(length) && offset + length <= text.length) {
+        text = text.slice(0, offset) + suggestion + text.slice(offset + length);
+      }
+    }
+    return text;
+  }
+
+  function render(p, current) {
+    if (!p || p.v !== VERSION) return current;
+    if (p.st === 'error') return ['', p.m, '', '', '', '', '', 0, p.lv || ''];
+    if (p.st === 'score') return [current[0], preview(p), ...current.slice(2, 7), p.s, p.lv];
+    return [NOTIFICATION, assessment(p), annotated(p), breakdown(p), vocabulary(p), drafts(p), corrected(p, current[6]), p.s, p.lv];
+  }
+
+  return {render};
+})();
+'''
+
 
 def create_douessay_interface():
     douessay = DouEssay()
+    # v14.5.0: Forked from the warm engine before the UI starts; None grades in this process
+    grading_pool = GradingWorkerPool.from_env(douessay)
     
     # Session state for draft history
     draft_history = []
@@ -6934,89 +10715,132 @@ def create_douessay_interface():
         html += '</div>'
         return html
     
-    def process_essay(essay_text, license_key, grade_level):
-        if not license_key.strip():
-            return "", "Please enter a valid license key.", "", "", "", "", "", 0, ""
-        
-        license_result = douessay.validate_license_and_increment(license_key)
-        if not license_result['valid']:
-            return "", f"License Error: {license_result['message']}", "", "", "", "", "", 0, ""
-        
-        if not essay_text.strip():
-            return "", "Please enter an essay to analyze.", "", "", "", "", "", 0, ""
-        
-        # v10.1.0: Add error handling for grading process
-        try:
-            # v6.0.0: Pass grade_level to grading function
-            result = douessay.grade_essay(essay_text, grade_level)
+    def create_score_preview_html(partial: Dict, grade_level: str) -> str:
+        """v14.5.0: Score and rubric level shown while the rest of the assessment is computed."""
+        return f"""
+        <div style="font-family: Arial, sans-serif; max-width: 1000px; margin: 0 auto;">
+            <div style="background: white; padding: 20px; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.1); text-align: center;">
+                <div style="font-size: 3.5em; font-weight: bold; color: #2c3e50;">{partial['score']}/100</div>
+                <div style="font-size: 1.4em; font-weight: bold; color: #2c3e50; margin: 10px 0;">{partial['rubric_level']['level']}</div>
+                <div style="color: #7f8c8d; font-size: 1em;">{partial['rubric_level']['description']}</div>
+                <p style="color: #7f8c8d; font-size: 0.9em;">Grade: {grade_level} • ⏳ Detailed feedback is on its way...</p>
+            </div>
+        </div>
+        """
+    
+    fragments = douessay.fragments
+
+    def locked_feature_html(feature: str, title: str, user_type: str) -> str:
+        """v14.5.0: Upgrade banner for a locked feature; static per feature and tier."""
+        return fragments.static(f'locked:{feature}:{user_type}', lambda: f"""
+            <div style="padding: 20px; background: #fff3cd; border-radius: 8px; border-left: 4px solid #ffc107;">
+                <h3 style="color: #856404; margin-top: 0;">🔒 {title} Locked</h3>
+                <p>{douessay.license_manager.get_upgrade_message(feature, user_type)}</p>
+            </div>
+            """)
+
+    def render_assessment_body(result: Dict) -> str:
+        """v14.5.0: Score card and detailed feedback of the assessment tab (everything after the header)."""
+        feedback = result['feedback']
+        score_color = "#e74c3c"
+        if result['score'] >= 85:
+            score_color = "#27ae60"
+        elif result['score'] >= 80:
+            score_color = "#2ecc71"
+        elif result['score'] >= 70:
+            score_color = "#f39c12"
+        elif result['score'] >= 65:
+            score_color = "#e67e22"
+        return f"""
+            <div style="background: white; padding: 20px; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.1); margin-bottom: 20px;">
+                <div style="text-align: center; margin-bottom: 15px;">
+                    <div style="font-size: 3.5em; font-weight: bold; color: {score_color};">
+                        {result['score']}/100
+                    </div>
+                    <div style="font-size: 1.4em; font-weight: bold; color: #2c3e50; margin: 10px 0;">
+                        {result['rubric_level']['level']}
+                    </div>
+                    <div style="color: #7f8c8d; font-size: 1em;">
+                        {result['rubric_level']['description']}
+                    </div>
+                </div>
+            </div>
             
-            # v10.1.0: Normalize result to ensure canonical schema
-            result = normalize_grading_result(result)
-        except Exception as e:
-            # v10.1.0: Log error and return user-friendly message
-            logger.error("Error in process_essay grading: %s", str(e), exc_info=True)
-            error_html = f"""
-            <div style="padding: 20px; background: #f8d7da; border-radius: 8px; border-left: 4px solid #dc3545;">
-                <h3 style="color: #721c24; margin-top: 0;">⚠️ Temporary Grading Error</h3>
-                <p style="color: #721c24;">We're sorry — a temporary grading error occurred. 
-                Engineers have been notified. Please try again in a moment.</p>
-                <p style="color: #721c24; font-size: 0.9em;">Error ID: {datetime.now().strftime('%Y%m%d-%H%M%S')}</p>
+            <div style="background: white; padding: 20px; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.1);">
+                <h3 style="margin-top: 0; color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px;">📝 Detailed Feedback</h3>
+                <div style="line-height: 1.8;">
+                    {''.join([f'<p style="margin: 10px 0;">{line}</p>' for line in feedback])}
+                </div>
             </div>
-            """
-            return "", error_html, "", "", "", "", "", 0, "Error"
+        </div>
+        """
+
+    def render_inline_summary(inline_feedback: List[Dict]) -> str:
+        # Inline feedback summary
+        inline_summary = f"<div style='padding: 15px; background: #f8f9fa; border-radius: 8px; margin-top: 10px;'>"
+        inline_summary += f"<strong>Inline Annotations:</strong> "
         
+        green_count = len([f for f in inline_feedback if f['severity'] == 'green'])
+        yellow_count = len([f for f in inline_feedback if f['severity'] == 'yellow'])
+        red_count = len([f for f in inline_feedback if f['severity'] == 'red'])
+        
+        inline_summary += f"<span style='color: #28a745;'>✅ {green_count} Strengths</span> • "
+        inline_summary += f"<span style='color: #ffc107;'>⚠️ {yellow_count} Suggestions</span> • "
+        inline_summary += f"<span style='color: #dc3545;'>❗ {red_count} Critical</span>"
+        inline_summary += "</div>"
+        return inline_summary
+
+    def apply_corrections(essay_text: str, corrections: List[Dict]) -> str:
+        corrected_essay = essay_text
+        for correction in sorted(corrections, key=lambda x: x.get('offset', -1), reverse=True):
+            # Validate correction structure and values
+            offset = correction.get('offset')
+            length = correction.get('length')
+            suggestion = correction.get('suggestion', '')
+            if (
+                isinstance(offset, int) and isinstance(length, int) and
+                offset >= 0 and length >= 0 and
+                offset + length <= len(corrected_essay)
+            ):
+                start = offset
+                end = offset + length
+                corrected_essay = corrected_essay[:start] + suggestion + corrected_essay[end:]
+            # else: skip invalid correction
+        return corrected_essay
+
+    def render_outputs(essay_text, grade_level, license_result, result, corrections_ready=True):
+        """
+        v14.5.0: The nine process_essay outputs for a (possibly partial) normalized result.
+        Result-derived fragments are memoized by a digest of the essay and result;
+        only the header (usage counter) and draft history are rendered per request.
+        """
         # v6.0.0: Get feature access for current user
         user_type = license_result['user_type']
         features = license_result.get('features', {})
-        
-        # v10.1.0: Save to draft history with error handling (only if user has access)
-        if features.get('draft_history', False):
-            try:
-                save_draft(essay_text, result)
-            except Exception as e:
-                # v10.1.0: Log but don't fail the entire request
-                logger.error("Error saving draft: %s", str(e), exc_info=True)
+        digest = fragments.digest(essay_text, result)
         
         # v6.0.0: Apply feature gating
         # Create annotated essay HTML (only if user has access)
         if features.get('inline_feedback', False):
-            annotated_essay = douessay.create_annotated_essay_html(essay_text, result['inline_feedback'])
+            annotated_essay = fragments.get(('annotated', digest), lambda: douessay.create_annotated_essay_html(
+                essay_text, result['inline_feedback']))
         else:
-            annotated_essay = f"""
-            <div style="padding: 20px; background: #fff3cd; border-radius: 8px; border-left: 4px solid #ffc107;">
-                <h3 style="color: #856404; margin-top: 0;">🔒 Inline Feedback Locked</h3>
-                <p>{douessay.license_manager.get_upgrade_message('inline_feedback', user_type)}</p>
-            </div>
-            """
+            annotated_essay = locked_feature_html('inline_feedback', 'Inline Feedback', user_type)
         
         # Create vocabulary suggestions (only if user has access)
         if features.get('vocabulary_suggestions', False):
-            vocab_html = douessay.create_vocabulary_suggestions_html(result['inline_feedback'])
+            vocab_html = fragments.get(('vocabulary', digest), lambda: douessay.create_vocabulary_suggestions_html(
+                result['inline_feedback']))
         else:
-            vocab_html = f"""
-            <div style="padding: 20px; background: #fff3cd; border-radius: 8px; border-left: 4px solid #ffc107;">
-                <h3 style="color: #856404; margin-top: 0;">🔒 Vocabulary Suggestions Locked</h3>
-                <p>{douessay.license_manager.get_upgrade_message('vocabulary_suggestions', user_type)}</p>
-            </div>
-            """
+            vocab_html = locked_feature_html('vocabulary_suggestions', 'Vocabulary Suggestions', user_type)
         
         # Create score breakdown (always available)
-        score_breakdown = create_score_breakdown_html(result['detailed_analysis'], result['score'])
+        score_breakdown = fragments.get(('breakdown', digest), lambda: create_score_breakdown_html(
+            result['detailed_analysis'], result['score']))
         
         # Create feedback HTML
-        feedback = result['feedback']
         user_info = f"User: {license_result['user_type'].title()} | Usage: {license_result['daily_usage'] + 1}/{license_result['daily_limit']}"
         
-        score_color = "#e74c3c"
-        if result['score'] >= 85:
-            score_color = "#27ae60"
-        elif result['score'] >= 80:
-            score_color = "#2ecc71"
-        elif result['score'] >= 70:
-            score_color = "#f39c12"
-        elif result['score'] >= 65:
-            score_color = "#e67e22"
-        
         # v13.0.1: Create completion notification for Home Page
         notification_html = """
         <div style="padding: 15px; background: #d4edda; border-radius: 8px; border-left: 4px solid #28a745; margin-bottom: 20px; animation: fadeIn 0.5s;">
@@ -7040,72 +10864,23 @@ def create_douessay_interface():
                 <p style="margin: 5px 0 0 0; font-size: 0.8em; opacity: 0.9; background: rgba(255,255,255,0.2); padding: 5px; border-radius: 5px;">{user_info} | Grade: {grade_level}</p>
                 <p style="margin: 5px 0 0 0; font-size: 0.75em; opacity: 0.8;">Powered by: Doulet Argus 5.0 • Doulet Nexus 6.0 • Doulet DepthCore 5.0 • Doulet Empathica 4.0 • Doulet Structura 5.0</p>
             </div>
-            
-            <div style="background: white; padding: 20px; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.1); margin-bottom: 20px;">
-                <div style="text-align: center; margin-bottom: 15px;">
-                    <div style="font-size: 3.5em; font-weight: bold; color: {score_color};">
-                        {result['score']}/100
-                    </div>
-                    <div style="font-size: 1.4em; font-weight: bold; color: #2c3e50; margin: 10px 0;">
-                        {result['rubric_level']['level']}
-                    </div>
-                    <div style="color: #7f8c8d; font-size: 1em;">
-                        {result['rubric_level']['description']}
-                    </div>
-                </div>
-            </div>
-            
-            <div style="background: white; padding: 20px; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.1);">
-                <h3 style="margin-top: 0; color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px;">📝 Detailed Feedback</h3>
-                <div style="line-height: 1.8;">
-                    {''.join([f'<p style="margin: 10px 0;">{line}</p>' for line in feedback])}
-                </div>
-            </div>
-        </div>
-        """
-        
-        # Inline feedback summary
-        inline_summary = f"<div style='padding: 15px; background: #f8f9fa; border-radius: 8px; margin-top: 10px;'>"
-        inline_summary += f"<strong>Inline Annotations:</strong> "
-        
-        green_count = len([f for f in result['inline_feedback'] if f['severity'] == 'green'])
-        yellow_count = len([f for f in result['inline_feedback'] if f['severity'] == 'yellow'])
-        red_count = len([f for f in result['inline_feedback'] if f['severity'] == 'red'])
+            """ + fragments.get(('assessment', digest), lambda: render_assessment_body(result))
         
-        inline_summary += f"<span style='color: #28a745;'>✅ {green_count} Strengths</span> • "
-        inline_summary += f"<span style='color: #ffc107;'>⚠️ {yellow_count} Suggestions</span> • "
-        inline_summary += f"<span style='color: #dc3545;'>❗ {red_count} Critical</span>"
-        inline_summary += "</div>"
+        inline_summary = fragments.get(('inline_summary', digest), lambda: render_inline_summary(
+            result['inline_feedback']))
         
         # v6.0.0: Draft history (only if user has access)
         if features.get('draft_history', False):
             draft_history_html = create_draft_history_html()
         else:
-            draft_history_html = f"""
-            <div style="padding: 20px; background: #fff3cd; border-radius: 8px; border-left: 4px solid #ffc107;">
-                <h3 style="color: #856404; margin-top: 0;">🔒 Draft History Locked</h3>
-                <p>{douessay.license_manager.get_upgrade_message('draft_history', user_type)}</p>
-            </div>
-            """
+            draft_history_html = locked_feature_html('draft_history', 'Draft History', user_type)
         
         # v6.0.0: Apply grammar corrections (only if user has access)
-        if features.get('grammar_check', False):
-            corrected_essay = essay_text
-            corrections = result['corrections']
-            for correction in sorted(corrections, key=lambda x: x.get('offset', -1), reverse=True):
-                # Validate correction structure and values
-                offset = correction.get('offset')
-                length = correction.get('length')
-                suggestion = correction.get('suggestion', '')
-                if (
-                    isinstance(offset, int) and isinstance(length, int) and
-                    offset >= 0 and length >= 0 and
-                    offset + length <= len(corrected_essay)
-                ):
-                    start = offset
-                    end = offset + length
-                    corrected_essay = corrected_essay[:start] + suggestion + corrected_essay[end:]
-                # else: skip invalid correction
+        if not corrections_ready:
+            corrected_essay = gr.update()  # v14.5.0: Still being computed; keep the current value
+        elif features.get('grammar_check', False):
+            corrected_essay = fragments.get(('corrected', digest), lambda: apply_corrections(
+                essay_text, result['corrections']))
         else:
             corrected_essay = f"🔒 Grammar Check Locked\n\n{douessay.license_manager.get_upgrade_message('grammar_check', user_type)}"
         
@@ -7120,13 +10895,115 @@ def create_douessay_interface():
             result['score'],
             result['rubric_level']['level']
         )
+
+    def grading_events(essay_text, license_key, grade_level, progress):
+        """
+        v14.5.0: License checks and streamed grading behind process_essay, as
+        (kind, payload, license_result) events: ('error', (message, level), None),
+        ('score', partial, None), then ('analysis', result, license_result) and
+        ('result', result, license_result) with normalized results.
+        """
+        if not license_key.strip():
+            yield 'error', ("Please enter a valid license key.", ""), None
+            return
+        
+        license_result = douessay.license_manager.validate_license(license_key)
+        if not license_result['valid']:
+            yield 'error', (f"License Error: {license_result['message']}", ""), None
+            return
+        
+        if not essay_text.strip():
+            yield 'error', ("Please enter an essay to analyze.", ""), None
+            return
+        
+        # v14.5.0: A duplicate of an essay already being graded shares that computation;
+        # whether it also counts toward the daily limit follows the coalescing usage policy,
+        # decided as the request joins the computation
+        grammar_profile = grammar_profile_for(license_result['user_type'], grade_level)
+
+        def charge():
+            if not douessay.license_manager.increment_usage(license_key):
+                raise UsageNotRecordedError(license_key)
+        
+        # v10.1.0: Add error handling for grading process
+        result = None
+        draft_saved = False
+        try:
+            # v6.0.0: Pass grade_level to grading function
+            # v14.5.0: LanguageTool rule profile follows the user's tier and grade; outputs are
+            # streamed as grading stages complete
+            for kind, payload, *_ in douessay.stream_grade_essay(essay_text, grade_level, grammar_profile,
+                                                                 owner=license_key, pool=grading_pool,
+                                                                 charge=charge):
+                if kind == 'progress':
+                    progress((GRADING_STAGES.index(payload) + 1) / len(GRADING_STAGES), desc=f"Analyzing: {payload}")
+                elif kind == 'score':
+                    yield 'score', payload, None
+                elif kind in ('analysis', 'result'):
+                    # v10.1.0: Normalize result to ensure canonical schema
+                    result = normalize_grading_result(payload)
+                    # v10.1.0: Save to draft history with error handling (only if user has access)
+                    if not draft_saved and license_result.get('features', {}).get('draft_history', False):
+                        draft_saved = True
+                        try:
+                            save_draft(essay_text, result)
+                        except Exception as e:
+                            # v10.1.0: Log but don't fail the entire request
+                            logger.error("Error saving draft: %s", str(e), exc_info=True)
+                    if kind == 'analysis':
+                        yield 'analysis', result, license_result
+        except UsageNotRecordedError:
+            yield 'error', ("License Error: Failed to update usage count", ""), None
+            return
+        except Exception as e:
+            # v10.1.0: Log error and return user-friendly message
+            logger.error("Error in process_essay grading: %s", str(e), exc_info=True)
+            error_html = f"""
+            <div style="padding: 20px; background: #f8d7da; border-radius: 8px; border-left: 4px solid #dc3545;">
+                <h3 style="color: #721c24; margin-top: 0;">⚠️ Temporary Grading Error</h3>
+                <p style="color: #721c24;">We're sorry — a temporary grading error occurred. 
+                Engineers have been notified. Please try again in a moment.</p>
+                <p style="color: #721c24; font-size: 0.9em;">Error ID: {datetime.now().strftime('%Y%m%d-%H%M%S')}</p>
+            </div>
+            """
+            yield 'error', (error_html, "Error"), None
+            return
+        
+        yield 'result', result, license_result
+
+    def process_essay(essay_text, license_key, grade_level, progress=gr.Progress()):
+        """
+        v14.5.0: Generator: yields the score and rubric level as soon as they are
+        known, then the assessment, breakdown and annotated essay, then the
+        grammar corrections. Per-analyzer progress drives the progress bar.
+        """
+        for kind, payload, license_result in grading_events(essay_text, license_key, grade_level, progress):
+            if kind == 'error':
+                message, level = payload
+                yield "", message, "", "", "", "", "", 0, level
+            elif kind == 'score':
+                yield ("", create_score_preview_html(payload, grade_level), gr.update(), gr.update(),
+                       gr.update(), gr.update(), gr.update(), payload['score'], payload['rubric_level']['level'])
+            else:
+                yield render_outputs(essay_text, grade_level, license_result, payload,
+                                     corrections_ready=(kind == 'result'))
+
+    def process_essay_payload(essay_text, license_key, grade_level, progress=gr.Progress()):
+        """v14.5.0: process_essay for client rendering: streams result payloads instead of HTML."""
+        for kind, payload, license_result in grading_events(essay_text, license_key, grade_level, progress):
+            if kind == 'error':
+                message, level = payload
+                yield {'v': RESULT_PAYLOAD_VERSION, 'st': 'error', 'm': message, 'lv': level}
+            else:
+                yield douessay.build_result_payload(essay_text, payload, license_result, grade_level,
+                                                    drafts=draft_history, stage=kind)
     
 
     with gr.Blocks(title="DouEssay Assessment System v14.4.0", theme=gr.themes.Soft(), css="""
         .gradio-container {max-width: 1400px !important;}
         .tab-nav button {font-size: 1.1em; font-weight: 500;}
         h1, h2, h3 {color: #2c3e50;}
-    """) as demo:
+    """, head=f"<script>{RESULT_TEMPLATES_JS}</script>" if CLIENT_RENDERING else None) as demo:
         gr.Markdown("# 🎓 DouEssay Assessment System v14.4.0")
         gr.Markdown("### AI Writing Mentor • Reliability, Transparency & Rubric Alignment • Teacher-Validated Evidence Detection")
         gr.Markdown("**Created by changcheng967 • Doulet Media**")
@@ -7164,6 +11041,8 @@ def create_douessay_interface():
                 
                 # v13.0.1: Notification area on Home Page
                 home_notification = gr.HTML()
+                # v14.5.0: Result payload rendered in the browser when client rendering is on
+                result_payload = gr.JSON(visible=False)
             
             # Tab 2: Assessment Results
             with gr.TabItem("📊 Assessment", id=1):
@@ -7338,21 +11217,36 @@ def create_douessay_interface():
                 """)
         
         # Button actions
-        grade_btn.click(
-            process_essay,
-            inputs=[essay_input, license_input, grade_level],
-            outputs=[
-                home_notification,  # v13.0.1: Notification on Home Page
-                assessment_output,
-                annotated_output,
-                score_breakdown_output,
-                vocab_output,
-                draft_history_output,
-                corrected_output,
-                score_display,
-                level_display
-            ]
-        )
+        result_outputs = [
+            home_notification,  # v13.0.1: Notification on Home Page
+            assessment_output,
+            annotated_output,
+            score_breakdown_output,
+            vocab_output,
+            draft_history_output,
+            corrected_output,
+            score_display,
+            level_display
+        ]
+        if CLIENT_RENDERING:
+            # v14.5.0: The server only sends the payload; the page-head templates render each update
+            grade_btn.click(
+                process_essay_payload,
+                inputs=[essay_input, license_input, grade_level],
+                outputs=[result_payload]
+            )
+            result_payload.change(
+                None,
+                inputs=[result_payload] + result_outputs,
+                outputs=result_outputs,
+                js="(payload, ...current) => window.DouEssayTemplates.render(payload, current)"
+            )
+        else:
+            grade_btn.click(
+                process_essay,
+                inputs=[essay_input, license_input, grade_level],
+                outputs=result_outputs
+            )
         
         # v13.0.0: Fixed Clear button to also reset essay input
         # Define clear values for better maintainability
@@ -7372,6 +11266,7 @@ def create_douessay_interface():
                 CLEAR_TEXT,  # corrected_output
                 CLEAR_NUMBER,  # score_display
                 CLEAR_TEXT,  # level_display
+                None,  # result_payload (v14.5.0)
             )
         
         clear_btn.click(
@@ -7386,12 +11281,17 @@ def create_douessay_interface():
                 draft_history_output,
                 corrected_output,
                 score_display,
-                level_display
+                level_display,
+                result_payload
             ]
         )
     
     return demo
 
 if __name__ == "__main__":
-    demo = create_douessay_interface()
-    demo.launch(server_name="0.0.0.0", server_port=7860)
+    if '--api' in sys.argv[1:]:
+        # v14.5.0: Standalone REST API for api_access licenses
+        serve_grading_api(port=int(os.environ.get('DOUESSAY_API_PORT', '8000')))
+    else:
+        demo = create_douessay_interface()
+        demo.launch(server_name="0.0.0.0", server_port=7860)
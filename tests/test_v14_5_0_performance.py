@@ -0,0 +1,1844 @@
+"""
+DouEssay v14.5.0 Performance Test Suite
+
+Tests:
+1. Slotted inline feedback / grammar correction records
+2. Shared annotation span table
+3. Precompiled regex registry
+4. Inverted term-to-sentence index
+5. Whole-word indicator matching and compatibility report
+6. Persistent sentence-level grammar cache
+7. Load-balanced LanguageTool server pool
+8. Chunked parallel grammar checking for long essays
+9. Tier and grade-level LanguageTool rule profiles
+10. Class-set grammar batching
+11. Pluggable grammar backends and the heuristic engine
+12. Grammar backend health supervision and recycling
+13. Supabase deadlines, circuit breaker and degraded licensing
+14. Local SQLite license store
+15. Negative cache and Bloom filter for invalid license keys
+16. Sampled, locally rolled-up subsystem metrics
+17. Pre-forked grading worker pool
+18. Single-flight coalescing of duplicate grade requests
+19. Streaming grading stages and time to first result
+20. Compact result payloads for client-side rendering
+21. Memoized static and result-derived HTML fragments
+22. Async REST API with batching, license caching and backpressure
+23. Field projection for grading results
+24. Async grading and license validation
+"""
+
+import asyncio
+import copy
+import json
+import app
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import os
+import random
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import re
+import requests
+import sys
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+sys.path.insert(0, '.')
+
+from app import (DouEssay, InlineFeedbackItem, GrammarCorrection,
+                 AnnotationSpanTable, serialize_records, _sentence_spans,
+                 TermIndex, EssayTokenTable, GrammarCache, GrammarMatch,
+                 LanguageToolPool, _grammar_chunks, grammar_profile_for,
+                 GrammarBackend, HeuristicGrammarBackend, GrammarSupervisor,
+                 LicenseManager, CircuitBreaker, SupabaseLicenseStore, SQLiteLicenseStore, BloomFilter,
+                 SubsystemMetricsAggregator, GradingWorkerPool, GradingWorkerError, benchmark_grading_pool,
+                 SingleFlight, LatencyTracker, GRADING_STAGES, _GENERIC_WORDS, _GENERIC_WORD_PRIORITY, _RE_GENERIC_WORD,
+                 normalize_grading_result, serialize_result, RESULT_PAYLOAD_VERSION, RESULT_TEMPLATES_JS, HTMLFragmentCache,
+                 GradingAPI, RESULT_FIELD_STAGES, assess_essay)
+
+
+SAMPLE_ESSAY = """Technology is very important in modern education. It helps students learn.
+It makes things easier. For example, research shows that 85% of students use laptops daily.
+
+In my experience, I learned that online tools are useful. Some teachers disagree! However,
+the data reveals significant benefits? The results were created by a school board in 2023."""
+
+
+class _FakeMatch:
+    """Minimal stand-in for a language_tool_python Match."""
+    def __init__(self, offset, length, replacements, message):
+        self.offset = offset
+        self.errorLength = length
+        self.replacements = replacements
+        self.message = message
+
+
+class _TypoTool:
+    """Fake LanguageTool flagging every 'teh', recording the texts it was sent."""
+    def __init__(self):
+        self.checked = []
+
+    def check(self, text):
+        self.checked.append(text)
+        return [_FakeMatch(m.start(), 3, ['the'], 'Possible typo.') for m in re.finditer(r'\bteh\b', text)]
+
+
+def _cached_grader(path, version='lt-test'):
+    de = DouEssay()
+    de.grammar_enabled = True
+    de.grammar_tool = _TypoTool()
+    de.grammar_cache = GrammarCache(path, max_entries=1000, version=version)
+    return de
+
+
+class _FakeLanguageToolHandler(BaseHTTPRequestHandler):
+    """Minimal LanguageTool /v2/check endpoint flagging 'teh' and 'in order to' (offsets in UTF-16 units)."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+        text = form['text'][0]
+        self.server.checks += 1
+        self.server.params.append({k: v[0] for k, v in form.items() if k != 'text'})
+        # Simulated cost grows with the number of active rule categories (default set ~ 20)
+        categories = form.get('enabledCategories', [''])[0]
+        time.sleep(self.server.cost_per_category * (len(categories.split(',')) if categories else 20))
+        self.server.connections.add(self.client_address)
+        matches = []
+        for m in re.finditer(r'\bteh\b', text):
+            offset = len(text[:m.start()].encode('utf-16-le')) // 2
+            matches.append({'offset': offset, 'length': 3, 'message': 'Possible typo.',
+                            'replacements': [{'value': 'the'}],
+                            'rule': {'id': 'MORFOLOGIK_RULE_EN_US', 'category': {'id': 'TYPOS'}}})
+        if 'STYLE' in categories or not categories:
+            for m in re.finditer(r'\bin order to\b', text):
+                offset = len(text[:m.start()].encode('utf-16-le')) // 2
+                matches.append({'offset': offset, 'length': 11, 'message': 'Consider a shorter alternative.',
+                                'replacements': [{'value': 'to'}],
+                                'rule': {'id': 'IN_ORDER_TO', 'category': {'id': 'STYLE'}}})
+        body = json.dumps({'software': {'version': '6.8-fake'}, 'matches': matches}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        body = json.dumps([{'name': 'English (US)', 'code': 'en', 'longCode': 'en-US'}]).encode('utf-8')
+        self.send_response(200 if self.path.endswith('/languages') else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_fake_language_tool():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeLanguageToolHandler)
+    server.checks = 0
+    server.connections = set()
+    server.params = []
+    server.cost_per_category = 0.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/v2/'
+
+
+def test_sentence_spans_match_regex_split():
+    """Test that offset spans reproduce the legacy re.split sentence list"""
+    texts = [SAMPLE_ESSAY, "", "...", "  One.  Two!!  ", "No terminator", "\n\nA?B.C!"]
+    for text in texts:
+        legacy = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+        assert [text[a:b] for a, b in _sentence_spans(text)] == legacy
+    print("✅ PASS: Sentence spans match legacy splitting")
+
+
+def test_inline_feedback_records():
+    """Test that inline feedback records are slotted and serialize to the legacy shape"""
+    de = DouEssay()
+    feedback = de.analyze_inline_feedback(SAMPLE_ESSAY)
+    assert feedback, "Expected inline feedback for sample essay"
+
+    for item in feedback:
+        assert isinstance(item, InlineFeedbackItem)
+        assert not hasattr(item, '__dict__'), "Records must not carry a per-instance __dict__"
+        assert item.text is SAMPLE_ESSAY, "Records should reference the essay, not copy it"
+        data = item.to_dict()
+        assert list(data)[:5] == ['sentence_index', 'sentence', 'type', 'severity', 'suggestion']
+        assert data['sentence'] == SAMPLE_ESSAY[item.start:item.end]
+        assert item['severity'] == data['severity'] and item.get('type') == data['type']
+
+    generic = [f for f in feedback if f['type'] == 'generic_word']
+    assert generic, "Expected a generic word suggestion"
+    assert generic[0]['suggestion'].startswith("💡 Vocabulary: Replace '")
+    assert isinstance(generic[0]['alternatives'], list)
+    assert all(isinstance(d, dict) for d in serialize_records(feedback))
+    print(f"✅ PASS: {len(feedback)} inline feedback records validated")
+
+
+def test_grammar_correction_records():
+    """Test that grammar corrections reference the original text by offset"""
+    de = DouEssay()
+    de.grammar_enabled = True
+
+    class _FakeTool:
+        def check(self, text):
+            return [_FakeMatch(0, 10, ['Technologies'], 'Possible agreement error.'),
+                    _FakeMatch(14, 4, [], 'No replacement available.')]
+
+    de.grammar_tool = _FakeTool()
+    corrections = de.get_grammar_corrections(SAMPLE_ESSAY)
+    assert len(corrections) == 1
+    correction = corrections[0]
+    assert isinstance(correction, GrammarCorrection)
+    assert correction.to_dict() == {
+        'offset': 0, 'length': 10, 'original': 'Technology',
+        'suggestion': 'Technologies', 'message': 'Possible agreement error.'
+    }
+    print("✅ PASS: Grammar correction records validated")
+
+
+def test_grade_essay_result_is_json_serializable():
+    """Test that grade_essay returns records as plain dicts while the stages keep slotted records"""
+    de = DouEssay()
+    de.grammar_enabled = True
+    de.grammar_tool = _TypoTool()
+    essay = SAMPLE_ESSAY + " I read teh book twice."
+    result = de.grade_essay(essay)
+    assert result['corrections'] and result['inline_feedback']
+    assert json.loads(json.dumps(result))['corrections'] == result['corrections']
+    staged = next(event[1] for event in de.grade_essay_stages(essay) if event[0] == 'result')
+    assert isinstance(staged['corrections'][0], GrammarCorrection)
+    serialized = serialize_result(staged)
+    assert all(isinstance(item, dict) for item in serialized['inline_feedback'])
+    assert serialized['corrections'] == result['corrections'] and staged['inline_feedback'] is not serialized['inline_feedback']
+    print(f"✅ PASS: grade_essay result JSON-encodes ({len(json.dumps(result))} bytes)")
+
+
+def test_span_table_shared_by_producers_and_renderer():
+    """Test that inline feedback and the annotated HTML resolve sentences from one span table"""
+    de = DouEssay()
+    feedback = de.analyze_inline_feedback(SAMPLE_ESSAY)
+    table = de.get_span_table(SAMPLE_ESSAY)
+    assert isinstance(table, AnnotationSpanTable)
+    assert table.layer('inline_feedback') is feedback
+
+    for item in feedback:
+        assert table.sentence(item.sentence_index) == item.sentence
+        assert table.sentence_index_at(item.start) == item.sentence_index
+    assert table.sentence_index_at(SAMPLE_ESSAY.index('.')) is None, "Delimiters belong to no sentence"
+
+    # Another essay graded in between (e.g. concurrently) keeps its own table
+    other = de.get_span_table("A different essay. It interleaves.")
+    assert other is not table and de.get_term_index(other.text).text == other.text
+
+    html = de.create_annotated_essay_html(SAMPLE_ESSAY, feedback)
+    assert de.get_span_table(SAMPLE_ESSAY) is table, "Renderer should reuse the producers' table"
+    assert de.create_annotated_essay_html(SAMPLE_ESSAY) == html, "Renderer reads the producer's layer"
+    assert html.count('<span style=') == len(table)
+    # Plain dicts (legacy callers) render identically to records
+    assert de.create_annotated_essay_html(SAMPLE_ESSAY, serialize_records(feedback)) == html
+    print(f"✅ PASS: {len(table)} sentence spans shared across annotations")
+
+
+def _legacy_generic_words(sentence_lower):
+    return [word for word in _GENERIC_WORDS
+            if re.search(r'\b' + re.escape(word) + r'\b', sentence_lower)]
+
+
+def _combined_generic_words(sentence_lower):
+    return sorted(set(_RE_GENERIC_WORD.findall(sentence_lower)), key=_GENERIC_WORD_PRIORITY.get)
+
+
+def test_generic_word_alternation_matches_per_word_search():
+    """Test that the combined generic-word pattern finds the same words as one search per word"""
+    rng = random.Random(14)
+    vocabulary = list(_GENERIC_WORDS) + ['a', 'lot', 'verys', 'somewhat', 'thing', 'the', 'essay', 'bigger']
+    for _ in range(500):
+        sentence = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 12)))
+        assert _combined_generic_words(sentence) == _legacy_generic_words(sentence), sentence
+
+    # Microbenchmark: one compiled scan vs. one re.search per generic word
+    sentence = "technology is very important and many students use some tools a lot in class"
+    legacy_time = timeit.timeit(lambda: _legacy_generic_words(sentence), number=2000)
+    combined_time = timeit.timeit(lambda: _combined_generic_words(sentence), number=2000)
+    print(f"  per-word search: {legacy_time * 500:.1f}µs/sentence, combined: {combined_time * 500:.1f}µs/sentence")
+    assert combined_time < legacy_time
+    print("✅ PASS: Generic-word check is one compiled scan per sentence")
+
+
+def test_term_index_matches_substring_search():
+    """Test that inverted index lookups agree with `term in segment` for every segment"""
+    rng = random.Random(29)
+    words = ['all', 'always', 'never', 'nevertheless', 'no', 'one', 'no one', 'tall', 'however,', 'but']
+    for _ in range(200):
+        segments = [' '.join(rng.choice(words) for _ in range(rng.randint(0, 8))) for _ in range(rng.randint(1, 6))]
+        index = TermIndex(segments)
+        for term in ['all', 'never', 'no one', 'one', 'however, this', 'l', ' no ', '', 'missing']:
+            expected = tuple(i for i, seg in enumerate(segments) if term in seg)
+            assert index.containing(term) == expected, (segments, term)
+    print("✅ PASS: Term index agrees with substring search")
+
+
+def test_absolute_statements_use_shared_index():
+    """Test that absolute-statement contexts come from one shared sentence index"""
+    de = DouEssay()
+    essay = ("Everyone always uses phones. Teachers never agree. "
+             "Nevertheless, all students learn! It is impossible to say no one cares.")
+    result = de.detect_absolute_statements(essay)
+    term_index = de.get_term_index(essay)
+    assert term_index is de.get_term_index(essay), "Index should be built once per essay"
+    terms = [instance['term'] for instance in result['instances']]
+    assert terms == ['always', 'never', 'never', 'everyone', 'no one'], terms
+    assert result['instances'][2]['context'] == 'Nevertheless, all students learn'
+    assert result['absolute_count'] == 6
+    print("✅ PASS: Absolute statements resolved through the term index")
+
+
+def test_token_table_matches_whole_words():
+    """Test that token lookups respect word boundaries where substring tests over-match"""
+    table = EssayTokenTable("i also started the real-world art class, so we see it in the end.")
+    assert table.has('so') and table.has('art') and table.has('real-world')
+    assert table.has('in the end') and table.has('Real World')
+    assert table.has('in the') and table.has('art class')
+    assert not table.has('start') and not table.has('tart') and not table.has('lso')
+    assert not table.has('') and not table.has('class so we saw')
+    assert table.count_present(['so', 'also', 'lso', 'in the end']) == 3
+    print("✅ PASS: Token table matches whole words and phrases")
+
+
+def test_token_matching_flag_and_shift_report():
+    """Test that substring scoring is the default and the report covers the teacher datasets"""
+    de = DouEssay()
+    if not os.environ.get('DOUESSAY_TOKEN_MATCHING'):
+        assert de.token_matching is False, "Legacy substring matching must stay the default"
+    essay = "Art is also important. " * 3 + "So students start to analyze data, and it matters."
+    legacy = de.assess_with_neural_rubric(essay)
+    de.token_matching = True
+    token = de.assess_with_neural_rubric(essay)
+    assert token['rubric_scores']['communication'] <= legacy['rubric_scores']['communication']
+
+    essays = []
+    for name in ('teacher_dataset.json', 'teacher_dataset_v14_2_0.json'):
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name)) as f:
+            essays.extend(json.load(f))
+    de.token_matching = False
+    seen, reporting = set(), True
+
+    def watch():
+        while reporting:
+            seen.add(de.token_matching)
+            time.sleep(0.001)
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    try:
+        report = de.compare_indicator_matching(essays)
+    finally:
+        reporting = False
+        watcher.join()
+    assert seen == {False}, "The report must not flip the mode concurrent gradings read"
+    assert report['essay_count'] == len(essays)
+    assert report['max_abs_score_shift'] >= report['mean_abs_score_shift'] >= 0
+    print(f"  token matching shifts {report['changed_count']}/{report['essay_count']} teacher essays, "
+          f"mean |Δ| {report['mean_abs_score_shift']}, max |Δ| {report['max_abs_score_shift']}")
+    print("✅ PASS: Indicator matching compatibility report generated")
+
+
+def test_grammar_cache_checks_only_unseen_sentences():
+    """Test that cached sentences skip the JVM and offsets land in the original essay"""
+    path = os.path.join(tempfile.mkdtemp(), 'grammar.sqlite3')
+    de = _cached_grader(path)
+    draft = "I read teh book. It was good!\n\nTeh end came  fast, and teh  plot held."
+    matches = de.check_grammar(draft)
+    assert [draft[m.offset:m.offset + m.errorLength] for m in matches] == ['teh', 'teh']
+    assert [m.offset for m in matches] == [m.start() for m in re.finditer(r'\bteh\b', draft)]
+    assert len(de.grammar_tool.checked) == 1
+
+    revision = "I read teh book. It was great!\n\nTeh end came fast, and teh plot held."
+    de.check_grammar(revision)
+    assert de.grammar_tool.checked[-1] == "It was great!", "Only the unseen sentence should be checked"
+    offsets = [m.offset for m in de.check_grammar(revision)]
+    assert offsets == [m.start() for m in re.finditer(r'\bteh\b', revision)]
+    stats = de.grammar_cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 4 and stats['hit_rate'] == round(2 / 6, 4)
+
+    # Survives a restart; a different engine version never reads stale entries
+    restarted = _cached_grader(path)
+    restarted.check_grammar(revision)
+    assert restarted.grammar_tool.checked == [] and restarted.grammar_cache.stats()['hit_rate'] == 1.0
+    upgraded = _cached_grader(path, version='lt-next')
+    upgraded.check_grammar(revision)
+    assert len(upgraded.grammar_tool.checked) == 1
+    print(f"✅ PASS: Grammar cache hit rate {stats['hit_rate']:.0%} on a revised draft")
+
+
+def test_grammar_cache_lru_eviction():
+    """Test that the grammar cache stays within its size bound, evicting least recently used"""
+    cache = GrammarCache(':memory:', max_entries=3)
+    cache.put_many({'one.': [], 'two.': [GrammarMatch(0, 3, ['two'], 'msg', 'RULE', 'GRAMMAR')], 'three.': []})
+    time.sleep(0.01)
+    assert set(cache.get_many(['one.', 'two.'])) == {'one.', 'two.'}
+    time.sleep(0.01)
+    cache.put_many({'four.': []})
+    cache.evict()
+    assert len(cache) == 3
+    assert set(cache.get_many(['one.', 'two.', 'three.', 'four.'])) == {'one.', 'two.', 'four.'}
+    assert cache.get_many(['two.'])['two.'][0].to_row() == [0, 3, ['two'], 'msg', 'RULE', 'GRAMMAR']
+    print("✅ PASS: Grammar cache evicts least recently used sentences")
+
+
+def test_language_tool_pool_balances_and_reuses_connections():
+    """Test that the pool spreads checks across servers over keep-alive connections"""
+    servers = [_start_fake_language_tool() for _ in range(2)]
+    pool = LanguageToolPool([url for _, url in servers])
+    try:
+        text = "Emoji 😀 then teh word."
+        for _ in range(10):
+            matches = pool.check(text)
+            assert [(text[m.offset:m.offset + m.errorLength], m.ruleId) for m in matches] == \
+                [('teh', 'MORFOLOGIK_RULE_EN_US')]
+        assert [server.checks for server, _ in servers] == [5, 5]
+        assert all(len(server.connections) == 1 for server, _ in servers), "Connections should be kept alive"
+        assert pool.version == '6.8-fake'
+
+        # Graders share the pool through the usual grammar entry point
+        de = DouEssay()
+        de.grammar_enabled = True
+        de.grammar_tool = pool
+        de.grammar_cache = None
+        assert de.check_grammar_errors("I read teh book. " * 10)['error_count'] == 10
+
+        # A dead server is skipped and its checks go to the survivor
+        dead = socket.socket()
+        dead.bind(('127.0.0.1', 0))
+        dead_url = f'http://127.0.0.1:{dead.getsockname()[1]}'
+        dead.close()
+        failover = LanguageToolPool([dead_url, servers[0][1]])
+        for _ in range(3):
+            assert len(failover.check(text)) == 1
+        stats = failover.stats()
+        assert stats['servers'][0]['failures'] >= 1 and all(s['in_flight'] == 0 for s in stats['servers'])
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+            server.server_close()
+    print(f"✅ PASS: Pool balanced {[s['checks'] for s in pool.stats()['servers']]} checks across servers")
+
+
+def test_language_tool_pool_reattaches_to_registry_and_caps_heap():
+    """Test that pool clients re-read the shared registry and local JVMs get their own -Xmx"""
+    previous = os.environ.get('JAVA_TOOL_OPTIONS')
+    tool = app._HeapCappedLanguageTool.__new__(app._HeapCappedLanguageTool)
+    tool._heap, tool._server = '256m', None
+    tool._local_language_tool = SimpleNamespace(
+        get_server_cmd=lambda port, config: ['java', '-cp', 'languagetool-server.jar',
+                                             'org.languagetool.server.HTTPServer', '--port', str(port)])
+    assert tool._local_language_tool.get_server_cmd(8081, None)[:3] == ['java', '-Xmx256m', '-cp']
+    assert os.environ.get('JAVA_TOOL_OPTIONS') == previous, "The process environment must stay untouched"
+
+    # The owner restarted its servers (or a survivor replaced them): a failing
+    # client picks up the newly published URLs instead of giving up
+    server, url = _start_fake_language_tool()
+    dead = socket.socket()
+    dead.bind(('127.0.0.1', 0))
+    dead_url = f'http://127.0.0.1:{dead.getsockname()[1]}'
+    dead.close()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = os.path.join(tmp, 'lt_pool.json')
+            LanguageToolPool._publish(registry, 'en-US', [url])
+            pool = LanguageToolPool([dead_url])
+            pool._registry = (registry, 1, '256m')
+            assert len(pool.check("I read teh book.")) == 1
+            assert [c.url for c in pool.clients] == [url.rstrip('/')]
+            assert server.checks == 1
+
+            # Re-reads are rate limited while the published servers keep failing
+            LanguageToolPool._publish(registry, 'en-US', [dead_url])
+            pool.clients = [app.LanguageToolServerClient(dead_url)]
+            try:
+                pool.check("I read teh book.")
+                raise AssertionError("Expected the check to fail")
+            except requests.ConnectionError:
+                pass
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ PASS: Pool re-resolved the registry and capped the JVM heap per server")
+
+
+def test_long_essays_are_checked_in_overlapping_chunks():
+    """Test that chunked checking finds the same matches as one call, at chunk-sized cost"""
+    rng = random.Random(33)
+    paragraphs = []
+    for _ in range(40):
+        words = [rng.choice(['students', 'read', 'teh', 'book', 'and', 'learn', 'quickly']) for _ in range(60)]
+        paragraphs.append(' '.join(words).capitalize() + '.')
+    essay = '\n\n'.join(paragraphs)
+
+    chunks = _grammar_chunks(essay, chunk_chars=2000, overlap_chars=100)
+    assert len(chunks) > 1
+    assert [c[2] for c in chunks[1:]] == [c[3] for c in chunks[:-1]], "Owned ranges must partition the text"
+    assert chunks[0][2] == 0 and chunks[-1][3] == len(essay)
+    for check_start, check_end, own_start, own_end in chunks:
+        assert check_start <= own_start < own_end <= check_end
+        assert own_start == 0 or essay[own_start - 2:own_start] == '\n\n', "Cuts fall on paragraph boundaries"
+
+    single = DouEssay()
+    single.grammar_enabled = True
+    single.grammar_tool = _TypoTool()
+    single.grammar_cache = None
+    expected = [m.offset for m in single.check_grammar(essay)]
+
+    previous = app.GRAMMAR_CHUNK_CHARS
+    app.GRAMMAR_CHUNK_CHARS = 2000
+    try:
+        chunked = DouEssay()
+        chunked.grammar_enabled = True
+        chunked.grammar_tool = _TypoTool()
+        chunked.grammar_cache = None
+        matches = chunked.check_grammar(essay)
+    finally:
+        app.GRAMMAR_CHUNK_CHARS = previous
+    assert [m.offset for m in matches] == expected
+    assert all(essay[m.offset:m.offset + 3] == 'teh' for m in matches)
+    longest = max(len(text) for text in chunked.grammar_tool.checked)
+    assert len(chunked.grammar_tool.checked) == len(chunks) and longest < len(essay) / 3
+    print(f"✅ PASS: {len(expected)} matches from {len(chunks)} chunks (longest {longest} of {len(essay)} chars)")
+
+
+def test_rule_profiles_follow_tier_and_grade():
+    """Test that rule profiles are chosen per tier/grade and only filter the corrections grading shows"""
+    assert grammar_profile_for('free', 'Grade 12') == 'core'
+    assert grammar_profile_for('student_basic', 9) == 'core'
+    assert grammar_profile_for('student_premium', 'Grade 11') == 'grade9'
+    assert grammar_profile_for('teacher_suite', 'Grade 9') == 'grade9'
+    assert grammar_profile_for('teacher_suite', 'Grade 12') == 'full'
+    assert grammar_profile_for(None, None) == 'full' and grammar_profile_for('mystery', '10') == 'full'
+
+    server, url = _start_fake_language_tool()
+    try:
+        de = DouEssay()
+        de.grammar_enabled = True
+        de.grammar_tool = LanguageToolPool([url])
+        de.grammar_cache = GrammarCache(':memory:', version='lt-test')
+        essay = "I read teh book in order to learn. It was good."
+        # Grading counts errors with the full rule set whatever the tier; profiles filter corrections
+        assert de.check_grammar_errors(essay, 'core') == de.check_grammar_errors(essay)
+        assert de.check_grammar_errors(essay, 'core')['error_count'] == 2
+        assert [c.suggestion for c in de.get_grammar_corrections(essay, 'core')] == ['the']
+        assert [c.suggestion for c in de.get_grammar_corrections(essay)] == ['the', 'to']
+        assert server.checks == 1 and 'enabledCategories' not in server.params[-1]
+
+        # Profiles sent to LanguageTool directly
+        assert len(de.check_grammar(essay, 'core')) == 1
+        assert server.params[-1]['enabledOnly'] == 'true'
+        assert 'GRAMMAR' in server.params[-1]['enabledCategories'].split(',')
+        assert server.checks == 2, "Profiles must not share cached matches"
+        assert [m.category for m in de.check_grammar(essay)] == ['TYPOS', 'STYLE']
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ PASS: Rule profiles selected per tier/grade and applied to the corrections shown")
+
+
+def test_class_set_grammar_batching():
+    """Test that a class set is checked in a few packed requests with per-essay offsets"""
+    rng = random.Random(35)
+    words = ['students', 'read', 'teh', 'book', 'and', 'learn', 'quickly', 'because']
+    essays = []
+    for _ in range(60):
+        paragraphs = [' '.join(rng.choice(words) for _ in range(40)).capitalize() + '.' for _ in range(3)]
+        essays.append('\n\n'.join(paragraphs))
+    # Separator-adjacent words must not pair into a match across essays
+    essays.append("Teh")
+    essays.append("teh")
+
+    single = DouEssay()
+    single.grammar_enabled = True
+    single.grammar_tool = _TypoTool()
+    single.grammar_cache = None
+    expected = [[m.offset for m in single.check_grammar(essay)] for essay in essays]
+
+    batched = DouEssay()
+    batched.grammar_enabled = True
+    batched.grammar_tool = _TypoTool()
+    batched.grammar_cache = None
+    results = batched.check_grammar_batch(essays + essays[:5])
+    assert [[m.offset for m in matches] for matches in results[:len(essays)]] == expected
+    assert len(batched.grammar_tool.checked) <= len(essays) // 10
+    # Later per-essay calls (e.g. grade_essay) reuse the batch results
+    batched.check_grammar_errors(essays[0])
+    requests = len(batched.grammar_tool.checked)
+
+    # With a grammar cache, one packed check covers every unseen sentence in the class
+    cached = _cached_grader(':memory:')
+    cached_results = cached.check_grammar_batch(essays)
+    assert [[m.offset for m in matches] for matches in cached_results] == expected
+    assert len(cached.grammar_tool.checked) <= len(essays) // 10
+
+    # Per-essay overhead against a server with a fixed per-request cost
+    server, url = _start_fake_language_tool()
+    server.cost_per_category = 0.0002
+    try:
+        timings = {}
+        for mode in ('single', 'batch'):
+            de = DouEssay()
+            de.grammar_enabled = True
+            de.grammar_tool = LanguageToolPool([url])
+            de.grammar_cache = None
+            start = time.perf_counter()
+            if mode == 'single':
+                for essay in essays:
+                    de.check_grammar(essay)
+            else:
+                de.check_grammar_batch(essays)
+            timings[mode] = (time.perf_counter() - start) / len(essays) * 1000
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert timings['batch'] < timings['single'] / 3
+    print(f"  per-essay grammar time: single {timings['single']:.2f}ms, batch {timings['batch']:.2f}ms")
+    print(f"✅ PASS: {len(essays)} essays grammar-checked in {requests} requests")
+
+
+def _flagged(text, matches):
+    return [(text[m.offset:m.offset + m.errorLength], m.replacements[0], m.ruleId) for m in matches]
+
+
+def test_heuristic_grammar_backend_rules():
+    """Test the JVM-free engine on each rule family and on clean teacher essays"""
+    engine = HeuristicGrammarBackend()
+    assert isinstance(engine, GrammarBackend)
+    cases = {
+        "I saw the the dog.": [('the the', 'the', 'ENGLISH_WORD_REPEAT_RULE')],
+        "She ate a apple and an banana.": [('a', 'an', 'EN_A_VS_AN'), ('an', 'a', 'EN_A_VS_AN')],
+        "An hour later a university and an FBI agent met a European.": [],
+        "It rained. we stayed in, e.g. to read.": [('we', 'We', 'UPPERCASE_SENTENCE_START')],
+        "I could of won. Their is alot more then that.": [
+            ('could of', 'could have', 'WOULD_OF'), ('Their is', 'There is', 'THEIR_IS'),
+            ('alot', 'a lot', 'ALOT'), ('more then', 'more than', 'THAN_THEN')],
+        "He don't know and they was late. Did he have time? If it were so.": [
+            ("don't", "doesn't", 'HE_VERB_AGR'), ('was', 'were', 'NON3PRS_VERB')],
+    }
+    for text, expected in cases.items():
+        assert _flagged(text, engine.check(text)) == expected, (text, _flagged(text, engine.check(text)))
+
+    essays = []
+    for name in ('teacher_dataset.json', 'teacher_dataset_v14_2_0.json'):
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name)) as f:
+            essays.extend(json.load(f))
+    flagged = sum(len(engine.check(essay['text'])) for essay in essays)
+    assert flagged <= len(essays), "Teacher-graded essays should raise few heuristic matches"
+
+    # Fast profile works without a JVM
+    de = DouEssay()
+    de.grammar_enabled = False
+    result = de.check_grammar_errors("He don't know. they was late.", 'fast')
+    assert result == {'error_count': 3, 'score': 8}
+    assert de.check_grammar_errors("He don't know.") == {'error_count': 0, 'score': 8}
+    print(f"✅ PASS: Heuristic engine rules validated ({flagged} matches on {len(essays)} teacher essays)")
+
+
+def test_grammar_backend_agreement_report():
+    """Test the backend agreement metrics against a labelled reference"""
+    class _LabelledReference(GrammarBackend):
+        name = 'labelled'
+
+        def check(self, text, profile=None):
+            return [GrammarMatch(m.start(), len(m.group()), [''], 'ref', 'REF')
+                    for m in re.finditer(r'could of|the the|alot|neccessary', text)]
+
+    de = DouEssay()
+    report = de.compare_grammar_backends(["I could of gone.", "See the the end. It is neccessary.", "Fine text."],
+                                         reference=_LabelledReference())
+    assert report['candidate'] == 'heuristic' and report['reference'] == 'labelled'
+    assert report['precision'] == 1.0 and report['recall'] == 0.667
+    assert report['score_agreement'] == 1.0 and report['f1'] == 0.8
+    print(f"✅ PASS: Backend agreement precision {report['precision']}, recall {report['recall']}")
+
+
+class _FlakyBackend(GrammarBackend):
+    """Fake engine whose failures and latency the test controls."""
+    name = 'flaky'
+    supports_profiles = True
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.fail = False
+        self.delay = 0.0
+        self.closed = False
+        self.profiles = []
+
+    def check(self, text, profile=None):
+        self.profiles.append(profile)
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError('JVM wedged')
+        return [GrammarMatch(0, 1, ['X'], 'msg', f'GEN{self.generation}')]
+
+    def close(self):
+        self.closed = True
+
+
+def test_grammar_supervisor_recycles_on_breaches():
+    """Test that the supervisor restarts the backend after N checks or threshold breaches"""
+    created = []
+
+    def factory():
+        created.append(_FlakyBackend(len(created)))
+        return created[-1]
+
+    rss = {'mb': 300.0}
+    supervisor = GrammarSupervisor(factory(), factory, max_checks=30, max_p95_ms=50,
+                                   max_error_rate=0.5, max_rss_mb=1000, rss_probe=lambda: rss['mb'])
+    supervisor.RETIRE_GRACE_SECONDS = 0.01
+    assert supervisor.supports_profiles and supervisor.name == 'flaky'
+    supervisor.check("text", profile='core')
+    assert created[0].profiles == ['core']
+    for _ in range(29):
+        supervisor.check("text")
+    assert supervisor._recycler.name == 'grammar-recycle', "Recycling runs off the request thread"
+    supervisor._recycler.join()
+    assert len(created) == 2 and supervisor.health()['last_recycle_reason'] == '30 checks since last restart'
+    time.sleep(0.05)
+    assert created[0].closed, "Retired backend is closed after the grace period"
+
+    # Error-rate breach: checks keep raising to the caller, then the backend is replaced
+    created[1].fail = True
+    for _ in range(GrammarSupervisor.MIN_SAMPLES):
+        try:
+            supervisor.check("text")
+        except ConnectionError:
+            pass
+    supervisor._recycler.join()
+    assert len(created) == 3 and supervisor.health()['last_recycle_reason'].startswith('error rate')
+    assert supervisor.check("text")[0].ruleId == 'GEN2'
+
+    # Latency and RSS breaches
+    created[2].delay = 0.06
+    for _ in range(GrammarSupervisor.MIN_SAMPLES):
+        supervisor.check("text")
+    supervisor._recycler.join()
+    assert len(created) == 4 and supervisor.health()['last_recycle_reason'].startswith('p95 latency')
+    supervisor.max_checks = 10000
+    rss['mb'] = 4096.0
+    for _ in range(GrammarSupervisor.RSS_CHECK_EVERY):
+        supervisor.check("text")
+    supervisor._recycler.join()
+    health = supervisor.health()
+    assert len(created) == 5 and health['last_recycle_reason'] == 'RSS 4096MB'
+    assert health['state'] == 'healthy' and health['recycles'] == 4 and health['total_errors'] == 20
+
+    # Failures reach the grader as a logged fallback, visible through grammar_health()
+    de = DouEssay()
+    de.grammar_enabled = True
+    de.grammar_tool = GrammarSupervisor(_FlakyBackend(0))
+    de.grammar_tool.backend.fail = True
+    de.grammar_cache = None
+    assert de.check_grammar_errors("Some essay text.") == {'error_count': 0, 'score': 8}
+    assert de.grammar_health()['state'] == 'down' and 'JVM wedged' in de.grammar_health()['last_error']
+    print(f"✅ PASS: Supervisor recycled the backend {health['recycles']} times")
+
+
+class _FakeServer:
+    """Stand-in for a local LanguageTool server object: a fake HTTP endpoint with close()."""
+
+    def __init__(self):
+        self.http, self.url = _start_fake_language_tool()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        self.http.shutdown()
+        self.http.server_close()
+
+
+def test_pool_restart_is_coordinated_through_the_registry():
+    """Test that only the owner of the published servers starts new ones; attached pools follow"""
+    started = []
+
+    def start_servers(size, language, heap):
+        started.append([_FakeServer() for _ in range(size)])
+        return started[-1]
+
+    original = LanguageToolPool._start_servers
+    LanguageToolPool._start_servers = staticmethod(start_servers)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = os.path.join(tmp, 'lt_pool.json')
+            os.environ.update(DOUESSAY_LT_POOL_SIZE='2', DOUESSAY_LT_POOL_REGISTRY=registry)
+            try:
+                owner = LanguageToolPool.from_env()
+                attached = LanguageToolPool.from_env()
+            finally:
+                for name in ('DOUESSAY_LT_POOL_SIZE', 'DOUESSAY_LT_POOL_REGISTRY'):
+                    os.environ.pop(name)
+            assert len(started) == 1 and attached.server_pids() == [] and not attached._servers
+
+            # A breach in an attached process does not start JVMs of its own
+            assert attached.restart(grace_seconds=0.01) is False and len(started) == 1
+
+            assert owner.restart(grace_seconds=0.05) is True and len(started) == 2
+            new_urls = [server.url for server in started[1]]
+            assert LanguageToolPool._read_registry(registry, 'en-US') == new_urls
+            assert not any(server.closed for server in started[0]), "Old servers finish in-flight checks first"
+            time.sleep(0.3)
+            assert all(server.closed for server in started[0])
+            assert len(owner.check("I read teh book.")) == 1
+
+            # The attached pool follows the published servers once it re-reads the registry
+            assert attached.restart(grace_seconds=0.01) is True
+            assert [c.url for c in attached.clients] == [c.url for c in owner.clients]
+            assert len(attached.check("I read teh book.")) == 1 and len(started) == 2
+            owner.close()
+    finally:
+        LanguageToolPool._start_servers = original
+    print("✅ PASS: Pool restart started one new set of servers for the host")
+
+
+class _FakeSupabase:
+    """In-memory stand-in for the Supabase client with controllable latency and outages."""
+
+    def __init__(self):
+        self.rows = {'licenses': [{'license_key': 'KEY-1', 'user_type': 'student_basic',
+                                   'expires_at': '2999-01-01T00:00:00', 'is_active': True}],
+                     'usage': []}
+        self.delay = 0.0
+        self.down = False
+        self.missing_tables = set()
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+
+class _FakeQuery:
+    def __init__(self, db, name):
+        self.db, self.name, self.filters, self.op = db, name, [], ('select', None)
+        self.ordering, self.after, self.limit_rows = None, None, None
+
+    def select(self, *columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column):
+        self.ordering = column
+        return self
+
+    def gt(self, column, value):
+        self.after = (column, value)
+        return self
+
+    def limit(self, count):
+        self.limit_rows = count
+        return self
+
+    def update(self, values):
+        self.op = ('update', values)
+        return self
+
+    def insert(self, values):
+        self.op = ('insert', values)
+        return self
+
+    def execute(self):
+        time.sleep(self.db.delay)
+        if self.db.down:
+            raise ConnectionError('Supabase unreachable')
+        if self.name in self.db.missing_tables:
+            raise app.PostgrestAPIError({'message': f'relation "{self.name}" does not exist', 'code': '42P01'})
+        table = self.db.rows.setdefault(self.name, [])
+        rows = [row for row in table if all(row.get(k) == v for k, v in self.filters)]
+        if self.after is not None:
+            rows = [row for row in rows if row[self.after[0]] > self.after[1]]
+        if self.ordering is not None:
+            rows = sorted(rows, key=lambda row: row[self.ordering])
+        if self.limit_rows is not None:
+            rows = rows[:self.limit_rows]
+        kind, values = self.op
+        if kind == 'insert':
+            table.append(dict(values))
+            rows = [values]
+        elif kind == 'update':
+            for row in rows:
+                row.update(values)
+        return SimpleNamespace(data=rows)
+
+
+def test_supabase_circuit_breaker_and_degraded_policy():
+    """Test that slow or failing Supabase calls time out, open the circuit and degrade gracefully"""
+    now = {'t': 0.0}
+    db = _FakeSupabase()
+    lm = LicenseManager()
+    lm.breaker = CircuitBreaker('supabase:test', timeout=0.1, failure_threshold=2, reset_seconds=30,
+                                passthrough=(app.PostgrestAPIError,), clock=lambda: now['t'])
+    lm.client, lm.store = db, SupabaseLicenseStore(db, lm.breaker)
+    lm._cached_licenses, lm._pending_usage = {}, app.Counter()
+    lm.degraded_policy = 'cached'
+
+    result = lm.validate_license('KEY-1')
+    assert result['valid'] and result['daily_usage'] == 0 and 'degraded' not in result
+    assert lm.increment_usage('KEY-1')
+    assert db.rows['usage'][0]['usage_count'] == 1
+
+    # Brownout: every call hits the deadline instead of hanging
+    db.delay = 0.5
+    start = time.perf_counter()
+    degraded = lm.validate_license('KEY-1')
+    assert time.perf_counter() - start < 0.4, "Supabase call should be cut off at the deadline"
+    assert degraded['valid'] and degraded['degraded'] and degraded['daily_usage'] == 1
+    assert lm.increment_usage('KEY-1'), "Increments are queued while Supabase is unavailable"
+    health = lm.supabase_health()
+    assert health['state'] == 'open' and health['total_timeouts'] == 2 and health['queued_usage'] == 1
+    # The hung calls cannot be cancelled: they are counted until the client returns
+    assert lm.breaker.backstop == 0.2 and health['total_overdue'] == 2 and health['overdue_calls'] >= 1
+
+    # Open circuit: fail fast, unknown keys are denied, cached keys keep grading
+    start = time.perf_counter()
+    assert not lm.validate_license('KEY-UNKNOWN')['valid']
+    assert lm.validate_license('KEY-1')['daily_usage'] == 2
+    assert lm.increment_usage('KEY-1')
+    assert time.perf_counter() - start < 0.05 and lm.supabase_health()['rejected'] >= 3
+    lm.degraded_policy = 'deny'
+    assert not lm.validate_license('KEY-1')['valid'] and not lm.increment_usage('KEY-1')
+    lm.degraded_policy = 'cached'
+
+    # Subsystem metrics stay queued without raising while the circuit is open
+    grader = DouEssay()
+    grader.license_manager = lm
+    grader.metrics_aggregator = SubsystemMetricsAggregator(sample_rate=1.0)
+    grader.track_subsystem_metrics("Essay text.", {})
+    assert grader.metrics_aggregator.stats()['pending_rows'] == 1
+
+    # Recovery: a half-open trial closes the circuit and the queue is flushed
+    db.delay = 0.0
+    time.sleep(0.5)
+    assert lm.supabase_health()['overdue_calls'] == 0
+    now['t'] = 31.0
+    assert lm.increment_usage('KEY-1')
+    assert db.rows['usage'][0]['usage_count'] == 4
+    assert lm.supabase_health()['state'] == 'closed' and lm.supabase_health()['queued_usage'] == 0
+
+    # PostgREST errors mean Supabase answered: they don't trip the breaker
+    db.missing_tables.add('subsystem_metrics')
+    for _ in range(3):
+        grader.track_subsystem_metrics("Essay text.", {})
+    assert lm.supabase_health()['state'] == 'closed' and lm.supabase_health()['consecutive_failures'] == 0
+    print(f"✅ PASS: Circuit opened {lm.supabase_health()['opened']} time(s), queued usage applied on recovery")
+
+
+def test_sqlite_license_store_enforces_quota_atomically():
+    """Test the SQLite license backend: env selection, quotas and concurrent increments"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'licenses.sqlite3')
+        previous = {name: os.environ.get(name) for name in ('DOUESSAY_LICENSE_BACKEND', 'DOUESSAY_LICENSE_DB')}
+        os.environ.update(DOUESSAY_LICENSE_BACKEND='sqlite', DOUESSAY_LICENSE_DB=path)
+        try:
+            lm = LicenseManager()
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        assert isinstance(lm.store, SQLiteLicenseStore) and lm.client is None
+        assert lm.store._connection().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        lm.store.add_license('BASIC-1', 'student_basic')
+        lm.store.add_license('OLD-1', 'student_basic', expires_at='2000-01-01T00:00:00')
+        lm.store.add_license('OFF-1', 'student_basic', is_active=False)
+        assert lm.validate_license('NOPE')['message'] == 'Invalid license key'
+        assert lm.validate_license('OLD-1')['message'] == 'License expired'
+        assert lm.validate_license('OFF-1')['message'] == 'License deactivated'
+
+        grader = DouEssay()
+        grader.license_manager = lm
+        granted = [grader.validate_license_and_increment('BASIC-1')['valid'] for _ in range(12)]
+        assert granted == [True] * 10 + [False] * 2, "student_basic allows 10 essays per day"
+        assert 'Daily usage limit' in lm.validate_license('BASIC-1')['message']
+
+        # Concurrent graders (threads with their own connections) never lose an increment
+        today = app.datetime.now().date().isoformat()
+        lm.store.add_license('TEACHER-1', 'teacher_suite')
+
+        def worker():
+            for _ in range(50):
+                lm.increment_usage('TEACHER-1')
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert lm.store.get_usage('TEACHER-1', today) == 400
+        assert SQLiteLicenseStore(path).get_usage('TEACHER-1', today) == 400, "Another process sees the same counts"
+        assert lm.supabase_health()['backend'] == 'sqlite'
+    print("✅ PASS: SQLite license store enforces quotas with atomic increments")
+
+
+def test_invalid_keys_are_rejected_without_database_queries():
+    """Test the negative cache and the Bloom filter of issued license keys"""
+    bloom = BloomFilter.from_items((f'key-{i}' for i in range(10000)), error_rate=0.01)
+    assert all(f'key-{i}' in bloom for i in range(10000)), "Bloom filters never give false negatives"
+    false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+    assert false_positives < 200, f"False-positive rate {false_positives / 10000:.2%} should be near 1%"
+
+    lookups = []
+
+    class CountingStore(SQLiteLicenseStore):
+        def get_license(self, license_key):
+            lookups.append(license_key)
+            return super().get_license(license_key)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CountingStore(os.path.join(tmp, 'licenses.sqlite3'))
+        for i in range(300):
+            store.add_license(f'VALID-{i}', 'teacher_suite')
+        lm = LicenseManager()
+        lm.store = store
+        lm._key_state = {'invalid': {}, 'filter': None, 'filter_built_at': 0.0, 'refreshing': False,
+                         'negative_hits': 0, 'filter_rejects': 0}
+
+        # Negative cache: a repeated bad key costs one lookup
+        for _ in range(50):
+            assert lm.validate_license('MISTYPED')['message'] == 'Invalid license key'
+        assert lookups == ['MISTYPED'] and lm.supabase_health()['negative_cache_hits'] == 49
+
+        # Bloom filter: a key-guessing burst is answered locally
+        assert lm.refresh_license_filter() == 300
+        lookups.clear()
+        for i in range(1000):
+            assert not lm.validate_license(f'GUESS-{i}')['valid']
+        assert len(lookups) <= 5, f"{len(lookups)} guesses reached the database"
+        assert lm.validate_license('VALID-7')['valid']
+
+        # Keys issued after the last refresh are accepted once the filter is rebuilt
+        store.add_license('NEW-1', 'teacher_suite')
+        assert not lm.validate_license('NEW-1')['valid']
+        lm.refresh_license_filter()
+        assert lm.validate_license('NEW-1')['valid']
+
+        # Supabase keys are paged in key order; keys issued mid-scan are neither repeated nor skipped
+        db = _FakeSupabase()
+        keys = [f'SB-{i:04d}' for i in range(2500)]
+        random.Random(3).shuffle(keys)
+        db.rows['licenses'] = [{'license_key': key} for key in keys]
+        pages = SupabaseLicenseStore(db, CircuitBreaker('supabase-paging-test')).iter_license_keys(page_size=1000)
+        seen = [next(pages) for _ in range(1500)]
+        db.rows['licenses'] += [{'license_key': 'SB-0000A'}, {'license_key': 'SB-2400A'}]
+        seen.extend(pages)
+        assert seen == sorted(keys + ['SB-2400A'])
+
+        # A stale filter is rebuilt in the background
+        previous = app.LICENSE_FILTER_REFRESH_SECONDS
+        app.LICENSE_FILTER_REFRESH_SECONDS = 60
+        try:
+            store.add_license('NEW-2', 'teacher_suite')
+            lm._key_state['filter_built_at'] = 0.0
+            lm.validate_license('VALID-1')
+            for _ in range(100):
+                if not lm._key_state['refreshing']:
+                    break
+                time.sleep(0.01)
+            assert lm.supabase_health()['filter_keys'] == 302
+        finally:
+            app.LICENSE_FILTER_REFRESH_SECONDS = previous
+    print(f"✅ PASS: {lm.supabase_health()['filter_rejects']} bad keys rejected locally")
+
+
+def test_subsystem_metrics_are_rolled_up_and_sampled():
+    """Test that per-essay metrics become per-window rollups plus a small raw sample"""
+    import statistics
+    now = {'t': 1_000_000.0}
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteLicenseStore(os.path.join(tmp, 'licenses.sqlite3'))
+        grader = DouEssay()
+        grader.license_manager.store = store
+        grader.metrics_aggregator = SubsystemMetricsAggregator(window_seconds=60, sample_rate=0.01,
+                                                               clock=lambda: now['t'], rng=random.Random(1))
+        scores = []
+        for i in range(2000):
+            score = rng.uniform(0, 100)
+            scores.append(score)
+            grader.track_subsystem_metrics("Essay text.", {
+                'neural_rubric': {'thinking_inquiry': {'score': score}},
+                'paragraph_structure_v12': {'has_introduction': i % 2 == 0, 'paragraph_count': i % 7}})
+            now['t'] += 0.06  # 2000 essays over two minutes
+        grader.metrics_aggregator.flush(store.insert_metrics, force=True)
+        rows = store._connection().execute('SELECT essay_id, version, metrics FROM subsystem_metrics').fetchall()
+    rollups = [json.loads(metrics) for essay_id, version, metrics in rows if essay_id.startswith('rollup_')]
+    samples = [json.loads(metrics) for essay_id, version, metrics in rows if not essay_id.startswith('rollup_')]
+    assert len(rows) < 50, f"{len(rows)} rows written for 2000 essays"
+    assert 5 <= len(samples) <= 45 and all('doulogic_v5' in sample for sample in samples), "Samples keep the legacy layout"
+    assert sum(rollup['essays'] for rollup in rollups) == 2000
+
+    # Merging the window rollups reproduces the exact statistics of every essay
+    logic = [rollup['subsystems']['doulogic_v5']['score'] for rollup in rollups]
+    total = sum(part['count'] for part in logic)
+    mean = sum(part['mean'] * part['count'] for part in logic) / total
+    variance = sum(part['count'] * (part['variance'] + (part['mean'] - mean) ** 2) for part in logic) / total
+    assert total == 2000 and abs(mean - statistics.fmean(scores)) < 0.01
+    assert abs(variance - statistics.pvariance(scores)) < 0.1
+    assert sum(sum(part['histogram']) for part in logic) == 2000
+    intro = [rollup['subsystems']['doustruct_v5']['intro_detected'] for rollup in rollups]
+    assert sum(part['mean'] * part['count'] for part in intro) == 1000, "Booleans roll up as rates"
+    print(f"✅ PASS: 2000 essays stored as {len(rollups)} rollups and {len(samples)} samples")
+
+
+_EXIT_FLUSH_SCRIPT = """
+import json, sys
+sys.path.insert(0, '.')
+import app
+
+
+class _Insert:
+    def __init__(self, row):
+        self.row = row
+
+    def execute(self):
+        with open(sys.argv[1], 'a') as out:
+            out.write(json.dumps(self.row) + '\\n')
+
+
+class _Client:
+    def table(self, name):
+        return type('Table', (), {'insert': lambda _, row: _Insert(row)})()
+
+
+store = app.SupabaseLicenseStore(_Client(), app.CircuitBreaker('supabase-exit-test'))
+aggregator = app.SubsystemMetricsAggregator.shared()
+if sys.argv[2] != 'empty':
+    aggregator.record({'neural_rubric': {'score': 42}})
+assert aggregator.flush(store.insert_metrics, breaker=store.breaker) == 0  # Window still open: nothing written yet
+if sys.argv[2] == 'open':
+    store.breaker.state = 'open'
+"""
+
+
+def _run_exit_flush(mode):
+    with tempfile.TemporaryDirectory() as tmp:
+        rows_path = os.path.join(tmp, 'rows.jsonl')
+        env = dict(os.environ, DOUESSAY_METRICS_WINDOW='3600', DOUESSAY_METRICS_SAMPLE_RATE='0')
+        done = subprocess.run([sys.executable, '-c', _EXIT_FLUSH_SCRIPT, rows_path, mode], env=env,
+                              capture_output=True, text=True, timeout=300)
+        assert done.returncode == 0, done.stderr[-2000:]
+        assert 'cannot schedule new futures' not in done.stderr
+        if not os.path.exists(rows_path):
+            return []
+        with open(rows_path) as rows_file:
+            return [json.loads(line) for line in rows_file]
+
+
+def test_final_metrics_window_is_flushed_at_exit():
+    """Test that the open rollup window reaches a Supabase-style sink when the process exits"""
+    rows = _run_exit_flush('recorded')
+    assert [row['essay_id'][:7] for row in rows] == ['rollup_']
+    assert json.loads(rows[0]['metrics'])['subsystems']['neural_rubric']['score']['count'] == 1
+    # Nothing recorded, or the store's breaker already open: the exit hook writes nothing
+    assert _run_exit_flush('empty') == []
+    assert _run_exit_flush('open') == []
+    print("✅ PASS: Last metrics window written at exit")
+
+
+def test_grading_worker_pool_isolates_timeouts_and_crashes():
+    """Test that pooled grading matches in-process grading and survives timeouts and crashes"""
+    import signal
+    engine = DouEssay()
+    essay = GradingWorkerPool.WARMUP_ESSAY * 30
+    pool = GradingWorkerPool(size=1, timeout=30, engine=engine)
+    try:
+        pooled = pool.grade(essay, "Grade 10")
+        inline = engine.grade_essay(essay, "Grade 10")
+        assert pooled['score'] == inline['score'] and pooled['rubric_level'] == inline['rubric_level']
+        assert [(item['sentence_index'], item['type']) for item in pooled['inline_feedback']] == \
+            [(item['sentence_index'], item['type']) for item in inline['inline_feedback']]
+
+        # A task that misses its deadline is abandoned and its worker replaced
+        try:
+            pool.grade(essay, timeout=0.001)
+            assert False, "Expected a timeout"
+        except GradingWorkerError as e:
+            assert 'timed out' in str(e)
+        assert pool.grade(essay)['score'] == inline['score']
+
+        # A crashed worker fails only its own task. Its replacement is started while
+        # another thread runs (and could hold any lock), so it must not be forked from here
+        busy = threading.Event()
+        helper = threading.Thread(target=busy.wait, args=(30,), daemon=True)
+        helper.start()
+        os.kill(pool.stats()['workers'][0]['pid'], signal.SIGKILL)
+        time.sleep(0.1)
+        try:
+            pool.grade(essay)
+            assert False, "Expected a crash report"
+        except GradingWorkerError as e:
+            assert 'died' in str(e)
+        finally:
+            busy.set()
+        assert pool.stats()['workers'][0]['start_method'] in ('forkserver', 'spawn')
+        assert pool.grade(essay)['score'] == inline['score']
+
+        # Exceptions inside grade_essay reach the caller; the worker keeps serving
+        try:
+            pool.grade(123)
+            assert False, "Expected the grading error"
+        except RuntimeError as e:
+            assert 'AttributeError' in str(e)
+        stats = pool.stats()
+        assert stats['timeouts'] == 1 and stats['crashes'] == 1 and stats['restarts'] == 2 and stats['errors'] == 1
+        assert all(worker['alive'] for worker in stats['workers'])
+
+        # Stage events stream over the pipe; a consumer that stops early gets the worker replaced
+        events = list(pool.grade_stages(essay, "Grade 10"))
+        assert [kind for kind, *_ in events if kind != 'progress'] == ['score', 'analysis', 'corrections', 'result']
+        assert events[-1][1]['score'] == inline['score']
+        stream = pool.grade_stages(essay, "Grade 10")
+        assert next(stream)[0] == 'progress'
+        stream.close()
+        assert pool.stats()['restarts'] == 3 and pool.grade(essay)['score'] == inline['score']
+    finally:
+        pool.close()
+
+    report = benchmark_grading_pool([essay] * 8, sizes=(1, 2), concurrency=4, engine=engine)
+    print(f"   Load test: {report}")
+    assert report[1]['essays_per_second'] > 0 and report[2]['essays_per_second'] > 0
+    assert report[2]['max_ui_stall_ms'] < 250, "Grading in workers should not stall the UI thread"
+    if (os.cpu_count() or 1) >= 2:
+        assert report[2]['essays_per_second'] > report[1]['essays_per_second'] * 1.2, "Throughput should scale with cores"
+    print("✅ PASS: Worker pool grades identically and recovers from timeouts and crashes")
+
+
+def test_duplicate_concurrent_gradings_are_coalesced():
+    """Test that concurrent identical grade requests share one computation"""
+    grader = DouEssay()
+    grader.grading_flights = SingleFlight()
+    essay = GradingWorkerPool.WARMUP_ESSAY * 10
+    calls = []
+    release = threading.Event()
+
+    def slow_grade():
+        calls.append(1)
+        release.wait(5)
+        return grader.grade_essay(essay, "Grade 10")
+
+    key = grader.grading_key(essay, "Grade 10")
+    assert key != grader.grading_key(essay, "Grade 9"), "Grade level is part of the key"
+    assert key != grader.grading_key(essay, "Grade 10", 'core'), "Grammar profile changes the fingerprint"
+    results = []
+    charges = []
+
+    def request(owner):
+        results.append(grader.grading_flights.do(key, slow_grade, owner=owner,
+                                                 charge=lambda: charges.append(owner)))
+
+    threads = [threading.Thread(target=request, args=(f'KEY-{i % 2}',)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for _ in range(100):
+        if grader.grading_flights.stats()['coalesced'] == 7:
+            break
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    flights = grader.grading_flights
+    assert len(calls) == 1, f"grade_essay ran {len(calls)} times for 8 duplicate requests"
+    assert sum(shared for _, shared in results) == 7
+    assert len({id(result) for result, _ in results}) == 1
+    assert len(charges) == 8, "'each' charges every request"
+    assert flights.stats() == {'in_flight': 0, 'leaders': 1, 'coalesced': 7, 'usage_policy': 'each'}
+
+    # Usage policies are applied as each request joins the flight
+    def charged_owners(policy, owners, fail_first_charge=False):
+        flights.usage_policy = policy
+        gate, charged, outcomes = threading.Event(), [], []
+
+        def charge(owner):
+            if fail_first_charge and not charged:
+                charged.append(None)
+                gate.wait(5)
+                raise app.UsageNotRecordedError(owner)
+            charged.append(owner)
+
+        def compute():
+            gate.wait(5)
+            return 'graded'
+
+        def follow(owner):
+            try:
+                outcomes.append(flights.do('policy', compute, owner=owner, charge=lambda: charge(owner)))
+            except app.UsageNotRecordedError:
+                outcomes.append('refused')
+
+        before = flights.stats()['coalesced']
+        threads = [threading.Thread(target=follow, args=(owner,)) for owner in owners]
+        threads[0].start()
+        time.sleep(0.05)
+        for thread in threads[1:]:
+            thread.start()
+        for _ in range(100):
+            if flights.stats()['coalesced'] - before == len(owners) - 1:
+                break
+            time.sleep(0.01)
+        gate.set()
+        for thread in threads:
+            thread.join()
+        return charged, outcomes
+
+    charged, _ = charged_owners('license', ['KEY-0', 'KEY-0', 'KEY-NEW', 'KEY-NEW'])
+    assert sorted(charged) == ['KEY-0', 'KEY-NEW'], "'license' charges each license once"
+    charged, _ = charged_owners('once', ['KEY-0', 'KEY-0', 'KEY-NEW'])
+    assert charged == ['KEY-0'], "'once' charges only the computing request"
+
+    # A leader whose usage cannot be recorded is refused and a waiter grades instead
+    charged, outcomes = charged_owners('once', ['KEY-0', 'KEY-1', 'KEY-2'], fail_first_charge=True)
+    graded = [outcome for outcome in outcomes if outcome != 'refused']
+    assert len(graded) == 2 and all(result == 'graded' for result, _ in graded)
+    assert len(charged) - 1 == sum(not shared for _, shared in graded), "Only computing requests pay"
+
+    # Failures are shared too, and nothing is cached once the flight lands
+    barrier = threading.Event()
+
+    def failing():
+        barrier.wait(5)
+        raise ValueError('grading failed')
+
+    errors = []
+
+    def failing_request():
+        try:
+            flights.do('bad', failing)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=failing_request) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    barrier.set()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert flights.do(key, lambda: 'fresh') == ('fresh', False)
+    print(f"✅ PASS: 8 concurrent duplicates graded once ({flights.stats()['coalesced']} coalesced)")
+
+
+def test_grading_stages_stream_score_first():
+    """Test that grading streams progress, score, analysis and corrections before the final result"""
+    grader = DouEssay()
+    grader.grading_flights = SingleFlight()
+    grader.latency = LatencyTracker()
+    essay = GradingWorkerPool.WARMUP_ESSAY * 5
+    events = list(grader.grade_essay_stages(essay, "Grade 10"))
+    kinds = [event[0] for event in events]
+    assert [event[1] for event in events if event[0] == 'progress'] == list(GRADING_STAGES)
+    milestones = [kind for kind in kinds if kind != 'progress']
+    assert milestones == ['score', 'analysis', 'corrections', 'result']
+    assert kinds.index('score') == 2, "The score is available after the neural rubric and content analyses"
+    final = events[-1][1]
+    assert final == grader.grade_essay(essay, "Grade 10"), "Streaming and blocking grading agree"
+    score_event = events[kinds.index('score')][1]
+    assert score_event == {'score': final['score'], 'rubric_level': final['rubric_level']}
+    assert list(grader.grade_essay_stages("Too short.")) == [('result', grader.grade_essay("Too short."))]
+
+    # Time to first result is recorded separately from time to completion
+    streamed = list(grader.stream_grade_essay(essay, "Grade 10", owner='KEY-1'))
+    assert streamed[-1] == ('result', final)
+    latency = grader.latency.summary()
+    assert latency['time_to_first_result_ms']['count'] == 1
+    assert latency['time_to_first_result_ms']['p50'] <= latency['time_to_complete_ms']['p50']
+
+    # A request joining an in-flight stream only receives the shared final result
+    release = threading.Event()
+
+    def slow_stages():
+        yield ('score', score_event)
+        release.wait(5)
+        yield ('result', final)
+
+    key = grader.grading_key(essay, "Grade 10")
+    leader = grader.grading_flights.stream(key, slow_stages)
+    assert next(leader) == ('score', score_event)
+    joined = []
+    follower = threading.Thread(target=lambda: joined.extend(grader.grading_flights.stream(key, slow_stages)))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    assert list(leader) == [('result', final)]
+    follower.join()
+    assert joined == [('result', final)] and grader.grading_flights.stats()['coalesced'] == 1
+
+    # When the leading consumer leaves early, a waiter takes over instead of failing
+    release.clear()
+    leader = grader.grading_flights.stream(key, slow_stages)
+    assert next(leader) == ('score', score_event)
+    joined = []
+    follower = threading.Thread(target=lambda: joined.extend(grader.grading_flights.stream(key, slow_stages)))
+    follower.start()
+    time.sleep(0.05)
+    leader.close()
+    time.sleep(0.05)
+    release.set()
+    follower.join()
+    assert joined == [('score', score_event), ('result', final)]
+
+    # Waiters do not wait forever on a stuck leader
+    release.clear()
+    impatient = SingleFlight(wait_timeout=0.05)
+    leader = impatient.stream(key, slow_stages)
+    next(leader)
+    try:
+        list(impatient.stream(key, slow_stages))
+        raise AssertionError("Expected a timeout")
+    except TimeoutError:
+        pass
+    release.set()
+    assert list(leader) == [('result', final)]
+    print(f"✅ PASS: First result after {latency['time_to_first_result_ms']['p50']}ms, "
+          f"complete after {latency['time_to_complete_ms']['p50']}ms")
+
+
+def test_result_payload_is_compact_and_feature_gated():
+    """Test that the client-rendering payload carries every output in far fewer bytes than the HTML"""
+    grader = DouEssay()
+    essay = GradingWorkerPool.WARMUP_ESSAY * 5 + " It is very good and really big."
+    result = normalize_grading_result(grader.grade_essay(essay, "Grade 10"))
+    features = dict.fromkeys(('inline_feedback', 'vocabulary_suggestions', 'draft_history', 'grammar_check'), True)
+    license_result = {'user_type': 'student_premium', 'features': features, 'daily_usage': 2, 'daily_limit': 20}
+    drafts = [{'timestamp': '2026-01-01 10:00:00', 'score': 80, 'level': 'Level 4', 'word_count': 300,
+               'vocab_score': 12.5, 'reflection_score': 6, 'generic_word_count': 2}]
+    result['corrections'] = [{'offset': 0, 'length': 10, 'suggestion': 'Technology', 'message': 'Case'}]
+
+    payload = grader.build_result_payload(essay, result, license_result, "Grade 10", drafts=drafts)
+    encoded = json.dumps(payload, separators=(',', ':'))
+    assert json.loads(encoded) == payload and payload['v'] == RESULT_PAYLOAD_VERSION
+    assert payload['s'] == result['score'] and payload['lv'] == result['rubric_level']['level']
+    assert payload['u'] == ['Student_Premium', 3, 20] and payload['lk'] == {}
+    spans = grader.get_span_table(essay).spans
+    assert [tuple(span[:2]) for span in payload['sp']] == list(spans)
+    assert {span[2] for span in payload['sp'] if len(span) > 2} <= {'g', 'y', 'r'}
+    assert sum(payload['n']) == len(result['inline_feedback'])
+    assert ['very', [alt for f in result['inline_feedback'] if f.get('word') == 'very'
+                     for alt in f['alternatives']]] in payload['vo']
+    assert payload['dh'] == [['2026-01-01 10:00:00', 80, 'Level 4', 300, 12.5, 6, 2]]
+    assert payload['co'] == [[0, 10, 'Technology']]
+
+    html = (grader.create_annotated_essay_html(essay, result['inline_feedback']) +
+            grader.create_vocabulary_suggestions_html(result['inline_feedback']))
+    assert len(encoded) < len(html), "The whole payload is smaller than two of the HTML outputs"
+
+    # Corrections still pending and the score preview leave the rest to the previous render
+    analysis = grader.build_result_payload(essay, result, license_result, "Grade 10", stage='analysis')
+    assert 'co' not in analysis and analysis['dh'] == []
+    preview = grader.build_result_payload(essay, result, None, "Grade 10", stage='score')
+    assert set(preview) == {'v', 'st', 's', 'lv', 'ld', 'g'} and preview['st'] == 'score'
+
+    # Locked features ship their upgrade message instead of their data
+    locked = grader.build_result_payload(essay, result, dict(license_result, features={}), "Grade 10")
+    assert set(locked['lk']) == set(features) and not {'sp', 'vo', 'dh', 'co'} & set(locked)
+    assert 'window.DouEssayTemplates' in RESULT_TEMPLATES_JS
+    print(f"✅ PASS: {len(encoded)}-byte payload vs {len(html)} bytes of annotated and vocabulary HTML")
+
+
+def test_html_fragments_are_memoized():
+    """Test that static fragments render once and result fragments are memoized in a size-bounded LRU"""
+    cache = HTMLFragmentCache(max_bytes=2 * sys.getsizeof("<p>a</p>"))
+    renders = []
+
+    def render(name):
+        renders.append(name)
+        return f"<p>{name}</p>"
+
+    assert cache.get(('a', 1), lambda: render('a')) == "<p>a</p>"
+    assert cache.get(('a', 1), lambda: render('a')) == "<p>a</p>"
+    cache.get(('b', 1), lambda: render('b'))
+    cache.get(('a', 1), lambda: render('a'))  # refreshes 'a', so 'b' is the eviction candidate
+    cache.get(('c', 1), lambda: render('c'))
+    cache.get(('b', 1), lambda: render('b'))
+    assert renders == ['a', 'b', 'c', 'b']
+    assert cache.stats()['entries'] == 2 and (cache.hits, cache.misses) == (2, 4)
+    assert cache.stats()['bytes'] == cache.max_bytes
+    cache.get(('huge', 1), lambda: render('x' * 1000))  # Larger than the whole budget: not kept
+    assert cache.stats()['entries'] == 2 and cache.get(('c', 1), lambda: render('c')) == "<p>c</p>"
+    assert cache.static('banner', lambda: render('banner')) is cache.static('banner', lambda: render('x'))
+    assert renders[-1] == 'banner'
+
+    # Digests follow content, not identity
+    grader = DouEssay()
+    grader.fragments = HTMLFragmentCache()
+    essay = GradingWorkerPool.WARMUP_ESSAY * 5
+    result = normalize_grading_result(grader.grade_essay(essay, "Grade 10"))
+    digest = grader.fragments.digest(essay, result)
+    assert digest == grader.fragments.digest(essay, copy.deepcopy(result))
+    assert digest != grader.fragments.digest(essay, dict(result, score=result['score'] + 1))
+    assert digest != grader.fragments.digest(essay + " ", result)
+
+    # Subsystem info is rendered once per process
+    first = grader.get_subsystem_info_html()
+    assert grader.get_subsystem_info_html() is first and first == grader._render_subsystem_info_html()
+
+    # A repeat view of the same result costs one digest and dictionary lookups
+    render_annotated = lambda: grader.create_annotated_essay_html(essay, result['inline_feedback'])
+    render_vocabulary = lambda: grader.create_vocabulary_suggestions_html(result['inline_feedback'])
+
+    def view():
+        digest = grader.fragments.digest(essay, result)
+        return (grader.fragments.get(('annotated', digest), render_annotated),
+                grader.fragments.get(('vocabulary', digest), render_vocabulary))
+
+    assert view() == (render_annotated(), render_vocabulary())
+    cold = timeit.timeit(lambda: (render_annotated(), render_vocabulary()), number=20)
+    warm = timeit.timeit(view, number=20)
+    assert grader.fragments.stats()['hits'] == 40
+    print(f"✅ PASS: Essay fragments {cold / 20 * 1000:.2f}ms rendered vs {warm / 20 * 1000:.2f}ms memoized")
+
+
+class _TimeoutPool:
+    """Grading pool whose workers always miss their deadline."""
+    size = 1
+
+    def grade(self, essay_text, grade_level="Grade 10", grammar_profile=None, timeout=None, fields=None):
+        raise GradingWorkerError('grading timed out after 0.1s')
+
+    def grade_stages(self, essay_text, grade_level="Grade 10", grammar_profile=None, timeout=None, fields=None):
+        raise GradingWorkerError('grading timed out after 0.1s')
+        yield
+
+    def stats(self):
+        return {'size': self.size}
+
+    def close(self):
+        pass
+
+
+def test_rest_api_grades_with_limits_and_backpressure():
+    """Test POST /grade, POST /grade:batch and GET /health of the REST API"""
+    from starlette.testclient import TestClient
+    with tempfile.TemporaryDirectory() as tmp:
+        grader = DouEssay()
+        grader.grading_flights = SingleFlight()
+        lm = grader.license_manager
+        lm.client, lm.store = None, SQLiteLicenseStore(os.path.join(tmp, 'licenses.sqlite3'))
+        lm.store.add_license('TEACH-1', 'teacher_suite')
+        lm.store.add_license('BASIC-1', 'student_basic')
+        api = GradingAPI(grader, max_pending=3, max_body_bytes=20000, max_batch=4)
+        client = TestClient(api.app)
+        teacher = {'Authorization': 'Bearer TEACH-1'}
+        essay = GradingWorkerPool.WARMUP_ESSAY * 3
+
+        response = client.post('/grade', json={'essay': essay, 'grade_level': 'Grade 11'}, headers=teacher)
+        assert response.status_code == 200
+        result = response.json()['result']
+        expected = normalize_grading_result(grader.grade_essay(essay, 'Grade 11'))
+        assert result['score'] == expected['score'] and result['rubric_level'] == expected['rubric_level']
+        assert result['inline_feedback'] == serialize_records(expected['inline_feedback'])
+
+        # Batches keep their ids and order; every essay counts toward usage
+        batch = {'grade_level': 'Grade 9', 'essays': [{'id': 'a', 'essay': essay}, {'id': 'b', 'essay': essay[:200]},
+                                                      {'essay': essay, 'grade_level': 'Grade 12'}]}
+        response = client.post('/grade:batch', json=batch, headers=teacher)
+        assert response.status_code == 200
+        entries = response.json()['results']
+        assert [entry['id'] for entry in entries] == ['a', 'b', 2] and all('result' in entry for entry in entries)
+        assert entries[2]['result']['score'] == normalize_grading_result(grader.grade_essay(essay, 'Grade 12'))['score']
+        today = app.datetime.now().date().isoformat()
+        assert lm.store.get_usage('TEACH-1', today) == 4
+        assert api.counters['license_lookups'] == 1 and api.counters['license_cache_hits'] == 1
+
+        # Authentication, tier, quota and request validation
+        assert client.post('/grade', json={'essay': essay}).status_code == 401
+        assert client.post('/grade', json={'essay': essay}, headers={'Authorization': 'Bearer NOPE'}).status_code == 403
+        denied = client.post('/grade', json={'essay': essay}, headers={'Authorization': 'Bearer BASIC-1'})
+        assert denied.status_code == 403 and 'API access' in denied.json()['error']
+        api._licenses['TEACH-1'][1]['daily_limit'] = 5  # Quotas are checked against the cached usage
+        assert client.post('/grade:batch', json={'essays': [{'essay': essay}] * 2}, headers=teacher).status_code == 429
+        api._licenses['TEACH-1'][1]['daily_limit'] = float('inf')
+        assert client.post('/grade', json={'essay': '  '}, headers=teacher).status_code == 400
+        assert client.post('/grade', content=b'{not json', headers=teacher).status_code == 400
+        assert client.post('/grade', json={'essay': 'x' * 30000}, headers=teacher).status_code == 413
+        assert client.post('/grade:batch', json={'essays': [{'essay': essay}] * 5}, headers=teacher).status_code == 413
+
+        # Backpressure: requests beyond the admission bound are rejected, not queued
+        busy = client.post('/grade:batch', json={'essays': [{'essay': essay}] * 4}, headers=teacher)
+        assert api.max_pending < 4 and busy.status_code == 503 and busy.headers['retry-after'] == '1'
+        assert api.pending == 0
+
+        # Worker deadlines surface as 504 (single) or per-essay errors (batch)
+        api.pool = _TimeoutPool()
+        assert client.post('/grade', json={'essay': essay + ' Timeout.'}, headers=teacher).status_code == 504
+        entries = client.post('/grade:batch', json={'essays': [{'id': 'x', 'essay': essay + ' Late.'}]},
+                              headers=teacher).json()['results']
+        assert entries == [{'id': 'x', 'error': 'grading timed out after 0.1s'}]
+
+        health = client.get('/health').json()
+        assert health['status'] == 'ok' and health['pending'] == 0 and health['workers'] == {'size': 1}
+        assert health['counters']['http_503'] == 1 and health['counters']['essays'] >= 6
+        api.close()
+
+        # Concurrent cache misses: a late lookup must not replace the entry holding a reservation
+        api = GradingAPI(grader)
+        validate, release = lm.validate_license_async, []
+
+        async def slow_validate(license_key, executor=None):
+            result = await validate(license_key, executor)
+            gate = asyncio.Event()
+            release.append(gate)
+            await gate.wait()
+            return result
+
+        async def concurrent_misses():
+            lm.validate_license_async = slow_validate
+            request = SimpleNamespace(headers={'authorization': 'Bearer TEACH-1'})
+            first = asyncio.ensure_future(api._authorize(request, 1))
+            second = asyncio.ensure_future(api._authorize(request, 1))
+            while len(release) < 2:
+                await asyncio.sleep(0.01)
+            release[0].set()
+            _, license_result, _ = await first
+            license_result['daily_usage'] += 1
+            release[1].set()
+            _, late_result, _ = await second
+            return license_result, late_result
+
+        try:
+            reserved, late = asyncio.run(concurrent_misses())
+        finally:
+            lm.validate_license_async = validate
+            api.close()
+        assert late is reserved and api._licenses['TEACH-1'][1]['daily_usage'] == reserved['daily_usage']
+        assert api.counters['license_lookups'] == 2
+    print(f"✅ PASS: REST API served {health['counters']['essays']} essays; p50 completion "
+          f"{health['latency']['time_to_complete_ms']['p50']}ms")
+
+
+class _InProcessPool:
+    """Grading pool stand-in that grades in-process and records the requested fields."""
+    size = 1
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.requested = []
+
+    def grade(self, essay_text, grade_level="Grade 10", grammar_profile=None, timeout=None, fields=None):
+        self.requested.append(fields)
+        return self.engine.grade_essay(essay_text, grade_level, grammar_profile, fields)
+
+    def grade_stages(self, essay_text, grade_level="Grade 10", grammar_profile=None, timeout=None, fields=None):
+        self.requested.append(fields)
+        return self.engine.grade_essay_stages(essay_text, grade_level, grammar_profile, fields)
+
+
+def test_result_fields_project_and_skip_analyzers():
+    """Test that fields= / exclude= return only the requested keys and skip unneeded analyzers"""
+    grader = DouEssay()
+    essay = GradingWorkerPool.WARMUP_ESSAY * 5
+    full = grader.grade_essay(essay, "Grade 11")
+    assert set(full) == set(RESULT_FIELD_STAGES)
+    for field in RESULT_FIELD_STAGES:
+        assert grader.grade_essay(essay, "Grade 11", fields=[field]) == {field: full[field]}, field
+    rest = grader.grade_essay(essay, "Grade 11", exclude=['corrections', 'inline_feedback'])
+    assert rest == {key: value for key, value in full.items() if key not in ('corrections', 'inline_feedback')}
+
+    # Only the stages the selection needs run
+    stages = lambda **selection: [event[1] for event in grader.grade_essay_stages(essay, "Grade 11", **selection)
+                                  if event[0] == 'progress']
+    assert stages(fields=['score', 'rubric_level']) == ['neural_rubric', 'content']
+    assert stages(fields=['emotionflow_v2', 'inline_feedback']) == ['neural_rubric', 'content', 'emotionflow_v2',
+                                                                    'inline_feedback']
+    assert stages(fields=['feedback']) == ['neural_rubric', 'content', 'statistics', 'structure', 'grammar',
+                                           'application', 'feedback']
+    assert stages() == list(GRADING_STAGES)
+    for bad in (['scores'], 'score'):
+        try:
+            grader.grade_essay(essay, fields=bad)
+            assert False, "Unknown or malformed fields are rejected"
+        except ValueError:
+            pass
+
+    # assess_essay projects its own keys onto the grading keys they need
+    assessment = assess_essay(essay, "Grade 11")
+    assert assess_essay(essay, "Grade 11", fields=['score', 'rubric_level']) == {
+        'score': assessment['score'], 'rubric_level': assessment['rubric_level']}
+    assert assess_essay(essay, "Grade 11", fields=['factor_scores']) == {'factor_scores': assessment['factor_scores']}
+    assert set(assess_essay(essay, "Grade 11", exclude=['inline_feedback'])) == set(assessment) - {'inline_feedback'}
+
+    # Worker pools and the REST API carry the selection through
+    pool = _InProcessPool(grader)
+    streamed = list(grader.stream_grade_essay(essay, "Grade 11", pool=pool, fields=frozenset({'score'})))
+    assert streamed[-1] == ('result', {'score': full['score']}) and pool.requested == [frozenset({'score'})]
+    assert [event[1] for event in streamed if event[0] == 'progress'] == ['neural_rubric', 'content']
+    from starlette.testclient import TestClient
+    with tempfile.TemporaryDirectory() as tmp:
+        lm = grader.license_manager
+        lm.client, lm.store = None, SQLiteLicenseStore(os.path.join(tmp, 'licenses.sqlite3'))
+        lm.store.add_license('TEACH-1', 'teacher_suite')
+        api = GradingAPI(grader)
+        client = TestClient(api.app)
+        teacher = {'Authorization': 'Bearer TEACH-1'}
+        body = {'essay': essay, 'grade_level': 'Grade 11', 'fields': ['score', 'inline_feedback']}
+        projected = client.post('/grade', json=body, headers=teacher)
+        assert projected.json()['result'] == {'score': full['score'],
+                                              'inline_feedback': serialize_records(full['inline_feedback'])}
+        whole = client.post('/grade', json={'essay': essay, 'grade_level': 'Grade 11'}, headers=teacher)
+        assert len(projected.content) < len(whole.content)
+        assert client.post('/grade', json=dict(body, fields=['nope']), headers=teacher).status_code == 400
+        api.close()
+
+    everything = timeit.timeit(lambda: grader.grade_essay(essay, "Grade 11"), number=5) / 5
+    score_only = timeit.timeit(lambda: grader.grade_essay(essay, "Grade 11", fields=['score']), number=5) / 5
+    print(f"✅ PASS: Score-only grading {score_only * 1000:.1f}ms vs {everything * 1000:.1f}ms; "
+          f"{len(projected.content)} vs {len(whole.content)} response bytes")
+
+
+class _SlowTypoTool(_TypoTool):
+    """_TypoTool behind a LanguageTool round trip of `delay` seconds."""
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def check(self, text):
+        time.sleep(self.delay)
+        return super().check(text)
+
+
+def test_async_grading_keeps_many_requests_in_flight():
+    """Test that grade_essay_async matches grade_essay and overlaps gradings without blocking the loop"""
+    grader = DouEssay()
+    grader.grammar_enabled = True
+    grader.grammar_tool = _SlowTypoTool(0.3)
+    essays = [GradingWorkerPool.WARMUP_ESSAY.replace('the', 'teh', n) + f" Essay {n}." for n in range(1, 7)]
+    executor = ThreadPoolExecutor(max_workers=16)
+
+    async def main():
+        worst_lag = 0.0
+        beating = True
+
+        async def heartbeat():
+            nonlocal worst_lag
+            while beating:
+                tick = time.perf_counter()
+                await asyncio.sleep(0.005)
+                worst_lag = max(worst_lag, time.perf_counter() - tick - 0.005)
+
+        beat = asyncio.ensure_future(heartbeat())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(grader.grade_essay_async(essay, "Grade 10", executor=executor)
+                                         for essay in essays))
+        elapsed = time.perf_counter() - start
+        beating = False
+        await beat
+
+        projected = await grader.grade_essay_async(essays[0] + " More.", "Grade 10", fields=['score'],
+                                                   executor=executor)
+        stages = []
+        async for event in grader.grade_essay_stages_async(essays[1], "Grade 10", executor=executor):
+            stages.append(event[0])
+            if event[0] == 'score':
+                break
+        try:
+            await grader.grade_essay_async(123, executor=executor)
+            assert False, "Expected the grading error"
+        except AttributeError:
+            pass
+        return results, elapsed, worst_lag, projected, stages
+
+    try:
+        results, elapsed, worst_lag, projected, stages = asyncio.run(main())
+    finally:
+        executor.shutdown(wait=True)
+    # One LanguageTool round trip per essay: the grammar stage and corrections join the prefetch
+    assert sorted(grader.grammar_tool.checked) == sorted(essays)
+    for essay, result in zip(essays, results):
+        inline = grader.grade_essay(essay, "Grade 10")
+        assert result['score'] == inline['score'] and result['detailed_analysis'] == inline['detailed_analysis']
+        assert result['corrections'] == inline['corrections']
+        assert len(result['corrections']) == essay.count('teh')
+    assert elapsed < 0.3 * len(essays) / 2, "Grammar round trips should overlap"
+    assert worst_lag < 0.25, "Grading should not block the event loop"
+    assert set(projected) == {'score'} and len(grader.grammar_tool.checked) == len(essays)
+    assert stages[-1] == 'score' and 'result' not in stages
+
+    # Without an executor, gradings share one bounded pool and the excess queues
+    more = [essay + " Again." for essay in essays] * 2
+
+    async def default_executor():
+        return await asyncio.gather(*(grader.grade_essay_async(essay, "Grade 10") for essay in more))
+
+    queued = asyncio.run(default_executor())
+    assert [result['score'] for result in queued] == [result['score'] for result in results] * 2
+    grading_threads = [t for t in threading.enumerate() if t.name.startswith('grading-async')]
+    assert 0 < len(grading_threads) <= max(2, app.ASYNC_GRADING_THREADS)
+
+    # License validation and usage without blocking the loop
+    with tempfile.TemporaryDirectory() as tmp:
+        lm = LicenseManager()
+        lm.client, lm.store = None, SQLiteLicenseStore(os.path.join(tmp, 'licenses.sqlite3'))
+        lm.store.add_license('BASIC-1', 'student_basic')
+        grader.license_manager = lm
+
+        hits = lm.supabase_health()['negative_cache_hits']
+
+        async def licensing():
+            missing = await lm.validate_license_async('NOPE-ASYNC')
+            again = await lm.validate_license_async('NOPE-ASYNC')
+            granted = [(await grader.validate_license_and_increment_async('BASIC-1'))['valid'] for _ in range(11)]
+            return missing, again, granted, await lm.validate_license_async('BASIC-1')
+
+        missing, again, granted, exhausted = asyncio.run(licensing())
+        assert missing == again == {'valid': False, 'message': 'Invalid license key'}
+        assert lm.supabase_health()['negative_cache_hits'] == hits + 1, "Repeat misses are answered on the loop"
+        assert granted == [True] * 10 + [False]
+        assert exhausted == lm.validate_license('BASIC-1') and 'Daily usage limit' in exhausted['message']
+    print(f"✅ PASS: {len(essays)} async gradings in {elapsed * 1000:.0f}ms "
+          f"(grammar round trip 300ms each), worst event-loop stall {worst_lag * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    try:
+        test_sentence_spans_match_regex_split()
+        test_inline_feedback_records()
+        test_grammar_correction_records()
+        test_grade_essay_result_is_json_serializable()
+        test_span_table_shared_by_producers_and_renderer()
+        test_generic_word_alternation_matches_per_word_search()
+        test_term_index_matches_substring_search()
+        test_absolute_statements_use_shared_index()
+        test_token_table_matches_whole_words()
+        test_token_matching_flag_and_shift_report()
+        test_grammar_cache_checks_only_unseen_sentences()
+        test_grammar_cache_lru_eviction()
+        test_language_tool_pool_balances_and_reuses_connections()
+        test_language_tool_pool_reattaches_to_registry_and_caps_heap()
+        test_long_essays_are_checked_in_overlapping_chunks()
+        test_rule_profiles_follow_tier_and_grade()
+        test_class_set_grammar_batching()
+        test_heuristic_grammar_backend_rules()
+        test_grammar_backend_agreement_report()
+        test_grammar_supervisor_recycles_on_breaches()
+        test_pool_restart_is_coordinated_through_the_registry()
+        test_supabase_circuit_breaker_and_degraded_policy()
+        test_sqlite_license_store_enforces_quota_atomically()
+        test_invalid_keys_are_rejected_without_database_queries()
+        test_subsystem_metrics_are_rolled_up_and_sampled()
+        test_final_metrics_window_is_flushed_at_exit()
+        test_grading_worker_pool_isolates_timeouts_and_crashes()
+        test_duplicate_concurrent_gradings_are_coalesced()
+        test_grading_stages_stream_score_first()
+        test_result_payload_is_compact_and_feature_gated()
+        test_html_fragments_are_memoized()
+        test_rest_api_grades_with_limits_and_backpressure()
+        test_result_fields_project_and_skip_analyzers()
+        test_async_grading_keeps_many_requests_in_flight()
+        print("\n✅ ALL v14.5.0 PERFORMANCE TESTS PASSED")
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        sys.exit(1)